@@ -1,11 +1,56 @@
 from django.contrib import admin
 
-from .models import Analysis
+from .models import Analysis, AnalysisBatch, Product
 
 
 @admin.register(Analysis)
 class AnalysisAdmin(admin.ModelAdmin):
-    list_display = ("id", "status", "url", "created_at")
+    list_display = ("id", "status", "url", "total_wall_time", "llm_tokens", "created_at")
+    list_filter = ("status", "created_at", "archived_at")
+    search_fields = ("id", "url", "product_key")
+    readonly_fields = ("created_at", "archived_at", "stage_breakdown", "metrics")
+
+    @admin.display(description="Süre (s)")
+    def total_wall_time(self, obj: Analysis):
+        return (obj.metrics or {}).get("totals", {}).get("wall_time_s", "-")
+
+    @admin.display(description="LLM token (girdi/çıktı)")
+    def llm_tokens(self, obj: Analysis) -> str:
+        totals = (obj.metrics or {}).get("totals", {})
+        if not totals:
+            return "-"
+        return f"{totals.get('input_tokens', 0)}/{totals.get('output_tokens', 0)}"
+
+    @admin.display(description="Aşama dökümü")
+    def stage_breakdown(self, obj: Analysis) -> str:
+        stages = (obj.metrics or {}).get("stages", {})
+        lines = [
+            f"{name}: {entry.get('wall_time_s', 0)} s, {entry.get('llm_calls', 0)} çağrı, "
+            f"{entry.get('input_tokens', 0)}/{entry.get('output_tokens', 0)} token, "
+            f"{entry.get('fallback_count', 0)} fallback"
+            for name, entry in stages.items()
+        ]
+        return "\n".join(lines) or "-"
+
+
+@admin.register(AnalysisBatch)
+class AnalysisBatchAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "url_count", "created_at", "completed_at")
     list_filter = ("status", "created_at")
-    search_fields = ("id", "url")
+    readonly_fields = ("created_at", "completed_at", "parameters", "items")
+
+    @admin.display(description="URL sayısı")
+    def url_count(self, obj: AnalysisBatch) -> int:
+        return len(obj.items or [])
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    list_display = ("key", "domain", "review_count", "created_at")
+    list_filter = ("domain",)
+    search_fields = ("key", "url")
     readonly_fields = ("created_at",)
+
+    @admin.display(description="Yorum sayısı")
+    def review_count(self, obj: Product) -> int:
+        return obj.reviews.count()
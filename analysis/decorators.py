@@ -0,0 +1,38 @@
+from functools import wraps
+
+from django.http import HttpResponseNotAllowed
+from django.utils.log import log_response
+
+# Django 4.2's require_http_methods and csrf_exempt wrap views in sync
+# functions, which would make Django run async views in a thread. These keep
+# the view a coroutine function.
+
+
+def async_require_http_methods(request_method_list: list[str]):
+    def decorator(func):
+        @wraps(func)
+        async def inner(request, *args, **kwargs):
+            if request.method not in request_method_list:
+                response = HttpResponseNotAllowed(request_method_list)
+                log_response(
+                    "Method Not Allowed (%s): %s",
+                    request.method,
+                    request.path,
+                    response=response,
+                    request=request,
+                )
+                return response
+            return await func(request, *args, **kwargs)
+
+        return inner
+
+    return decorator
+
+
+async_require_GET = async_require_http_methods(["GET"])
+async_require_POST = async_require_http_methods(["POST"])
+
+
+def async_csrf_exempt(view_func):
+    view_func.csrf_exempt = True
+    return view_func
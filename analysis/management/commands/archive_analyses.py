@@ -0,0 +1,58 @@
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from analysis.models import Analysis
+from analysis.services.cold_storage import archive_analysis
+from analysis.services.constants import DEFAULT_ARCHIVE_AFTER_DAYS
+
+
+class Command(BaseCommand):
+    help = "Eski tamamlanmış analizlerin gömülü yorum listelerini sıkıştırılmış soğuk depoya taşır."
+
+    def add_arguments(self, parser):
+        try:
+            default_days = int(os.getenv("ARCHIVE_AFTER_DAYS", str(DEFAULT_ARCHIVE_AFTER_DAYS)))
+        except ValueError:
+            default_days = DEFAULT_ARCHIVE_AFTER_DAYS
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=default_days,
+            help="Bu kadar günden eski analizler arşivlenir (varsayılan ARCHIVE_AFTER_DAYS).",
+        )
+        parser.add_argument("--limit", type=int, default=500, help="Tek çalıştırmada arşivlenecek en fazla analiz.")
+        parser.add_argument("--dry-run", action="store_true", help="Sadece arşivlenecek analizleri say.")
+
+    def handle(self, *args, **options):
+        if options["older_than_days"] < 1:
+            raise CommandError("--older-than-days en az 1 olmalı.")
+
+        cutoff = timezone.now() - timedelta(days=options["older_than_days"])
+        candidates = Analysis.objects.filter(
+            status=Analysis.Status.COMPLETED,
+            archived_at__isnull=True,
+            created_at__lt=cutoff,
+            # Analyses stored as rows have no inline blob left to move.
+            raw_comments__has_key="comments",
+        ).order_by("created_at")
+        ids = list(candidates.values_list("id", flat=True)[: max(1, options["limit"])])
+
+        if options["dry_run"]:
+            self.stdout.write(f"{len(ids)} analiz arşivlenecek ({cutoff:%Y-%m-%d} öncesi).")
+            return
+
+        archived = raw_total = stored_total = 0
+        for analysis in Analysis.objects.filter(id__in=ids).only("id", "raw_comments", "archived_at"):
+            row = archive_analysis(analysis)
+            if row is None:
+                continue
+            archived += 1
+            raw_total += row.raw_size
+            stored_total += row.stored_size
+
+        self.stdout.write(
+            f"{archived} analiz arşivlendi: {raw_total / 1024:.1f} KB → {stored_total / 1024:.1f} KB sıkıştırılmış."
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from analysis.models import Analysis, AnalysisAggregate
+from analysis.services.history import record_analysis_aggregate
+
+
+class Command(BaseCommand):
+    help = "Özet satırı olmayan tamamlanmış analizler için ürün geçmişi satırlarını üretir."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Var olan özet satırlarını da yeniden hesapla.")
+
+    def handle(self, *args, **options):
+        analyses = Analysis.objects.filter(status=Analysis.Status.COMPLETED).only(
+            "id", "url", "product_key", "raw_comments", "created_at"
+        )
+        if not options["all"]:
+            analyses = analyses.filter(aggregate__isnull=True)
+
+        completed_at = dict(AnalysisAggregate.objects.values_list("analysis_id", "completed_at")) if options["all"] else {}
+        count = 0
+        for analysis in analyses.iterator(chunk_size=200):
+            # Completion time was not stored before these rows, so creation time stands in.
+            record_analysis_aggregate(analysis, completed_at=completed_at.get(analysis.id, analysis.created_at))
+            count += 1
+        self.stdout.write(f"{count} analiz için ürün geçmişi satırı yazıldı.")
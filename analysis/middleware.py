@@ -0,0 +1,49 @@
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+from .services.constants import BROTLI_QUALITY, MIN_COMPRESS_BYTES
+
+re_accepts_brotli = _lazy_re_compile(r"\bbr\b")
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """İstemcinin Accept-Encoding başlığına göre yanıtı brotli ya da gzip ile sıkıştırır.
+
+    brotli paketi kurulu değilse yalnızca gzip kullanılır. Olay akışları
+    (SSE) sıkıştırılmaz; sıkıştırma tamponu olayları geciktirirdi.
+    """
+
+    def process_response(self, request, response):
+        if response.get("Content-Type", "").startswith("text/event-stream"):
+            return response
+        brotli = _brotli()
+        if (
+            brotli is None
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or len(response.content) < MIN_COMPRESS_BYTES
+            or not re_accepts_brotli.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        # Same as GZipMiddleware: a strong ETag no longer matches the encoded body.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = "br"
+        return response
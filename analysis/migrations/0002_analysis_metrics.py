@@ -0,0 +1,18 @@
+# Generated by Django 4.2.19 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysis",
+            name="metrics",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
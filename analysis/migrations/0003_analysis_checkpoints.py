@@ -0,0 +1,37 @@
+# Generated by Django 4.2.19 on 2026-10-19 16:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0002_analysis_metrics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysis",
+            name="parameters",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.CreateModel(
+            name="AnalysisCheckpoint",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("stage", models.CharField(choices=[("scrape", "Scrape"), ("prepare", "Prepare"), ("classify_batch", "Classify batch")], max_length=20)),
+                ("batch_index", models.IntegerField(default=-1)),
+                ("payload", models.JSONField(blank=True, default=dict)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("analysis", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="checkpoints", to="analysis.analysis")),
+            ],
+            options={
+                "ordering": ["analysis", "stage", "batch_index"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="analysischeckpoint",
+            constraint=models.UniqueConstraint(fields=("analysis", "stage", "batch_index"), name="unique_analysis_checkpoint"),
+        ),
+    ]
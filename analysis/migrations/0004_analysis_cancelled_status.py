@@ -0,0 +1,18 @@
+# Generated by Django 4.2.19 on 2026-10-19 16:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0003_analysis_checkpoints"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="analysis",
+            name="status",
+            field=models.CharField(choices=[("Pending", "Pending"), ("Processing", "Processing"), ("Completed", "Completed"), ("Failed", "Failed"), ("Cancelled", "Cancelled")], default="Pending", max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.19 on 2026-10-19 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0005_analysis_batches"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysis",
+            name="client_id",
+            field=models.CharField(blank=True, db_index=True, default="", max_length=128),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.19 on 2026-10-19 17:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0006_analysis_client_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Product",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=255, unique=True)),
+                ("domain", models.CharField(blank=True, default="", max_length=100)),
+                ("url", models.URLField(blank=True, default="")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["key"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Review",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("text_hash", models.CharField(max_length=40)),
+                ("dedup_key", models.CharField(max_length=40)),
+                ("text", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("product", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="reviews", to="analysis.product")),
+            ],
+            options={
+                "ordering": ["product", "id"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ClassifiedComment",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("position", models.PositiveIntegerField()),
+                ("sentiment", models.CharField(choices=[("Negatif", "Negatif"), ("Nötr", "Nötr"), ("Pozitif", "Pozitif")], max_length=10)),
+                ("score", models.FloatField(default=0.0)),
+                ("theme", models.CharField(default="genel", max_length=40)),
+                ("dedup_key", models.CharField(max_length=40)),
+                ("analysis", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="classified_comments", to="analysis.analysis")),
+                ("review", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="classifications", to="analysis.review")),
+            ],
+            options={
+                "ordering": ["analysis", "position"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="review",
+            constraint=models.UniqueConstraint(fields=("product", "text_hash"), name="unique_product_review_text"),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(fields=["product", "dedup_key"], name="review_product_dedup_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="classifiedcomment",
+            index=models.Index(fields=["analysis", "sentiment"], name="classified_sentiment_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="classifiedcomment",
+            index=models.Index(fields=["analysis", "theme"], name="classified_theme_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="classifiedcomment",
+            index=models.Index(fields=["dedup_key"], name="classified_dedup_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="classifiedcomment",
+            constraint=models.UniqueConstraint(fields=("analysis", "position"), name="unique_classified_comment_position"),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.19 on 2026-10-19 17:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0007_reviews_and_classified_comments"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalysisPayload",
+            fields=[
+                ("analysis", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="cold_payload", serialize=False, to="analysis.analysis")),
+                ("codec", models.CharField(choices=[("zstd", "zstd"), ("gzip", "gzip")], max_length=10)),
+                ("data", models.BinaryField()),
+                ("raw_size", models.PositiveIntegerField(default=0)),
+                ("stored_size", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="analysis",
+            name="archived_at",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.19 on 2026-10-19 17:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0008_cold_storage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalysisAggregate",
+            fields=[
+                ("analysis", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="aggregate", serialize=False, to="analysis.analysis")),
+                ("completed_at", models.DateTimeField()),
+                ("scraped_count", models.PositiveIntegerField(default=0)),
+                ("comment_count", models.PositiveIntegerField(default=0)),
+                ("negative_count", models.PositiveIntegerField(default=0)),
+                ("neutral_count", models.PositiveIntegerField(default=0)),
+                ("positive_count", models.PositiveIntegerField(default=0)),
+                ("net_sentiment", models.FloatField(default=0.0)),
+                ("theme_distribution", models.JSONField(blank=True, default=dict)),
+                ("repeated_comment_instances", models.PositiveIntegerField(default=0)),
+                ("suspected_bot_groups", models.PositiveIntegerField(default=0)),
+                ("suspected_bot_instances", models.PositiveIntegerField(default=0)),
+                ("product", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="aggregates", to="analysis.product")),
+            ],
+            options={
+                "ordering": ["product", "-completed_at"],
+                "indexes": [models.Index(fields=["product", "-completed_at"], name="aggregate_product_time_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# Django 4.2 has no GeneratedField, so the column lives outside the model and
+# is only read through analysis.services.search. Other databases (SQLite in
+# local development) skip it and search with a plain substring match.
+ADD_SEARCH_VECTOR = """
+ALTER TABLE analysis_review
+    ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('turkish', coalesce(text, ''))) STORED;
+CREATE INDEX review_search_vector_gin ON analysis_review USING GIN (search_vector);
+"""
+
+DROP_SEARCH_VECTOR = """
+DROP INDEX IF EXISTS review_search_vector_gin;
+ALTER TABLE analysis_review DROP COLUMN IF EXISTS search_vector;
+"""
+
+
+def add_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(ADD_SEARCH_VECTOR)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SEARCH_VECTOR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analysis", "0009_analysis_aggregates"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vector, drop_search_vector),
+    ]
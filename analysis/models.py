@@ -9,13 +9,26 @@ class Analysis(models.Model):
         PROCESSING = "Processing", "Processing"
         COMPLETED = "Completed", "Completed"
         FAILED = "Failed", "Failed"
+        CANCELLED = "Cancelled", "Cancelled"
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     url = models.URLField()
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     raw_comments = models.JSONField(default=dict, blank=True)
     summary_result = models.TextField(blank=True, default="")
+    metrics = models.JSONField(default=dict, blank=True)
+    parameters = models.JSONField(default=dict, blank=True)
+    product_key = models.CharField(max_length=255, blank=True, default="", db_index=True)
+    client_id = models.CharField(max_length=128, blank=True, default="", db_index=True)
+    batch = models.ForeignKey(
+        "AnalysisBatch",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="analyses",
+    )
     task_id = models.CharField(max_length=255, blank=True, default="")
+    archived_at = models.DateTimeField(null=True, blank=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -23,3 +36,150 @@ class Analysis(models.Model):
 
     def __str__(self) -> str:
         return f"{self.id} - {self.status}"
+
+
+class AnalysisPayload(models.Model):
+    class Codec(models.TextChoices):
+        ZSTD = "zstd", "zstd"
+        GZIP = "gzip", "gzip"
+
+    analysis = models.OneToOneField(Analysis, on_delete=models.CASCADE, primary_key=True, related_name="cold_payload")
+    codec = models.CharField(max_length=10, choices=Codec.choices)
+    data = models.BinaryField()
+    raw_size = models.PositiveIntegerField(default=0)
+    stored_size = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.analysis_id} - {self.codec} {self.stored_size}/{self.raw_size}"
+
+
+class AnalysisBatch(models.Model):
+    class Status(models.TextChoices):
+        PROCESSING = "Processing", "Processing"
+        COMPLETED = "Completed", "Completed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PROCESSING)
+    parameters = models.JSONField(default=dict, blank=True)
+    items = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"{self.id} - {self.status}"
+
+
+class Product(models.Model):
+    key = models.CharField(max_length=255, unique=True)
+    domain = models.CharField(max_length=100, blank=True, default="")
+    url = models.URLField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["key"]
+
+    def __str__(self) -> str:
+        return self.key
+
+
+class Review(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="reviews")
+    # Rows are unique per exact text; dedup_key groups case/punctuation variants.
+    text_hash = models.CharField(max_length=40)
+    dedup_key = models.CharField(max_length=40)
+    text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["product", "id"]
+        constraints = [
+            models.UniqueConstraint(fields=["product", "text_hash"], name="unique_product_review_text"),
+        ]
+        indexes = [
+            models.Index(fields=["product", "dedup_key"], name="review_product_dedup_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id} - {self.dedup_key}"
+
+
+class ClassifiedComment(models.Model):
+    class Sentiment(models.TextChoices):
+        NEGATIVE = "Negatif", "Negatif"
+        NEUTRAL = "Nötr", "Nötr"
+        POSITIVE = "Pozitif", "Pozitif"
+
+    analysis = models.ForeignKey(Analysis, on_delete=models.CASCADE, related_name="classified_comments")
+    review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name="classifications")
+    position = models.PositiveIntegerField()
+    sentiment = models.CharField(max_length=10, choices=Sentiment.choices)
+    score = models.FloatField(default=0.0)
+    theme = models.CharField(max_length=40, default="genel")
+    dedup_key = models.CharField(max_length=40)
+
+    class Meta:
+        ordering = ["analysis", "position"]
+        constraints = [
+            models.UniqueConstraint(fields=["analysis", "position"], name="unique_classified_comment_position"),
+        ]
+        indexes = [
+            models.Index(fields=["analysis", "sentiment"], name="classified_sentiment_idx"),
+            models.Index(fields=["analysis", "theme"], name="classified_theme_idx"),
+            models.Index(fields=["dedup_key"], name="classified_dedup_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.analysis_id} #{self.position} - {self.sentiment}"
+
+
+class AnalysisAggregate(models.Model):
+    analysis = models.OneToOneField(Analysis, on_delete=models.CASCADE, primary_key=True, related_name="aggregate")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="aggregates")
+    completed_at = models.DateTimeField()
+    scraped_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    negative_count = models.PositiveIntegerField(default=0)
+    neutral_count = models.PositiveIntegerField(default=0)
+    positive_count = models.PositiveIntegerField(default=0)
+    net_sentiment = models.FloatField(default=0.0)
+    theme_distribution = models.JSONField(default=dict, blank=True)
+    repeated_comment_instances = models.PositiveIntegerField(default=0)
+    suspected_bot_groups = models.PositiveIntegerField(default=0)
+    suspected_bot_instances = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["product", "-completed_at"]
+        indexes = [
+            models.Index(fields=["product", "-completed_at"], name="aggregate_product_time_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id} @ {self.completed_at:%Y-%m-%d %H:%M}"
+
+
+class AnalysisCheckpoint(models.Model):
+    class Stage(models.TextChoices):
+        SCRAPE = "scrape", "Scrape"
+        PREPARE = "prepare", "Prepare"
+        CLASSIFY_BATCH = "classify_batch", "Classify batch"
+
+    NO_BATCH = -1
+
+    analysis = models.ForeignKey(Analysis, on_delete=models.CASCADE, related_name="checkpoints")
+    stage = models.CharField(max_length=20, choices=Stage.choices)
+    batch_index = models.IntegerField(default=NO_BATCH)
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["analysis", "stage", "batch_index"]
+        constraints = [
+            models.UniqueConstraint(fields=["analysis", "stage", "batch_index"], name="unique_analysis_checkpoint"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.analysis_id} - {self.stage}:{self.batch_index}"
@@ -0,0 +1,178 @@
+import logging
+import math
+import os
+import statistics
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import redis
+from django.conf import settings
+
+from ..models import Analysis
+from .constants import (
+    ADMISSION_CLIENT_LOCK_TIMEOUT_SECONDS,
+    ADMISSION_CLIENT_LOCK_WAIT_SECONDS,
+    DEFAULT_ADMISSION_MAX_PER_CLIENT,
+    DEFAULT_ADMISSION_MAX_QUEUE_DEPTH,
+    DEFAULT_ADMISSION_MAX_WAIT_SECONDS,
+    DEFAULT_ADMISSION_SCRAPE_SECONDS,
+    DEFAULT_ADMISSION_TOTAL_SECONDS,
+)
+from .redis_client import get_broker_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_SCRAPES_KEY = "analysis:scrape:active"
+DURATIONS_KEY = "analysis:durations:{kind}"
+CLIENT_LOCK_KEY = "analysis:admission:client:{client_id}"
+DURATION_SAMPLES = 50
+
+
+def _env_int(name: str, default: int, low: int, high: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+    except ValueError:
+        value = default
+    return max(low, min(value, high))
+
+
+def record_duration(kind: str, seconds: float) -> None:
+    key = DURATIONS_KEY.format(kind=kind)
+    try:
+        pipe = get_redis().pipeline()
+        pipe.lpush(key, f"{seconds:.1f}")
+        pipe.ltrim(key, 0, DURATION_SAMPLES - 1)
+        pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("Duration sample could not be recorded (%s): %s", kind, exc)
+
+
+def recent_duration(kind: str, default: float) -> float:
+    try:
+        samples = [float(value) for value in get_redis().lrange(DURATIONS_KEY.format(kind=kind), 0, -1)]
+    except (redis.RedisError, ValueError) as exc:
+        logger.warning("Duration samples could not be read (%s): %s", kind, exc)
+        return default
+    return statistics.median(samples) if samples else default
+
+
+def scrape_slot_acquired(analysis_id: str) -> None:
+    try:
+        get_redis().zadd(ACTIVE_SCRAPES_KEY, {analysis_id: time.time()})
+    except redis.RedisError as exc:
+        logger.warning("Scrape slot could not be tracked for %s: %s", analysis_id, exc)
+
+
+def scrape_slot_released(analysis_id: str) -> None:
+    try:
+        get_redis().zrem(ACTIVE_SCRAPES_KEY, analysis_id)
+    except redis.RedisError as exc:
+        logger.warning("Scrape slot could not be released for %s: %s", analysis_id, exc)
+
+
+def active_scrapes() -> int:
+    client = get_redis()
+    # Entries older than the hard task limit belong to killed workers.
+    client.zremrangebyscore(ACTIVE_SCRAPES_KEY, "-inf", time.time() - settings.CELERY_TASK_TIME_LIMIT)
+    return int(client.zcard(ACTIVE_SCRAPES_KEY))
+
+
+def scrape_queue_depth() -> int:
+    return int(get_broker_redis().llen(settings.CELERY_SCRAPE_QUEUE))
+
+
+def client_in_flight(client_id: str) -> int:
+    return (
+        Analysis.objects.filter(client_id=client_id, status__in=[Analysis.Status.PENDING, Analysis.Status.PROCESSING])
+        .exclude(task_id="")
+        .count()
+    )
+
+
+@contextmanager
+def client_admission_lock(client_id: str) -> Iterator[None]:
+    """Aynı istemcinin kabul kontrolünü ve analiz durum değişikliğini sıraya sokar.
+
+    ``client_in_flight`` sayımı ile analizin kaydı/dağıtımı bu kilit içinde
+    yapılırsa eşzamanlı iki istek aynı boş slotu alamaz. Redis'e ulaşılamazsa
+    kilitsiz devam edilir; admission kontrolü servisi durdurmamalı.
+    """
+    lock = None
+    if client_id:
+        try:
+            candidate = get_redis().lock(
+                CLIENT_LOCK_KEY.format(client_id=client_id),
+                timeout=ADMISSION_CLIENT_LOCK_TIMEOUT_SECONDS,
+                blocking_timeout=ADMISSION_CLIENT_LOCK_WAIT_SECONDS,
+            )
+            if candidate.acquire():
+                lock = candidate
+            else:
+                logger.warning("Admission lock for client %s timed out, continuing unlocked", client_id)
+        except redis.RedisError as exc:
+            logger.warning("Admission lock unavailable for client %s: %s", client_id, exc)
+    try:
+        yield
+    finally:
+        if lock is not None:
+            try:
+                lock.release()
+            except redis.RedisError as exc:
+                logger.warning("Admission lock for client %s could not be released: %s", client_id, exc)
+
+
+def check_admission(client_id: str, deadline_seconds: int | None, check_client_limit: bool = True) -> dict[str, Any]:
+    """Yeni analizin kabul edilip edilmeyeceğine karar verir.
+
+    Tahmini başlama süresi scrape kuyruğu derinliği, dolu tarayıcı slotları ve
+    son scrape sürelerinin medyanından hesaplanır. Redis okunamazsa istek kabul
+    edilir; admission kontrolü servisi durdurmamalı.
+    """
+    slots = max(1, settings.CELERY_SCRAPE_CONCURRENCY)
+    scrape_seconds = recent_duration("scrape", DEFAULT_ADMISSION_SCRAPE_SECONDS)
+
+    if check_client_limit and client_id:
+        max_per_client = _env_int("ADMISSION_MAX_PER_CLIENT", DEFAULT_ADMISSION_MAX_PER_CLIENT, 1, 1000)
+        in_flight = client_in_flight(client_id)
+        if in_flight >= max_per_client:
+            total_seconds = recent_duration("total", DEFAULT_ADMISSION_TOTAL_SECONDS)
+            return {
+                "admitted": False,
+                "reason": "client_limit",
+                "retry_after": max(5, math.ceil(total_seconds / max_per_client)),
+                "client_in_flight": in_flight,
+                "client_limit": max_per_client,
+            }
+
+    try:
+        queue_depth = scrape_queue_depth()
+        busy = active_scrapes()
+    except redis.RedisError as exc:
+        logger.warning("Admission check skipped, Redis unavailable: %s", exc)
+        return {"admitted": True, "reason": "unchecked", "estimated_start_seconds": None}
+
+    # Work ahead of this request: queued scrapes plus any overflow of running
+    # ones, drained by `slots` browsers in parallel.
+    waves_ahead = (queue_depth + max(0, busy - slots + 1)) / slots
+    estimated_start = round(waves_ahead * scrape_seconds, 1)
+
+    max_depth = _env_int("ADMISSION_MAX_QUEUE_DEPTH", DEFAULT_ADMISSION_MAX_QUEUE_DEPTH, 1, 100000)
+    max_wait = _env_int("ADMISSION_MAX_WAIT_SECONDS", DEFAULT_ADMISSION_MAX_WAIT_SECONDS, 10, 86400)
+    if deadline_seconds is not None:
+        max_wait = min(max_wait, deadline_seconds / 2)
+    decision: dict[str, Any] = {
+        "admitted": True,
+        "reason": "",
+        "estimated_start_seconds": estimated_start,
+        "queue_depth": queue_depth,
+        "active_scrapes": busy,
+        "scrape_slots": slots,
+    }
+    if queue_depth >= max_depth:
+        excess_waves = (queue_depth - max_depth + 1) / slots
+        decision.update(admitted=False, reason="queue_full", retry_after=max(5, math.ceil(excess_waves * scrape_seconds)))
+    elif estimated_start > max_wait:
+        decision.update(admitted=False, reason="wait_too_long", retry_after=max(5, math.ceil(estimated_start - max_wait)))
+    return decision
@@ -0,0 +1,81 @@
+import logging
+
+import redis
+from django.conf import settings
+
+from ..models import Analysis
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CANCEL_KEY = "analysis:cancel:{analysis_id}"
+TASKS_KEY = "analysis:tasks:{analysis_id}"
+
+
+def cancel_key(analysis_id: str) -> str:
+    return CANCEL_KEY.format(analysis_id=analysis_id)
+
+
+def tasks_key(analysis_id: str) -> str:
+    return TASKS_KEY.format(analysis_id=analysis_id)
+
+
+def track_task_ids(analysis_id: str, *task_ids: str) -> None:
+    task_ids = tuple(task_id for task_id in task_ids if task_id)
+    if not task_ids:
+        return
+    try:
+        pipe = get_redis().pipeline()
+        pipe.sadd(tasks_key(analysis_id), *task_ids)
+        pipe.expire(tasks_key(analysis_id), settings.ANALYSIS_PROGRESS_TTL_SECONDS)
+        pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("Task id tracking failed for %s: %s", analysis_id, exc)
+
+
+def tracked_task_ids(analysis_id: str) -> set[str]:
+    try:
+        return set(get_redis().smembers(tasks_key(analysis_id)))
+    except redis.RedisError as exc:
+        logger.warning("Task id read failed for %s: %s", analysis_id, exc)
+        return set()
+
+
+def request_cancellation(analysis_id: str) -> None:
+    try:
+        get_redis().set(cancel_key(analysis_id), "1", ex=settings.ANALYSIS_PROGRESS_TTL_SECONDS)
+    except redis.RedisError as exc:
+        # Workers fall back to the status column, so the cancel still lands.
+        logger.warning("Cancel flag could not be set for %s: %s", analysis_id, exc)
+
+
+def is_cancelled(analysis_id: str) -> bool:
+    try:
+        if get_redis().exists(cancel_key(analysis_id)):
+            return True
+    except redis.RedisError as exc:
+        logger.warning("Cancel flag read failed for %s: %s", analysis_id, exc)
+        return Analysis.objects.filter(id=analysis_id, status=Analysis.Status.CANCELLED).exists()
+    return False
+
+
+def revoke_analysis_tasks(analysis_id: str, *task_ids: str, interrupt_task_id: str = "") -> set[str]:
+    """Analizin task'larını revoke eder; ``interrupt_task_id`` çalışıyorsa hemen kesilir."""
+    from celery import current_app
+
+    ids = tracked_task_ids(analysis_id) | {task_id for task_id in task_ids if task_id}
+    if interrupt_task_id:
+        ids.add(interrupt_task_id)
+    if not ids:
+        return ids
+    try:
+        # Queued tasks are dropped by the workers; running ones stop on the
+        # cancel flag at their next check.
+        current_app.control.revoke(sorted(ids))
+        if interrupt_task_id:
+            # SIGUSR1 raises SoftTimeLimitExceeded inside the prefork child, so
+            # the scraper's finally blocks still quit the browser session.
+            current_app.control.revoke(interrupt_task_id, terminate=True, signal="SIGUSR1")
+    except Exception as exc:
+        logger.warning("Task revoke failed for %s: %s", analysis_id, exc)
+    return ids
@@ -0,0 +1,73 @@
+from typing import Any
+
+from ..models import AnalysisCheckpoint
+
+
+def save_checkpoint(
+    analysis_id: str,
+    stage: str,
+    payload: dict[str, Any],
+    batch_index: int = AnalysisCheckpoint.NO_BATCH,
+) -> None:
+    AnalysisCheckpoint.objects.update_or_create(
+        analysis_id=analysis_id,
+        stage=stage,
+        batch_index=batch_index,
+        defaults={"payload": payload},
+    )
+
+
+def load_checkpoint(analysis_id: str, stage: str) -> dict[str, Any] | None:
+    row = (
+        AnalysisCheckpoint.objects.filter(
+            analysis_id=analysis_id,
+            stage=stage,
+            batch_index=AnalysisCheckpoint.NO_BATCH,
+        )
+        .values("payload")
+        .first()
+    )
+    return row["payload"] if row else None
+
+
+def load_batch_checkpoints(analysis_id: str) -> dict[int, dict[str, Any]]:
+    rows = AnalysisCheckpoint.objects.filter(
+        analysis_id=analysis_id,
+        stage=AnalysisCheckpoint.Stage.CLASSIFY_BATCH,
+    ).values_list("batch_index", "payload")
+    return dict(rows)
+
+
+def completed_batch_indexes(analysis_id: str) -> set[int]:
+    return set(
+        AnalysisCheckpoint.objects.filter(
+            analysis_id=analysis_id,
+            stage=AnalysisCheckpoint.Stage.CLASSIFY_BATCH,
+        ).values_list("batch_index", flat=True)
+    )
+
+
+def clear_checkpoints(analysis_id: str) -> None:
+    AnalysisCheckpoint.objects.filter(analysis_id=analysis_id).delete()
+
+
+def describe_resume_point(analysis_id: str) -> dict[str, Any]:
+    stages = set(
+        AnalysisCheckpoint.objects.filter(analysis_id=analysis_id)
+        .exclude(stage=AnalysisCheckpoint.Stage.CLASSIFY_BATCH)
+        .values_list("stage", flat=True)
+    )
+    if AnalysisCheckpoint.Stage.PREPARE in stages:
+        batches_total = (
+            AnalysisCheckpoint.objects.filter(analysis_id=analysis_id, stage=AnalysisCheckpoint.Stage.PREPARE)
+            .values_list("payload__batches_total", flat=True)
+            .first()
+        )
+        return {
+            "resume_from": "classify",
+            "batches_done": len(completed_batch_indexes(analysis_id)),
+            "batches_total": batches_total or 0,
+        }
+    if AnalysisCheckpoint.Stage.SCRAPE in stages:
+        return {"resume_from": "prepare"}
+    return {"resume_from": "scrape"}
@@ -0,0 +1,83 @@
+import gzip
+import json
+from functools import lru_cache
+from typing import Any
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Analysis, AnalysisPayload
+from .constants import ARCHIVE_GZIP_LEVEL, ARCHIVE_ZSTD_LEVEL
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def compress_payload(payload: dict[str, Any]) -> tuple[str, bytes, int]:
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    zstd = _zstd()
+    if zstd is not None:
+        return AnalysisPayload.Codec.ZSTD, zstd.ZstdCompressor(level=ARCHIVE_ZSTD_LEVEL).compress(raw), len(raw)
+    return AnalysisPayload.Codec.GZIP, gzip.compress(raw, compresslevel=ARCHIVE_GZIP_LEVEL), len(raw)
+
+
+def decompress_payload(codec: str, data: bytes) -> dict[str, Any]:
+    if codec == AnalysisPayload.Codec.ZSTD:
+        zstd = _zstd()
+        if zstd is None:
+            raise RuntimeError("Arşiv zstd ile sıkıştırılmış; okumak için 'zstandard' paketi gerekli.")
+        raw = zstd.ZstdDecompressor().decompress(data)
+    else:
+        raw = gzip.decompress(data)
+    return json.loads(raw)
+
+
+def load_cold_payload(analysis_id: str) -> dict[str, Any]:
+    row = AnalysisPayload.objects.filter(analysis_id=analysis_id).values("codec", "data").first()
+    if row is None:
+        return {}
+    return decompress_payload(row["codec"], bytes(row["data"]))
+
+
+def store_cold_payload(analysis_id: str, **parts: Any) -> AnalysisPayload:
+    """Verilen bölümleri analizin sıkıştırılmış payload'una ekler ya da günceller."""
+    payload = {**load_cold_payload(analysis_id), **parts}
+    codec, data, raw_size = compress_payload(payload)
+    row, _ = AnalysisPayload.objects.update_or_create(
+        analysis_id=analysis_id,
+        defaults={"codec": codec, "data": data, "raw_size": raw_size, "stored_size": len(data)},
+    )
+    return row
+
+
+@lru_cache(maxsize=16)
+def archived_comments(analysis_id: str) -> list[dict[str, Any]] | None:
+    # Archived comments never change, so pages of the same analysis share one decompression.
+    return load_cold_payload(analysis_id).get("comments")
+
+
+def archive_analysis(analysis: Analysis) -> AnalysisPayload | None:
+    """Analizin ``raw_comments`` içine gömülü yorum listesini soğuk depoya taşır.
+
+    Yalnızca JSON blob'u taşınır; Review/ClassifiedComment satırları arama ve
+    analizler için yerinde kalır. Taşınacak liste yoksa None döner.
+    """
+    from .reviews import inline_distributions
+
+    with transaction.atomic():
+        analysis = Analysis.objects.select_for_update().get(id=analysis.id)
+        if "comments" not in analysis.raw_comments:
+            return None
+        compact = {key: value for key, value in analysis.raw_comments.items() if key != "comments"}
+        compact.update(inline_distributions(analysis.raw_comments))
+
+        row = store_cold_payload(str(analysis.id), comments=analysis.raw_comments["comments"])
+        analysis.raw_comments = compact
+        analysis.archived_at = timezone.now()
+        analysis.save(update_fields=["raw_comments", "archived_at"])
+    return row
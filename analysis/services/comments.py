@@ -1,16 +1,18 @@
 import os
-import re
 from collections import Counter
+from collections.abc import Callable
 from html import unescape
 from typing import Any
 from urllib.parse import urlparse
 
 from .constants import (
     DEFAULT_DECISION_SHORTLIST_SIZE,
+    DIGIT_RE,
     HARD_MAX_REVIEWS,
     LOGISTIC_TERMS,
     LOW_SIGNAL_TERMS,
     NOISE_PHRASES,
+    NON_WORD_RE,
     PRODUCT_TERMS,
     TURKISH_COMMON_WORDS,
     TURKISH_SPECIFIC_CHARS,
@@ -26,7 +28,13 @@ def validate_product_url(url: str) -> None:
         raise ValueError("URL domain bilgisi içermelidir.")
 
 
-def scrape_comments_by_domain(url: str, max_comments: int = HARD_MAX_REVIEWS) -> list[str]:
+def scrape_comments_by_domain(
+    url: str,
+    max_comments: int = HARD_MAX_REVIEWS,
+    progress_callback: Callable[[int], None] | None = None,
+    time_budget: float | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> list[str]:
     validate_product_url(url)
     parsed = urlparse(url)
     domain = parsed.netloc.lower()
@@ -34,7 +42,7 @@ def scrape_comments_by_domain(url: str, max_comments: int = HARD_MAX_REVIEWS) ->
     if "trendyol.com" in domain:
         from trendyol_scraper import trendyol_yorum_scrape
 
-        data = trendyol_yorum_scrape(url, max_comments)
+        data = trendyol_yorum_scrape(url, max_comments, progress_callback=progress_callback, time_budget=time_budget, should_stop=should_stop)
         reviews = data.get("reviews", []) if isinstance(data, dict) else []
         texts = [str(r.get("comment", "")).strip() for r in reviews if isinstance(r, dict)]
         return [t for t in texts if t]
@@ -42,7 +50,7 @@ def scrape_comments_by_domain(url: str, max_comments: int = HARD_MAX_REVIEWS) ->
     if "hepsiburada.com" in domain:
         from hepsiburada_scraper import run as hepsiburada_run
 
-        data = hepsiburada_run(url, max_comments)
+        data = hepsiburada_run(url, max_comments, progress_callback=progress_callback, time_budget=time_budget, should_stop=should_stop)
         if not data or not isinstance(data, dict):
             return []
         reviews = data.get("reviews", [])
@@ -55,13 +63,13 @@ def scrape_comments_by_domain(url: str, max_comments: int = HARD_MAX_REVIEWS) ->
 def is_turkish(text: str) -> bool:
     if any(c in TURKISH_SPECIFIC_CHARS for c in text):
         return True
-    words = set(re.sub(r"[^\w\s]", " ", text.lower()).split())
+    words = set(NON_WORD_RE.sub(" ", text.lower()).split())
     return bool(words & TURKISH_COMMON_WORDS)
 
 
 def normalize_for_dedup(text: str) -> str:
     lowered = text.lower().replace("İ", "i").replace("I", "ı")
-    lowered = re.sub(r"[^\w\s]", " ", lowered, flags=re.UNICODE)
+    lowered = NON_WORD_RE.sub(" ", lowered)
     lowered = WHITESPACE_RE.sub(" ", lowered).strip()
     return lowered
 
@@ -188,7 +196,7 @@ def score_comment_for_decision(text: str, repeat_count: int) -> tuple[float, lis
     if 35 <= len(text) <= 600:
         score += 1.2
         reasons.append("yeterli detay")
-    if re.search(r"\d", text):
+    if DIGIT_RE.search(text):
         score += 0.8
         reasons.append("sayısal/somut ifade")
     if any(w in lower for w in ("ama", "fakat", "ancak", "öte yandan")):
@@ -2,14 +2,80 @@ import re
 
 WHITESPACE_RE = re.compile(r"\s+")
 JSON_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", flags=re.IGNORECASE)
+NON_WORD_RE = re.compile(r"[^\w\s]", flags=re.UNICODE)
+DIGIT_RE = re.compile(r"\d")
 
 SENTIMENTS = {"Negatif", "Nötr", "Pozitif"}
 
+FALLBACK_NEGATIVE_TERMS = ("kötü", "berbat", "bozuk", "geç", "kırık", "iade", "şikayet")
+FALLBACK_POSITIVE_TERMS = ("güzel", "mükemmel", "hızlı", "kaliteli", "memnun", "harika", "iyi")
+
 DEFAULT_LLM_BATCH_SIZE = 75
 DEFAULT_DECISION_SHORTLIST_SIZE = 300
 DEFAULT_MAX_REVIEWS = 2500
 HARD_MAX_REVIEWS = 3000
 
+DEFAULT_SUMMARY_MAP_CONCURRENCY = 6
+DEFAULT_SUMMARY_THEME_MAX_CHARS = 6000
+SUMMARY_EVIDENCE_MAX_CHARS = 300
+SUMMARY_MIN_THEME_COMMENTS = 3
+
+# No end-to-end deadline unless ANALYSIS_DEADLINE_SECONDS or the request sets one.
+DEFAULT_ANALYSIS_DEADLINE_SECONDS = None
+MIN_ANALYSIS_DEADLINE_SECONDS = 60
+MAX_ANALYSIS_DEADLINE_SECONDS = 1700
+DEFAULT_SCRAPE_DEADLINE_SHARE = 0.5
+DEFAULT_LLM_BATCH_ESTIMATE_SECONDS = 20.0
+DEFAULT_SUMMARY_RESERVE_SECONDS = 60.0
+DEFAULT_DEADLINE_CLASSIFY_CONCURRENCY = 4
+
+DEFAULT_LLM_REQUEST_TIMEOUT_SECONDS = 120
+MIN_LLM_REQUEST_TIMEOUT_SECONDS = 10
+LLM_TIMEOUT_BUCKET_SECONDS = 30
+
+DEFAULT_BATCH_PARALLELISM = 4
+MAX_BATCH_PARALLELISM = 50
+MAX_BATCH_URLS = 500
+
+DEFAULT_ADMISSION_MAX_QUEUE_DEPTH = 40
+DEFAULT_ADMISSION_MAX_WAIT_SECONDS = 600
+DEFAULT_ADMISSION_MAX_PER_CLIENT = 3
+DEFAULT_ADMISSION_SCRAPE_SECONDS = 120.0
+DEFAULT_ADMISSION_TOTAL_SECONDS = 300.0
+ADMISSION_CLIENT_LOCK_TIMEOUT_SECONDS = 30
+ADMISSION_CLIENT_LOCK_WAIT_SECONDS = 10
+
+COMMENT_BULK_BATCH_SIZE = 500
+DEFAULT_COMMENT_PAGE_SIZE = 50
+MAX_COMMENT_PAGE_SIZE = 500
+
+STATUS_CACHE_ACTIVE_TTL_SECONDS = 30
+STATUS_POLL_SECONDS = 3
+
+DEFAULT_SSE_MAX_SECONDS = 120
+MAX_SSE_SECONDS = 300
+DEFAULT_SSE_HEARTBEAT_SECONDS = 15
+SSE_RETRY_MS = 3000
+
+PROGRESS_LISTENER_QUEUE_SIZE = 100
+DEFAULT_ASYNC_REDIS_MAX_CONNECTIONS = 50
+
+DEFAULT_WAIT_SECONDS = 55
+MAX_WAIT_SECONDS = 300
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 30
+ARCHIVE_ZSTD_LEVEL = 10
+ARCHIVE_GZIP_LEVEL = 6
+
+DEFAULT_RESULT_CACHE_TTL_SECONDS = 3600
+DEFAULT_RESULT_CACHE_MAX_BYTES = 4 * 1024 * 1024
+MIN_COMPRESS_BYTES = 200
+BROTLI_QUALITY = 5
+
+DEFAULT_HISTORY_DAYS = 365
+DEFAULT_HISTORY_LIMIT = 100
+MAX_HISTORY_LIMIT = 1000
+
 NOISE_PHRASES = {
     "indirim kupon",
     "satış yap",
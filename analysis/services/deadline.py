@@ -0,0 +1,86 @@
+import math
+import os
+import time
+
+from .constants import (
+    DEFAULT_ANALYSIS_DEADLINE_SECONDS,
+    DEFAULT_LLM_BATCH_ESTIMATE_SECONDS,
+    DEFAULT_SCRAPE_DEADLINE_SHARE,
+    DEFAULT_SUMMARY_RESERVE_SECONDS,
+    MAX_ANALYSIS_DEADLINE_SECONDS,
+    MIN_ANALYSIS_DEADLINE_SECONDS,
+)
+
+
+def _env_float(name: str, default: float, low: float, high: float) -> float:
+    try:
+        value = float(os.getenv(name, str(default)))
+    except ValueError:
+        value = default
+    return max(low, min(value, high))
+
+
+def clamp_deadline_seconds(seconds: int | None) -> int | None:
+    """İstekteki ya da ``ANALYSIS_DEADLINE_SECONDS`` ile verilen süreyi sınırlar; ikisi de yoksa None."""
+    if seconds is None:
+        try:
+            seconds = int(os.getenv("ANALYSIS_DEADLINE_SECONDS", "").strip())
+        except ValueError:
+            seconds = DEFAULT_ANALYSIS_DEADLINE_SECONDS
+    if seconds is None:
+        return None
+    return max(MIN_ANALYSIS_DEADLINE_SECONDS, min(seconds, MAX_ANALYSIS_DEADLINE_SECONDS))
+
+
+class Deadline:
+    """Analizin uçtan uca bitmesi gereken an.
+
+    Epoch zamanı olarak tutulur; böylece task mesajlarıyla farklı worker
+    süreçlerine taşınabilir. ``expires_at`` None ise süre sınırı yoktur.
+    """
+
+    def __init__(self, expires_at: float | None = None):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float | None) -> "Deadline":
+        return cls(time.time() + seconds if seconds else None)
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return math.inf
+        return max(0.0, self.expires_at - time.time())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def scrape_budget(self) -> float | None:
+        if self.expires_at is None:
+            return None
+        share = _env_float("SCRAPE_DEADLINE_SHARE", DEFAULT_SCRAPE_DEADLINE_SHARE, 0.1, 0.9)
+        return self.remaining() * share
+
+    def classify_budget(self) -> float:
+        return self.remaining() - summary_reserve_seconds()
+
+    def classify_capacity(self, parallelism: int, batch_size: int) -> int | None:
+        """Kalan sürede LLM ile sınıflandırılabilecek en fazla yorum sayısı."""
+        if self.expires_at is None:
+            return None
+        per_batch = _env_float("LLM_BATCH_ESTIMATE_SECONDS", DEFAULT_LLM_BATCH_ESTIMATE_SECONDS, 1.0, 600.0)
+        waves = int(self.classify_budget() // per_batch)
+        return max(0, waves) * max(1, parallelism) * batch_size
+
+    def summary_mode(self) -> str:
+        """'full' (tema map + reduce), 'reduce' (tek LLM çağrısı) veya 'fallback' (LLM'siz)."""
+        remaining = self.remaining()
+        reserve = summary_reserve_seconds()
+        if remaining >= reserve:
+            return "full"
+        if remaining >= reserve / 3:
+            return "reduce"
+        return "fallback"
+
+
+def summary_reserve_seconds() -> float:
+    return _env_float("SUMMARY_RESERVE_SECONDS", DEFAULT_SUMMARY_RESERVE_SECONDS, 5.0, 600.0)
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.utils import timezone
+
+from ..models import Analysis, AnalysisAggregate, Product
+from .reviews import inline_distributions, product_for_analysis
+
+
+def record_analysis_aggregate(analysis: Analysis, completed_at: datetime | None = None) -> AnalysisAggregate:
+    """Analizin ürün geçmişi için özet satırını yazar (varsa günceller)."""
+    raw = analysis.raw_comments
+    distributions = inline_distributions(raw)
+    sentiments = distributions["sentiment_distribution"]
+    negative = sentiments.get("Negatif", 0)
+    neutral = sentiments.get("Nötr", 0)
+    positive = sentiments.get("Pozitif", 0)
+    total = negative + neutral + positive
+    duplicates = raw.get("duplicate_comment_insights") or {}
+
+    aggregate, _ = AnalysisAggregate.objects.update_or_create(
+        analysis=analysis,
+        defaults={
+            "product": product_for_analysis(analysis),
+            "completed_at": completed_at or timezone.now(),
+            "scraped_count": raw.get("scraped_count", 0),
+            "comment_count": total,
+            "negative_count": negative,
+            "neutral_count": neutral,
+            "positive_count": positive,
+            "net_sentiment": round((positive - negative) / total, 4) if total else 0.0,
+            "theme_distribution": distributions["theme_distribution"],
+            "repeated_comment_instances": duplicates.get("repeated_comment_instances", 0),
+            "suspected_bot_groups": duplicates.get("suspected_bot_groups", 0),
+            "suspected_bot_instances": duplicates.get("suspected_bot_instances", 0),
+        },
+    )
+    return aggregate
+
+
+def product_history(product: Product, days: int, limit: int) -> list[dict[str, Any]]:
+    rows = (
+        AnalysisAggregate.objects.filter(product=product, completed_at__gte=timezone.now() - timedelta(days=days))
+        .order_by("-completed_at")
+        .values(
+            "analysis_id",
+            "completed_at",
+            "scraped_count",
+            "comment_count",
+            "negative_count",
+            "neutral_count",
+            "positive_count",
+            "net_sentiment",
+            "theme_distribution",
+            "repeated_comment_instances",
+            "suspected_bot_groups",
+            "suspected_bot_instances",
+        )[:limit]
+    )
+    points = []
+    for row in reversed(rows):
+        total = row["comment_count"] or 0
+        points.append(
+            {
+                "analysis_id": str(row["analysis_id"]),
+                "completed_at": row["completed_at"].isoformat(),
+                "scraped_count": row["scraped_count"],
+                "comment_count": total,
+                "sentiment_distribution": {
+                    "Negatif": row["negative_count"],
+                    "Nötr": row["neutral_count"],
+                    "Pozitif": row["positive_count"],
+                },
+                "positive_ratio": round(row["positive_count"] / total, 4) if total else 0.0,
+                "net_sentiment": row["net_sentiment"],
+                "theme_distribution": row["theme_distribution"],
+                "bot_suspicion": {
+                    "repeated_comment_instances": row["repeated_comment_instances"],
+                    "suspected_bot_groups": row["suspected_bot_groups"],
+                    "suspected_bot_instances": row["suspected_bot_instances"],
+                },
+            }
+        )
+    return points
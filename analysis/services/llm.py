@@ -1,24 +1,49 @@
 import logging
+import math
 import os
-from typing import Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
-from langchain.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+if TYPE_CHECKING:
+    from langchain_core.prompts import PromptTemplate
+
+    from .metrics import StageRecorder
+
+from .constants import (
+    DEFAULT_LLM_REQUEST_TIMEOUT_SECONDS,
+    LLM_TIMEOUT_BUCKET_SECONDS,
+    MAX_ANALYSIS_DEADLINE_SECONDS,
+    MIN_LLM_REQUEST_TIMEOUT_SECONDS,
+)
 
 logger = logging.getLogger(__name__)
 
+LLM_ENV_KEYS = (
+    "GEMINI_API_KEY",
+    "GEMINI_MODEL",
+    "VERTEX_EXPRESS_API_KEY",
+    "VERTEX_EXPRESS_MODEL",
+    "OLLAMA_BASE_URL",
+    "OLLAMA_MODEL",
+)
+
 
 class VertexExpressLLM:
-    def __init__(self, api_key: str, model: str):
+    def __init__(self, api_key: str, model: str, timeout: int | None = None):
         try:
             from google import genai
+            from google.genai import types
         except ImportError as exc:
             raise RuntimeError("Vertex Express için 'google-genai' paketi gerekli.") from exc
 
-        self._client = genai.Client(vertexai=True, api_key=api_key)
+        http_options = types.HttpOptions(timeout=timeout * 1000) if timeout else None
+        self._client = genai.Client(vertexai=True, api_key=api_key, http_options=http_options)
         self._model = model
 
     def generate_text(self, prompt_text: str) -> str:
+        return self.generate_text_with_usage(prompt_text)[0]
+
+    def generate_text_with_usage(self, prompt_text: str) -> tuple[str, dict[str, int]]:
         from google.genai import types
 
         response = self._client.models.generate_content(
@@ -31,9 +56,15 @@ class VertexExpressLLM:
             ),
         )
 
+        usage_metadata = getattr(response, "usage_metadata", None)
+        usage = {
+            "input_tokens": int(getattr(usage_metadata, "prompt_token_count", 0) or 0),
+            "output_tokens": int(getattr(usage_metadata, "candidates_token_count", 0) or 0),
+        }
+
         text = getattr(response, "text", None)
         if text:
-            return str(text).strip()
+            return str(text).strip(), usage
 
         candidates = getattr(response, "candidates", None) or []
         for candidate in candidates:
@@ -44,24 +75,95 @@ class VertexExpressLLM:
             for part in parts:
                 part_text = getattr(part, "text", None)
                 if part_text:
-                    return str(part_text).strip()
+                    return str(part_text).strip(), usage
 
         raise ValueError("Vertex Express yanıtından metin çıkarılamadı.")
 
 
-def invoke_llm_with_prompt(prompt: PromptTemplate, llm: Any, payload: dict[str, Any]) -> str:
-    if isinstance(llm, VertexExpressLLM):
+def message_token_usage(message: Any) -> dict[str, int]:
+    usage_metadata = getattr(message, "usage_metadata", None) or {}
+    if usage_metadata:
+        return {
+            "input_tokens": int(usage_metadata.get("input_tokens", 0) or 0),
+            "output_tokens": int(usage_metadata.get("output_tokens", 0) or 0),
+        }
+    # ChatOllama reports Ollama's native counters in response_metadata.
+    response_metadata = getattr(message, "response_metadata", None) or {}
+    return {
+        "input_tokens": int(response_metadata.get("prompt_eval_count", 0) or 0),
+        "output_tokens": int(response_metadata.get("eval_count", 0) or 0),
+    }
+
+
+def invoke_llm_with_prompt(
+    prompt: "PromptTemplate",
+    llm: Any,
+    payload: dict[str, Any],
+    recorder: "StageRecorder | None" = None,
+) -> str:
+    # Vertex Express and the mock provider take a rendered prompt instead of a LangChain runnable.
+    if callable(getattr(llm, "generate_text_with_usage", None)):
         rendered_prompt = prompt.format(**payload)
-        return llm.generate_text(rendered_prompt)
-
-    chain = prompt | llm | StrOutputParser()
-    return chain.invoke(payload)
-
-
-def get_llm():
-    gemini_api_key = os.getenv("GEMINI_API_KEY", "").strip()
-    vertex_express_api_key = os.getenv("VERTEX_EXPRESS_API_KEY", "").strip()
-    ollama_base_url = os.getenv("OLLAMA_BASE_URL", "").strip()
+        text, usage = llm.generate_text_with_usage(rendered_prompt)
+    else:
+        from langchain_core.output_parsers import StrOutputParser
+
+        message = (prompt | llm).invoke(payload)
+        text = StrOutputParser().invoke(message)
+        usage = message_token_usage(message)
+
+    if recorder is not None:
+        recorder.record_llm_call(**usage)
+    return text
+
+
+def llm_request_timeout(remaining: float | None = None) -> int:
+    """Tek bir LLM isteği için saniye cinsinden süre sınırı.
+
+    ``LLM_REQUEST_TIMEOUT_SECONDS`` üst sınırdır; analizin kalan süresi daha
+    kısaysa o kullanılır. Süre yukarı yuvarlanır ki yakın deadline'lı task'lar
+    aynı önbellekteki istemciyi paylaşsın.
+    """
+    try:
+        limit = int(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", str(DEFAULT_LLM_REQUEST_TIMEOUT_SECONDS)))
+    except ValueError:
+        limit = DEFAULT_LLM_REQUEST_TIMEOUT_SECONDS
+    limit = max(MIN_LLM_REQUEST_TIMEOUT_SECONDS, min(limit, MAX_ANALYSIS_DEADLINE_SECONDS))
+    if remaining is None or math.isinf(remaining):
+        return limit
+    bucketed = LLM_TIMEOUT_BUCKET_SECONDS * math.ceil(max(remaining, 1.0) / LLM_TIMEOUT_BUCKET_SECONDS)
+    return max(MIN_LLM_REQUEST_TIMEOUT_SECONDS, min(limit, bucketed))
+
+
+def get_llm(provider: str | None = None, remaining: float | None = None):
+    """Ortam ayarlarına göre LLM istemcisini döndürür.
+
+    İstemciler süreç içinde ayar anahtarına göre önbelleğe alınır; her task'ta
+    yeniden kurulup HTTP bağlantısı açmak yerine aynı nesne kullanılır. Ortam
+    değişkenleri değişirse anahtar da değiştiği için yeni istemci kurulur.
+    ``remaining`` analizin kalan süresidir; istek süre sınırı buna göre seçilir.
+    """
+    provider = (provider if provider is not None else os.getenv("LLM_PROVIDER", "")).strip().lower()
+    env = tuple((name, os.getenv(name, "")) for name in LLM_ENV_KEYS)
+    if provider == "mock":
+        env += tuple(sorted((k, v) for k, v in os.environ.items() if k.startswith("MOCK_LLM_")))
+    return _build_llm(provider, env, llm_request_timeout(remaining))
+
+
+@lru_cache(maxsize=16)
+def _build_llm(provider: str, env: tuple[tuple[str, str], ...], timeout: int):
+    if provider == "mock":
+        from .mock_llm import MockLLM
+
+        return MockLLM.from_env()
+    if provider == "none":
+        return None
+
+    values = dict(env)
+
+    gemini_api_key = values["GEMINI_API_KEY"].strip()
+    vertex_express_api_key = values["VERTEX_EXPRESS_API_KEY"].strip()
+    ollama_base_url = values["OLLAMA_BASE_URL"].strip()
     configured = [
         bool(gemini_api_key),
         bool(vertex_express_api_key),
@@ -76,15 +178,17 @@ def get_llm():
         from langchain_google_genai import ChatGoogleGenerativeAI
 
         return ChatGoogleGenerativeAI(
-            model=os.getenv("GEMINI_MODEL", "gemini-2.5-flash"),
+            model=values["GEMINI_MODEL"] or "gemini-2.5-flash",
             temperature=0.0,
             google_api_key=gemini_api_key,
+            timeout=timeout,
         )
 
     if vertex_express_api_key:
         return VertexExpressLLM(
             api_key=vertex_express_api_key,
-            model=os.getenv("VERTEX_EXPRESS_MODEL", os.getenv("GEMINI_MODEL", "gemini-2.5-flash")),
+            model=values["VERTEX_EXPRESS_MODEL"] or values["GEMINI_MODEL"] or "gemini-2.5-flash",
+            timeout=timeout,
         )
 
     if ollama_base_url:
@@ -92,8 +196,9 @@ def get_llm():
 
         return ChatOllama(
             base_url=ollama_base_url,
-            model=os.getenv("OLLAMA_MODEL", "llama3.1"),
+            model=values["OLLAMA_MODEL"] or "llama3.1",
             temperature=0.0,
+            timeout=timeout,
         )
 
     return None
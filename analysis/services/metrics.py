@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+STAGE_COUNTERS = ("llm_calls", "input_tokens", "output_tokens", "fallback_count")
+
+
+def _empty_counters() -> dict[str, Any]:
+    return {"wall_time_s": 0.0, **{name: 0 for name in STAGE_COUNTERS}}
+
+
+class StageRecorder:
+    def __init__(self, lock: threading.Lock, *targets: dict[str, Any]):
+        self._lock = lock
+        self._targets = targets
+
+    def record_llm_call(self, input_tokens: int = 0, output_tokens: int = 0) -> None:
+        with self._lock:
+            for target in self._targets:
+                target["llm_calls"] += 1
+                target["input_tokens"] += int(input_tokens or 0)
+                target["output_tokens"] += int(output_tokens or 0)
+
+    def record_fallback(self, count: int = 1) -> None:
+        with self._lock:
+            for target in self._targets:
+                target["fallback_count"] += count
+
+
+class PipelineMetrics:
+    def __init__(self, stages: dict[str, dict[str, Any]] | None = None):
+        self._lock = threading.Lock()
+        self.stages: dict[str, dict[str, Any]] = stages or {}
+        self.degradations: list[dict[str, Any]] = []
+
+    def _stage_entry(self, name: str) -> dict[str, Any]:
+        with self._lock:
+            return self.stages.setdefault(name, _empty_counters())
+
+    def recorder(self, name: str) -> StageRecorder:
+        return StageRecorder(self._lock, self._stage_entry(name))
+
+    def add_wall_time(self, name: str, seconds: float) -> None:
+        entry = self._stage_entry(name)
+        with self._lock:
+            entry["wall_time_s"] = round(entry["wall_time_s"] + seconds, 3)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecorder]:
+        entry = self._stage_entry(name)
+        started = time.perf_counter()
+        try:
+            yield StageRecorder(self._lock, entry)
+        finally:
+            with self._lock:
+                entry["wall_time_s"] = round(entry["wall_time_s"] + time.perf_counter() - started, 3)
+
+    @contextmanager
+    def batch(self, stage_name: str, index: int, size: int) -> Iterator[StageRecorder]:
+        stage_entry = self._stage_entry(stage_name)
+        batch_entry = {"index": index, "size": size, **_empty_counters()}
+        started = time.perf_counter()
+        try:
+            yield StageRecorder(self._lock, stage_entry, batch_entry)
+        finally:
+            with self._lock:
+                batch_entry["wall_time_s"] = round(time.perf_counter() - started, 3)
+                stage_entry.setdefault("batches", []).append(batch_entry)
+
+    def record_degradation(self, stage: str, action: str, **detail: Any) -> None:
+        with self._lock:
+            self.degradations.append({"stage": stage, "action": action, **detail})
+
+    def merge(self, other: "PipelineMetrics | dict[str, Any]") -> None:
+        if isinstance(other, PipelineMetrics):
+            stages, degradations = other.stages, other.degradations
+        else:
+            stages, degradations = other.get("stages", {}), other.get("degradations", [])
+        with self._lock:
+            self.degradations.extend(degradations)
+            for name, incoming in stages.items():
+                entry = self.stages.setdefault(name, _empty_counters())
+                entry["wall_time_s"] = round(entry["wall_time_s"] + incoming.get("wall_time_s", 0.0), 3)
+                for counter in STAGE_COUNTERS:
+                    entry[counter] += incoming.get(counter, 0)
+                if incoming.get("batches"):
+                    entry.setdefault("batches", []).extend(incoming["batches"])
+                    entry["batches"].sort(key=lambda b: b["index"])
+
+    def totals(self) -> dict[str, Any]:
+        with self._lock:
+            totals = _empty_counters()
+            for entry in self.stages.values():
+                totals["wall_time_s"] += entry["wall_time_s"]
+                for counter in STAGE_COUNTERS:
+                    totals[counter] += entry[counter]
+        totals["wall_time_s"] = round(totals["wall_time_s"], 3)
+
+        try:
+            input_cost = float(os.getenv("LLM_INPUT_COST_PER_1K_TOKENS", "0"))
+            output_cost = float(os.getenv("LLM_OUTPUT_COST_PER_1K_TOKENS", "0"))
+        except ValueError:
+            input_cost = output_cost = 0.0
+        if input_cost or output_cost:
+            totals["estimated_cost"] = round(
+                totals["input_tokens"] / 1000 * input_cost + totals["output_tokens"] / 1000 * output_cost,
+                6,
+            )
+        return totals
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            stages = {name: dict(entry) for name, entry in self.stages.items()}
+            degradations = list(self.degradations)
+        return {"stages": stages, "totals": self.totals(), "degradations": degradations}
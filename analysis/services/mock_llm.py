@@ -0,0 +1,180 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from typing import Any
+
+from .sentiment import dummy_sentiment_model
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = {"fixed", "uniform", "normal", "lognormal"}
+
+
+class MockLLMError(RuntimeError):
+    pass
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class MockLLM:
+    """Ağ gerektirmeyen, deterministik LLM sağlayıcısı.
+
+    Aynı prompt ve seed için her zaman aynı çıktıyı, aynı gecikmeyi ve aynı hata
+    kararını üretir; çağrı sırası ya da thread sayısı sonucu değiştirmez. Bu sayede
+    eşzamanlılık, batch ve cache değişiklikleri tekrarlanabilir biçimde ölçülebilir.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        distribution: str = "fixed",
+        error_rate: float = 0.0,
+        tokens_per_second: float = 0.0,
+        seed: int = 0,
+    ):
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Bilinmeyen gecikme dağılımı: {distribution}")
+        self.latency_ms = max(0.0, latency_ms)
+        self.jitter_ms = max(0.0, jitter_ms)
+        self.distribution = distribution
+        self.error_rate = max(0.0, min(error_rate, 1.0))
+        self.tokens_per_second = max(0.0, tokens_per_second)
+        self.seed = seed
+
+    @classmethod
+    def from_env(cls) -> "MockLLM":
+        distribution = os.getenv("MOCK_LLM_LATENCY_DISTRIBUTION", "fixed").strip().lower()
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            logger.warning("MOCK_LLM_LATENCY_DISTRIBUTION=%s tanınmadı, 'fixed' kullanılacak.", distribution)
+            distribution = "fixed"
+        return cls(
+            latency_ms=_env_float("MOCK_LLM_LATENCY_MS", 0.0),
+            jitter_ms=_env_float("MOCK_LLM_LATENCY_JITTER_MS", 0.0),
+            distribution=distribution,
+            error_rate=_env_float("MOCK_LLM_ERROR_RATE", 0.0),
+            tokens_per_second=_env_float("MOCK_LLM_TOKENS_PER_SECOND", 0.0),
+            seed=int(_env_float("MOCK_LLM_SEED", 0)),
+        )
+
+    def _rng(self, prompt_text: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}:{prompt_text}".encode("utf-8")).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    def _first_token_delay(self, rng: random.Random) -> float:
+        base = self.latency_ms
+        if self.distribution == "uniform":
+            base = rng.uniform(base - self.jitter_ms, base + self.jitter_ms)
+        elif self.distribution == "normal":
+            base = rng.gauss(base, self.jitter_ms)
+        elif self.distribution == "lognormal" and base > 0:
+            sigma = self.jitter_ms / base if self.jitter_ms else 0.25
+            base = rng.lognormvariate(0.0, sigma) * base
+        return max(0.0, base) / 1000
+
+    @staticmethod
+    def count_tokens(text: str) -> int:
+        return max(1, len(text) // 4)
+
+    def _prepare(self, prompt_text: str) -> str:
+        rng = self._rng(prompt_text)
+        delay = self._first_token_delay(rng)
+        failed = rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise MockLLMError("Mock LLM yapılandırılmış hata oranı nedeniyle başarısız oldu.")
+        return self._respond(prompt_text, rng)
+
+    def generate_text(self, prompt_text: str) -> str:
+        return self.generate_text_with_usage(prompt_text)[0]
+
+    def generate_text_with_usage(self, prompt_text: str) -> tuple[str, dict[str, int]]:
+        text = self._prepare(prompt_text)
+        output_tokens = self.count_tokens(text)
+        # Callers take the whole response, so generation time is simulated
+        # as one delay after the first token rather than a token stream.
+        if self.tokens_per_second:
+            time.sleep(output_tokens / self.tokens_per_second)
+        return text, {"input_tokens": self.count_tokens(prompt_text), "output_tokens": output_tokens}
+
+    def _respond(self, prompt_text: str, rng: random.Random) -> str:
+        data = _extract_prompt_data(prompt_text)
+        if isinstance(data, list):
+            return _classification_response(data, rng)
+        if isinstance(data, dict) and "theme" in data:
+            return _theme_summary_response(data)
+        if isinstance(data, dict):
+            return _report_response(data)
+        return "Mock LLM yanıtı."
+
+
+def _extract_prompt_data(prompt_text: str) -> Any:
+    _, marker, tail = prompt_text.rpartition("Veri:")
+    if not marker:
+        return None
+    try:
+        return json.loads(tail.strip())
+    except json.JSONDecodeError:
+        return None
+
+
+def _classification_response(rows: list[Any], rng: random.Random) -> str:
+    results = []
+    for row in rows:
+        if not isinstance(row, dict) or "index" not in row:
+            continue
+        sentiment, score = dummy_sentiment_model(str(row.get("text", "")))
+        results.append(
+            {
+                "index": row["index"],
+                "sentiment": sentiment,
+                "score": round(min(1.0, score + rng.uniform(0.0, 0.25)), 4),
+            }
+        )
+    return json.dumps({"results": results}, ensure_ascii=False)
+
+
+def _theme_summary_response(data: dict[str, Any]) -> str:
+    distribution = data.get("sentiment_distribution", {})
+    evidence = data.get("evidence", [])
+    sample = evidence[0]["text"][:120] if evidence else "örnek yok"
+    return (
+        f"{data.get('theme', 'genel')} teması {data.get('comment_count', 0)} yorumda geçiyor "
+        f"(Negatif/Nötr/Pozitif: {distribution.get('Negatif', 0)}/{distribution.get('Nötr', 0)}/"
+        f"{distribution.get('Pozitif', 0)}). Örnek: {sample}"
+    )
+
+
+def _report_response(data: dict[str, Any]) -> str:
+    distribution = data.get("sentiment_distribution", {})
+    duplicates = data.get("duplicate_comment_insights", {})
+    theme_lines = [f"- {theme}: {text[:160]}" for theme, text in sorted(data.get("theme_summaries", {}).items())]
+    negative = ", ".join(data.get("negative_keywords", [])) or "belirgin negatif tema yok"
+    positive = ", ".join(data.get("positive_keywords", [])) or "belirgin pozitif tema yok"
+    return "\n".join(
+        [
+            "1) Şikayet Nedenleri",
+            f"- Anahtar kelimeler: {negative}",
+            "2) Memnuniyet Nedenleri",
+            f"- Anahtar kelimeler: {positive}",
+            *theme_lines,
+            "3) Tekrarlanan Yorum ve Bot Şüphesi",
+            f"- {duplicates.get('repeated_comment_groups', 0)} farklı yorum, "
+            f"toplam {duplicates.get('repeated_comment_instances', 0)} tekrar.",
+            "4) Satın Alma Önerisi",
+            "- Mock sağlayıcı: öneri üretilmedi.",
+            "5) Kısa Özet",
+            f"- {data.get('total_comments', 0)} yorum değerlendirildi.",
+            "6) Dağılım",
+            f"Negatif/Nötr/Pozitif: {distribution.get('Negatif', 0)}/{distribution.get('Nötr', 0)}/{distribution.get('Pozitif', 0)}",
+        ]
+    )
@@ -1,3 +1,7 @@
+import math
+import os
+import time
+from collections.abc import Callable
 from typing import Any
 
 from .comments import (
@@ -7,16 +11,106 @@ from .comments import (
     prepare_comments_for_model,
     scrape_comments_by_domain,
 )
+from .constants import DEFAULT_DEADLINE_CLASSIFY_CONCURRENCY, DEFAULT_DECISION_SHORTLIST_SIZE
+from .deadline import Deadline
+from .metrics import PipelineMetrics
 from .summary import build_langchain_summary
-from .sentiment import classify_comments
+from .sentiment import classify_batch_size, classify_comments
 
 
-def execute_analysis_pipeline(url: str, max_reviews: int, shortlist_size: int | None = None) -> tuple[dict[str, Any], str]:
-    scraped_comments = scrape_comments_by_domain(url=url, max_comments=max_reviews)
-    comments = prepare_comments_for_model(scraped_comments, max_comments=max_reviews)
-    repeat_counts = normalized_repeat_counts(scraped_comments)
-    duplicate_insights = duplicate_comment_insights(scraped_comments)
-    selected_comments, selection_insights = build_decision_comment_shortlist(comments, repeat_counts, shortlist_size=shortlist_size)
+def scrape_stage(
+    url: str,
+    max_reviews: int,
+    metrics: PipelineMetrics,
+    progress_callback: Callable[[int], None] | None = None,
+    deadline: Deadline | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> list[str]:
+    time_budget = deadline.scrape_budget() if deadline is not None else None
+    started = time.monotonic()
+    with metrics.stage("scrape"):
+        comments = scrape_comments_by_domain(
+            url=url,
+            max_comments=max_reviews,
+            progress_callback=progress_callback,
+            time_budget=time_budget,
+            should_stop=should_stop,
+        )
+    if time_budget is not None and len(comments) < max_reviews and time.monotonic() - started >= time_budget * 0.95:
+        metrics.record_degradation(
+            "scrape",
+            "stopped_early",
+            time_budget_s=round(time_budget, 1),
+            reviews_scraped=len(comments),
+            max_reviews=max_reviews,
+        )
+    return comments
+
+
+def resolve_shortlist_size(shortlist_size: int | None) -> int:
+    if shortlist_size is not None:
+        return shortlist_size
+    try:
+        return int(os.getenv("DECISION_SHORTLIST_SIZE", str(DEFAULT_DECISION_SHORTLIST_SIZE)))
+    except ValueError:
+        return DEFAULT_DECISION_SHORTLIST_SIZE
+
+
+def fit_shortlist_to_deadline(
+    shortlist_size: int | None,
+    metrics: PipelineMetrics,
+    deadline: Deadline | None,
+    parallelism: int,
+) -> int | None:
+    if deadline is None:
+        return shortlist_size
+    capacity = deadline.classify_capacity(parallelism, classify_batch_size())
+    shortlist_size = resolve_shortlist_size(shortlist_size)
+    if capacity is None or capacity >= shortlist_size:
+        return shortlist_size
+    # The shortlist is clamped to at least 80 comments; batches that still do
+    # not fit fall back to keyword classification when the deadline hits.
+    applied = max(80, capacity)
+    metrics.record_degradation("shortlist", "shortlist_reduced", requested=shortlist_size, applied=applied)
+    return applied
+
+
+def fit_batch_size_to_deadline(
+    comment_count: int,
+    metrics: PipelineMetrics,
+    deadline: Deadline | None,
+    parallelism: int,
+) -> int:
+    batch_size = classify_batch_size()
+    if deadline is None or not comment_count:
+        return batch_size
+    capacity = deadline.classify_capacity(parallelism, batch_size)
+    if capacity is None or capacity >= comment_count * 2:
+        return batch_size
+    # Smaller batches spread the work over every available LLM worker and
+    # shorten each call, trading a few extra prompts for latency.
+    applied = max(10, math.ceil(comment_count / max(1, parallelism)))
+    if applied < batch_size:
+        metrics.record_degradation("classify", "batch_size_reduced", requested=batch_size, applied=applied)
+        return applied
+    return batch_size
+
+
+def prepare_stage(
+    scraped_comments: list[str],
+    max_reviews: int,
+    shortlist_size: int | None,
+    metrics: PipelineMetrics,
+    deadline: Deadline | None = None,
+    parallelism: int = 1,
+) -> dict[str, Any]:
+    shortlist_size = fit_shortlist_to_deadline(shortlist_size, metrics, deadline, parallelism)
+    with metrics.stage("prepare"):
+        comments = prepare_comments_for_model(scraped_comments, max_comments=max_reviews)
+        repeat_counts = normalized_repeat_counts(scraped_comments)
+        duplicate_insights = duplicate_comment_insights(scraped_comments)
+    with metrics.stage("shortlist"):
+        selected_comments, selection_insights = build_decision_comment_shortlist(comments, repeat_counts, shortlist_size=shortlist_size)
     if not comments:
         raise RuntimeError("Yorumlar alındı ancak model için uygun yorum bulunamadı. CSS selector ve filtreleri kontrol edin.")
     if not selected_comments:
@@ -30,22 +124,86 @@ def execute_analysis_pipeline(url: str, max_reviews: int, shortlist_size: int |
             "top_decision_comments": [],
         }
 
-    classified = classify_comments(selected_comments)
-    summary = build_langchain_summary(
-        classified,
-        duplicate_insights=duplicate_insights,
-        selection_insights=selection_insights,
-    )
-
-    raw_payload: dict[str, Any] = {
+    return {
         "scraped_count": len(scraped_comments),
         "prepared_count": len(comments),
         "selected_count": len(selected_comments),
-        "filtered_out_count": max(len(scraped_comments) - len(comments), 0),
+        "selected_comments": selected_comments,
+        "duplicate_insights": duplicate_insights,
+        "selection_insights": selection_insights,
+    }
+
+
+def summarize_stage(
+    corpus: dict[str, Any],
+    classified: list[dict[str, Any]],
+    metrics: PipelineMetrics,
+    deadline: Deadline | None = None,
+) -> tuple[dict[str, Any], str]:
+    mode = deadline.summary_mode() if deadline is not None else "full"
+    if mode == "reduce":
+        metrics.record_degradation("summary", "theme_map_skipped", remaining_s=round(deadline.remaining(), 1))
+    elif mode == "fallback":
+        metrics.record_degradation("summary", "llm_skipped", remaining_s=round(deadline.remaining(), 1))
+
+    with metrics.stage("summary"):
+        summary = build_langchain_summary(
+            classified,
+            duplicate_insights=corpus["duplicate_insights"],
+            selection_insights=corpus["selection_insights"],
+            metrics=metrics,
+            mode=mode,
+            remaining=deadline.remaining() if deadline is not None else None,
+        )
+
+    raw_payload: dict[str, Any] = {
+        "scraped_count": corpus["scraped_count"],
+        "prepared_count": corpus["prepared_count"],
+        "selected_count": corpus["selected_count"],
+        "filtered_out_count": max(corpus["scraped_count"] - corpus["prepared_count"], 0),
         "comment_count": len(classified),
         "comments": classified,
-        "duplicate_comment_insights": duplicate_insights,
-        "decision_comment_selection": selection_insights,
+        "duplicate_comment_insights": corpus["duplicate_insights"],
+        "decision_comment_selection": corpus["selection_insights"],
+        "degradations": list(metrics.degradations),
     }
     return raw_payload, summary
 
+
+def execute_analysis_pipeline(
+    url: str,
+    max_reviews: int,
+    shortlist_size: int | None = None,
+    metrics: PipelineMetrics | None = None,
+    deadline_seconds: float | None = None,
+) -> tuple[dict[str, Any], str]:
+    metrics = metrics if metrics is not None else PipelineMetrics()
+    deadline = Deadline.after(deadline_seconds) if deadline_seconds else None
+
+    scraped_comments = scrape_stage(url, max_reviews, metrics, deadline=deadline)
+
+    # Offline runs classify sequentially; under a tight deadline the batches
+    # are sent concurrently instead.
+    parallelism = 1
+    if deadline is not None:
+        sequential_capacity = deadline.classify_capacity(1, classify_batch_size())
+        if sequential_capacity is not None and sequential_capacity < resolve_shortlist_size(shortlist_size):
+            try:
+                parallelism = int(os.getenv("DEADLINE_CLASSIFY_CONCURRENCY", str(DEFAULT_DEADLINE_CLASSIFY_CONCURRENCY)))
+            except ValueError:
+                parallelism = DEFAULT_DEADLINE_CLASSIFY_CONCURRENCY
+            parallelism = max(1, min(parallelism, 16))
+            if parallelism > 1:
+                metrics.record_degradation("classify", "concurrency_raised", applied=parallelism)
+
+    corpus = prepare_stage(scraped_comments, max_reviews, shortlist_size, metrics, deadline=deadline, parallelism=parallelism)
+    batch_size = fit_batch_size_to_deadline(corpus["selected_count"], metrics, deadline, parallelism)
+    with metrics.stage("classify"):
+        classified = classify_comments(
+            corpus["selected_comments"],
+            metrics=metrics,
+            batch_size=batch_size,
+            concurrency=parallelism,
+            deadline=deadline,
+        )
+    return summarize_stage(corpus, classified, metrics, deadline=deadline)
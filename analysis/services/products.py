@@ -0,0 +1,26 @@
+import re
+from urllib.parse import urlparse
+
+TRENDYOL_PRODUCT_RE = re.compile(r"-p-(\d+)")
+HEPSIBURADA_PRODUCT_RE = re.compile(r"-p(?:m)?-([A-Za-z0-9]+?)(?:-yorumlari)?(?:/|$)")
+
+
+def canonical_product_key(url: str) -> str:
+    """Aynı ürünü gösteren farklı linkler için ortak anahtar üretir.
+
+    Trendyol için ``trendyol:<içerik id>``, Hepsiburada için ``hepsiburada:<SKU>``
+    döner; tanınmayan linklerde sorgu parametreleri atılmış host + path kullanılır.
+    """
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower().removeprefix("www.")
+    path = parsed.path.rstrip("/")
+
+    if host.endswith("trendyol.com"):
+        match = TRENDYOL_PRODUCT_RE.search(path.removesuffix("/yorumlar"))
+        if match:
+            return f"trendyol:{match.group(1)}"
+    if host.endswith("hepsiburada.com"):
+        match = HEPSIBURADA_PRODUCT_RE.search(path + "/")
+        if match:
+            return f"hepsiburada:{match.group(1).upper()}"
+    return f"{host}{path.lower()}"
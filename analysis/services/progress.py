@@ -0,0 +1,212 @@
+import asyncio
+import json
+import logging
+import time
+import weakref
+from typing import Any
+
+import redis
+from django.conf import settings
+
+from .constants import PROGRESS_LISTENER_QUEUE_SIZE
+from .redis_client import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_KEY = "analysis:progress:{analysis_id}"
+PROGRESS_CHANNEL = "analysis:progress:{analysis_id}:events"
+
+INT_FIELDS = {
+    "reviews_scraped",
+    "comments_prepared",
+    "comments_selected",
+    "batches_total",
+    "batches_done",
+}
+
+
+def progress_key(analysis_id: str) -> str:
+    return PROGRESS_KEY.format(analysis_id=analysis_id)
+
+
+def progress_channel(analysis_id: str) -> str:
+    return PROGRESS_CHANNEL.format(analysis_id=analysis_id)
+
+
+def decode_progress(raw: dict[str, str]) -> dict[str, Any]:
+    record: dict[str, Any] = {}
+    for field, value in raw.items():
+        if field in INT_FIELDS:
+            try:
+                record[field] = int(value)
+            except ValueError:
+                record[field] = 0
+        elif field == "updated_at":
+            record[field] = float(value)
+        elif field == "summary_started":
+            record[field] = value == "1"
+        else:
+            record[field] = value
+    return record
+
+
+def _encode(fields: dict[str, Any]) -> dict[str, str]:
+    encoded: dict[str, str] = {}
+    for field, value in fields.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = "1" if value else "0"
+        encoded[field] = str(value)
+    return encoded
+
+
+def _emit(analysis_id: str, pipe_ops, task=None) -> dict[str, Any] | None:
+    try:
+        client = get_redis()
+        key = progress_key(analysis_id)
+        pipe = client.pipeline()
+        pipe_ops(pipe, key)
+        pipe.hset(key, "updated_at", f"{time.time():.3f}")
+        pipe.expire(key, settings.ANALYSIS_PROGRESS_TTL_SECONDS)
+        pipe.hgetall(key)
+        record = decode_progress(pipe.execute()[-1])
+        record["analysis_id"] = analysis_id
+        client.publish(progress_channel(analysis_id), json.dumps(record, ensure_ascii=False))
+    except redis.RedisError as exc:
+        # Progress is best-effort; it must never fail the analysis itself.
+        logger.warning("Progress update failed for %s: %s", analysis_id, exc)
+        return None
+
+    if task is not None and getattr(task.request, "id", None):
+        try:
+            task.update_state(state="PROGRESS", meta=record)
+        except Exception as exc:
+            logger.warning("Task state update failed for %s: %s", analysis_id, exc)
+    return record
+
+
+def publish_progress(analysis_id: str, stage: str | None = None, task=None, **fields: Any) -> dict[str, Any] | None:
+    if stage is not None:
+        fields["stage"] = stage
+    encoded = _encode(fields)
+    return _emit(analysis_id, lambda pipe, key: pipe.hset(key, mapping=encoded), task=task)
+
+
+def increment_progress(analysis_id: str, field: str, amount: int = 1, task=None) -> dict[str, Any] | None:
+    return _emit(analysis_id, lambda pipe, key: pipe.hincrby(key, field, amount), task=task)
+
+
+def _progress_record(analysis_id: str, raw: dict[str, str]) -> dict[str, Any] | None:
+    if not raw:
+        return None
+    record = decode_progress(raw)
+    record["analysis_id"] = analysis_id
+    return record
+
+
+def get_progress(analysis_id: str) -> dict[str, Any] | None:
+    try:
+        raw = get_redis().hgetall(progress_key(analysis_id))
+    except redis.RedisError as exc:
+        logger.warning("Progress read failed for %s: %s", analysis_id, exc)
+        return None
+    return _progress_record(analysis_id, raw)
+
+
+async def aget_progress(analysis_id: str) -> dict[str, Any] | None:
+    try:
+        raw = await get_async_redis().hgetall(progress_key(analysis_id))
+    except redis.RedisError as exc:
+        logger.warning("Progress read failed for %s: %s", analysis_id, exc)
+        return None
+    return _progress_record(analysis_id, raw)
+
+
+# Put on a watcher's queue when the shared subscription drops.
+SUBSCRIPTION_LOST = object()
+
+
+class ProgressListener:
+    """Bir event loop'taki tüm izleyiciler için tek pub/sub bağlantısı.
+
+    Bir analizin kanalına ilk izleyici gelince abone olunur, son izleyici
+    ayrılınca abonelik bırakılır; gelen olaylar izleyicilerin kuyruklarına
+    dağıtılır. Böylece bekleyen istemci sayısı Redis bağlantı sayısını büyütmez.
+    """
+
+    def __init__(self) -> None:
+        self._pubsub = None
+        self._queues: dict[str, set[asyncio.Queue]] = {}
+        self._reader: asyncio.Task | None = None
+
+    async def subscribe(self, analysis_id: str) -> asyncio.Queue:
+        channel = progress_channel(analysis_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=PROGRESS_LISTENER_QUEUE_SIZE)
+        if self._pubsub is None:
+            self._pubsub = get_async_redis().pubsub()
+        watchers = self._queues.setdefault(channel, set())
+        watchers.add(queue)
+        if len(watchers) == 1:
+            try:
+                await self._pubsub.subscribe(channel)
+            except redis.RedisError:
+                self._discard(channel, queue)
+                raise
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+        return queue
+
+    async def unsubscribe(self, analysis_id: str, queue: asyncio.Queue) -> None:
+        channel = progress_channel(analysis_id)
+        if self._discard(channel, queue) and self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(channel)
+            except redis.RedisError as exc:
+                logger.warning("Progress unsubscribe failed for %s: %s", analysis_id, exc)
+
+    def _discard(self, channel: str, queue: asyncio.Queue) -> bool:
+        watchers = self._queues.get(channel)
+        if watchers is None:
+            return False
+        watchers.discard(queue)
+        if watchers:
+            return False
+        del self._queues[channel]
+        return True
+
+    async def _read(self) -> None:
+        try:
+            while self._queues:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None:
+                    continue
+                for queue in list(self._queues.get(message["channel"], ())):
+                    if queue.full():
+                        # A stalled watcher only loses its oldest events.
+                        queue.get_nowait()
+                    queue.put_nowait(message["data"])
+        except redis.RedisError as exc:
+            logger.warning("Progress subscription lost: %s", exc)
+            pubsub, self._pubsub = self._pubsub, None
+            for watchers in self._queues.values():
+                for queue in watchers:
+                    if queue.full():
+                        queue.get_nowait()
+                    queue.put_nowait(SUBSCRIPTION_LOST)
+            self._queues.clear()
+            try:
+                await pubsub.aclose()
+            except redis.RedisError:
+                pass
+
+
+_listeners: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ProgressListener]" = weakref.WeakKeyDictionary()
+
+
+def progress_listener() -> ProgressListener:
+    loop = asyncio.get_running_loop()
+    listener = _listeners.get(loop)
+    if listener is None:
+        listener = _listeners[loop] = ProgressListener()
+    return listener
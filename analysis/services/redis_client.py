@@ -0,0 +1,63 @@
+import asyncio
+import os
+import weakref
+from functools import lru_cache
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+from .constants import DEFAULT_ASYNC_REDIS_MAX_CONNECTIONS
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
+
+@lru_cache(maxsize=1)
+def get_redis() -> redis.Redis:
+    return redis.Redis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        socket_connect_timeout=2,
+        socket_timeout=2,
+        health_check_interval=30,
+    )
+
+
+def _async_max_connections() -> int:
+    try:
+        value = int(os.getenv("ASYNC_REDIS_MAX_CONNECTIONS", str(DEFAULT_ASYNC_REDIS_MAX_CONNECTIONS)))
+    except ValueError:
+        value = DEFAULT_ASYNC_REDIS_MAX_CONNECTIONS
+    return max(2, min(value, 1000))
+
+
+def get_async_redis() -> aioredis.Redis:
+    # asyncio connections belong to the loop that opened them, so each loop
+    # gets its own pool. No socket timeout: pub/sub reads wait on purpose.
+    # The pool is bounded; callers wait briefly for a free connection.
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        pool = aioredis.BlockingConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=_async_max_connections(),
+            timeout=2,
+            decode_responses=True,
+            socket_connect_timeout=2,
+            health_check_interval=30,
+        )
+        client = aioredis.Redis(connection_pool=pool)
+        _async_clients[loop] = client
+    return client
+
+
+@lru_cache(maxsize=1)
+def get_broker_redis() -> redis.Redis:
+    # Queue lengths live on the broker, which may be a different Redis/database.
+    return redis.Redis.from_url(
+        settings.CELERY_BROKER_URL,
+        decode_responses=True,
+        socket_connect_timeout=2,
+        socket_timeout=2,
+        health_check_interval=30,
+    )
@@ -0,0 +1,55 @@
+import logging
+import os
+
+import redis
+
+from .constants import DEFAULT_RESULT_CACHE_MAX_BYTES, DEFAULT_RESULT_CACHE_TTL_SECONDS
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# One hash per analysis, one field per requested field selection, so a single
+# DEL drops every cached variant.
+RESULT_KEY = "analysis:result:{analysis_id}"
+
+
+def result_key(analysis_id: str) -> str:
+    return RESULT_KEY.format(analysis_id=analysis_id)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def get_cached_result(analysis_id: str, variant: str) -> bytes | None:
+    try:
+        body = get_redis().hget(result_key(analysis_id), variant)
+    except redis.RedisError as exc:
+        logger.warning("Result cache read failed for %s: %s", analysis_id, exc)
+        return None
+    return body.encode("utf-8") if body is not None else None
+
+
+def cache_result(analysis_id: str, variant: str, body: bytes) -> None:
+    """Tamamlanmış analizin kodlanmış yanıtını saklar; çok büyük gövdeler atlanır."""
+    ttl = _env_int("RESULT_CACHE_TTL_SECONDS", DEFAULT_RESULT_CACHE_TTL_SECONDS)
+    if not ttl or len(body) > _env_int("RESULT_CACHE_MAX_BYTES", DEFAULT_RESULT_CACHE_MAX_BYTES):
+        return
+    key = result_key(analysis_id)
+    try:
+        pipe = get_redis().pipeline()
+        pipe.hset(key, variant, body.decode("utf-8"))
+        pipe.expire(key, ttl)
+        pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("Result cache write failed for %s: %s", analysis_id, exc)
+
+
+def invalidate_result(analysis_id: str) -> None:
+    try:
+        get_redis().delete(result_key(analysis_id))
+    except redis.RedisError as exc:
+        logger.warning("Result cache invalidation failed for %s: %s", analysis_id, exc)
@@ -0,0 +1,217 @@
+import hashlib
+from collections import Counter
+from typing import Any
+from urllib.parse import urlparse
+
+from django.db.models import Count
+
+from ..models import Analysis, ClassifiedComment, Product, Review
+from .checkpoints import load_batch_checkpoints
+from .cold_storage import archived_comments
+from .comments import detect_comment_theme, normalize_for_dedup
+from .constants import COMMENT_BULK_BATCH_SIZE, DEFAULT_COMMENT_PAGE_SIZE
+from .products import canonical_product_key
+
+
+def review_dedup_key(text: str) -> str:
+    return hashlib.sha1(normalize_for_dedup(text).encode("utf-8")).hexdigest()
+
+
+def review_text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def product_for_analysis(analysis: Analysis) -> Product:
+    key = analysis.product_key or canonical_product_key(analysis.url)
+    domain = urlparse(analysis.url).netloc.lower().removeprefix("www.")
+    product, _ = Product.objects.get_or_create(key=key, defaults={"domain": domain, "url": analysis.url})
+    return product
+
+
+def _review_ids(product: Product, reviews: dict[str, tuple[str, str]]) -> dict[str, int]:
+    hashes = list(reviews)
+    Review.objects.bulk_create(
+        [
+            Review(product=product, text_hash=text_hash, dedup_key=reviews[text_hash][0], text=reviews[text_hash][1])
+            for text_hash in hashes
+        ],
+        batch_size=COMMENT_BULK_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    # ignore_conflicts leaves the primary keys unset, so they are read back.
+    review_ids: dict[str, int] = {}
+    for start in range(0, len(hashes), COMMENT_BULK_BATCH_SIZE):
+        chunk = hashes[start:start + COMMENT_BULK_BATCH_SIZE]
+        review_ids.update(
+            Review.objects.filter(product=product, text_hash__in=chunk).values_list("text_hash", "id")
+        )
+    return review_ids
+
+
+def store_classified_comments(analysis: Analysis, raw_payload: dict[str, Any]) -> dict[str, Any]:
+    """Sınıflandırılmış yorumları Review/ClassifiedComment satırlarına yazar.
+
+    Aynı ürünün tekrar analizlerinde birebir aynı yorum metni bir kez saklanır;
+    analiz yeniden sonuçlanırsa önceki satırları silinip baştan yazılır. Dönen
+    payload yorum listesi yerine yalnızca dağılım özetlerini taşır.
+    """
+    classified = raw_payload.get("comments", [])
+    rows = [
+        (review_dedup_key(item["text"]), detect_comment_theme(item["text"].lower()), item)
+        for item in classified
+    ]
+    reviews: dict[str, tuple[str, str]] = {}
+    for key, _, item in rows:
+        reviews.setdefault(review_text_hash(item["text"]), (key, item["text"]))
+    review_ids = _review_ids(product_for_analysis(analysis), reviews)
+
+    ClassifiedComment.objects.filter(analysis=analysis).delete()
+    ClassifiedComment.objects.bulk_create(
+        [
+            ClassifiedComment(
+                analysis=analysis,
+                review_id=review_ids[review_text_hash(item["text"])],
+                position=position,
+                sentiment=item["sentiment"],
+                score=float(item.get("score") or 0.0),
+                theme=theme,
+                dedup_key=key,
+            )
+            for position, (key, theme, item) in enumerate(rows)
+        ],
+        batch_size=COMMENT_BULK_BATCH_SIZE,
+    )
+
+    compact = {key: value for key, value in raw_payload.items() if key != "comments"}
+    compact.update(comment_distributions([(item["sentiment"], theme) for _, theme, item in rows]))
+    return compact
+
+
+def comment_distributions(labels: list[tuple[str, str]]) -> dict[str, dict[str, int]]:
+    sentiments = Counter(sentiment for sentiment, _ in labels)
+    return {
+        "sentiment_distribution": {label: sentiments.get(label, 0) for label in ClassifiedComment.Sentiment.values},
+        "theme_distribution": dict(Counter(theme for _, theme in labels)),
+    }
+
+
+def inline_distributions(raw_comments: dict[str, Any]) -> dict[str, dict[str, int]]:
+    """Dağılımları eski (yorum listesi gömülü) kayıtlar için yeniden hesaplar."""
+    if "sentiment_distribution" in raw_comments:
+        return {
+            "sentiment_distribution": raw_comments["sentiment_distribution"],
+            "theme_distribution": raw_comments.get("theme_distribution", {}),
+        }
+    comments = raw_comments.get("comments", [])
+    return comment_distributions([(item["sentiment"], detect_comment_theme(item["text"].lower())) for item in comments])
+
+
+def sentiment_theme_breakdown(analysis: Analysis) -> dict[str, dict[str, int]]:
+    """Her sentiment için tema sayılarını çoktan aza sıralı döndürür."""
+    comments = _stored_comment_list(analysis)
+    if comments is not None:
+        counts = Counter(
+            (item["sentiment"], item.get("theme") or detect_comment_theme(item["text"].lower())) for item in comments
+        )
+    else:
+        rows = (
+            ClassifiedComment.objects.filter(analysis=analysis)
+            .order_by()
+            .values_list("sentiment", "theme")
+            .annotate(count=Count("id"))
+        )
+        counts = Counter({(sentiment, theme): count for sentiment, theme, count in rows})
+
+    breakdown: dict[str, dict[str, int]] = {label: {} for label in ClassifiedComment.Sentiment.values}
+    for (sentiment, theme), count in counts.most_common():
+        breakdown.setdefault(sentiment, {})[theme] = count
+    return breakdown
+
+
+def partial_distributions(analysis_id: str) -> dict[str, Any]:
+    """Devam eden analizde biten sınıflandırma batch'lerinden ara dağılım üretir."""
+    batches = load_batch_checkpoints(analysis_id)
+    results = [item for index in sorted(batches) for item in batches[index].get("results", [])]
+    return {
+        "batches_done": len(batches),
+        "classified_count": len(results),
+        **comment_distributions([(item["sentiment"], detect_comment_theme(item["text"].lower())) for item in results]),
+    }
+
+
+def _stored_comment_list(analysis: Analysis) -> list[dict[str, Any]] | None:
+    # Analyses finished before the comment tables existed still carry the list
+    # inline; archiving moves that list to cold storage, table rows stay put.
+    if "comments" in analysis.raw_comments:
+        return analysis.raw_comments["comments"]
+    if analysis.archived_at is not None:
+        return archived_comments(str(analysis.id))
+    return None
+
+
+def load_classified_comments(analysis: Analysis) -> list[dict[str, Any]]:
+    comments = _stored_comment_list(analysis)
+    if comments is not None:
+        return comments
+    rows = (
+        ClassifiedComment.objects.filter(analysis=analysis)
+        .order_by("position")
+        .values_list("review__text", "sentiment", "score", "theme")
+    )
+    return [{"text": text, "sentiment": sentiment, "score": score, "theme": theme} for text, sentiment, score, theme in rows]
+
+
+def page_classified_comments(
+    analysis: Analysis,
+    after: int = -1,
+    limit: int = DEFAULT_COMMENT_PAGE_SIZE,
+    sentiments: list[str] | None = None,
+    themes: list[str] | None = None,
+    min_score: float | None = None,
+    max_score: float | None = None,
+) -> tuple[list[dict[str, Any]], int | None]:
+    """Yorumları ``position`` üzerinden keyset sayfalama ile döndürür.
+
+    İkinci değer sonraki sayfanın başlayacağı son pozisyondur; sayfa yoksa None.
+    """
+    comments = _stored_comment_list(analysis)
+    if comments is not None:
+        rows = [
+            (
+                position,
+                item["text"],
+                item["sentiment"],
+                float(item.get("score") or 0.0),
+                item.get("theme") or detect_comment_theme(item["text"].lower()),
+            )
+            for position, item in enumerate(comments)
+            if position > after
+        ]
+        rows = [
+            row
+            for row in rows
+            if (not sentiments or row[2] in sentiments)
+            and (not themes or row[4] in themes)
+            and (min_score is None or row[3] >= min_score)
+            and (max_score is None or row[3] <= max_score)
+        ][: limit + 1]
+    else:
+        queryset = ClassifiedComment.objects.filter(analysis=analysis, position__gt=after)
+        if sentiments:
+            queryset = queryset.filter(sentiment__in=sentiments)
+        if themes:
+            queryset = queryset.filter(theme__in=themes)
+        if min_score is not None:
+            queryset = queryset.filter(score__gte=min_score)
+        if max_score is not None:
+            queryset = queryset.filter(score__lte=max_score)
+        rows = list(
+            queryset.order_by("position").values_list("position", "review__text", "sentiment", "score", "theme")[: limit + 1]
+        )
+
+    page = [
+        {"position": position, "text": text, "sentiment": sentiment, "score": score, "theme": theme}
+        for position, text, sentiment, score, theme in rows[:limit]
+    ]
+    next_after = page[-1]["position"] if len(rows) > limit else None
+    return page, next_after
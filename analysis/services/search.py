@@ -0,0 +1,99 @@
+from typing import Any
+
+from django.db import connection
+from django.db.models import Exists, OuterRef, QuerySet
+
+from ..models import ClassifiedComment, Product, Review
+
+SEARCH_CONFIG = "turkish"
+
+
+def _matching_reviews(queryset: QuerySet, query: str) -> QuerySet:
+    if connection.vendor != "postgresql":
+        return queryset.filter(text__icontains=query)
+
+    from django.contrib.postgres.search import SearchQuery, SearchVectorField
+    from django.db.models.expressions import RawSQL
+
+    # The generated column (migration 0010) is not a model field; the GIN index
+    # only applies when the filter reads the column itself.
+    vector = RawSQL(f"{Review._meta.db_table}.search_vector", [], output_field=SearchVectorField())
+    return queryset.alias(search_vector=vector).filter(
+        search_vector=SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+    )
+
+
+def _classification_lookups(
+    sentiments: list[str] | None,
+    themes: list[str] | None,
+    min_score: float | None,
+    max_score: float | None,
+) -> dict[str, Any]:
+    lookups: dict[str, Any] = {}
+    if sentiments:
+        lookups["sentiment__in"] = sentiments
+    if themes:
+        lookups["theme__in"] = themes
+    if min_score is not None:
+        lookups["score__gte"] = min_score
+    if max_score is not None:
+        lookups["score__lte"] = max_score
+    return lookups
+
+
+def search_reviews(
+    query: str,
+    product: Product | None = None,
+    before: int | None = None,
+    limit: int = 50,
+    sentiments: list[str] | None = None,
+    themes: list[str] | None = None,
+    min_score: float | None = None,
+    max_score: float | None = None,
+) -> tuple[list[dict[str, Any]], int | None]:
+    """Saklanan yorum metinlerinde tam metin araması yapar.
+
+    Postgres'te Türkçe kök bulma ile ``websearch`` sözdizimi kullanılır
+    (``"kırık geldi"``, ``kargo -hızlı``). Sonuçlar en yeni yorumdan geriye
+    ``id`` üzerinden keyset sayfalanır; ikinci değer sonraki sayfanın
+    başlayacağı yorum id'sidir, sayfa yoksa None.
+    """
+    lookups = _classification_lookups(sentiments, themes, min_score, max_score)
+
+    queryset = _matching_reviews(Review.objects.all(), query)
+    if product is not None:
+        queryset = queryset.filter(product=product)
+    if before is not None:
+        queryset = queryset.filter(id__lt=before)
+    if lookups:
+        queryset = queryset.filter(Exists(ClassifiedComment.objects.filter(review=OuterRef("pk"), **lookups)))
+
+    rows = list(queryset.order_by("-id").values_list("id", "text", "product__key", "product__url")[: limit + 1])
+    page_rows = rows[:limit]
+
+    # Only the page's reviews need a label: the latest classification that
+    # satisfies the same filters.
+    labels: dict[int, dict[str, Any]] = {}
+    classifications = (
+        ClassifiedComment.objects.filter(review_id__in=[row[0] for row in page_rows], **lookups)
+        .order_by("-id")
+        .values_list("review_id", "analysis_id", "sentiment", "score", "theme")
+    )
+    for review_id, analysis_id, sentiment, score, theme in classifications:
+        labels.setdefault(
+            review_id,
+            {"analysis_id": str(analysis_id), "sentiment": sentiment, "score": score, "theme": theme},
+        )
+
+    page = [
+        {
+            "review_id": review_id,
+            "text": text,
+            "product_key": product_key,
+            "product_url": product_url,
+            "classification": labels.get(review_id),
+        }
+        for review_id, text, product_key, product_url in page_rows
+    ]
+    next_before = page[-1]["review_id"] if len(rows) > limit else None
+    return page, next_before
@@ -1,24 +1,33 @@
 import json
 import logging
 import os
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from .constants import (
+    DEFAULT_LLM_BATCH_SIZE,
+    FALLBACK_NEGATIVE_TERMS,
+    FALLBACK_POSITIVE_TERMS,
+    JSON_FENCE_RE,
+    SENTIMENTS,
+)
+from .llm import get_llm, invoke_llm_with_prompt
 
-from langchain.prompts import PromptTemplate
+if TYPE_CHECKING:
+    from langchain.prompts import PromptTemplate
 
-from .constants import DEFAULT_LLM_BATCH_SIZE, JSON_FENCE_RE, SENTIMENTS
-from .llm import get_llm, invoke_llm_with_prompt
+    from .deadline import Deadline
+    from .metrics import PipelineMetrics, StageRecorder
 
 logger = logging.getLogger(__name__)
 
 
 def dummy_sentiment_model(text: str) -> tuple[str, float]:
     normalized = text.lower()
-    negative_terms = ["kötü", "berbat", "bozuk", "geç", "kırık", "iade", "şikayet"]
-    positive_terms = ["güzel", "mükemmel", "hızlı", "kaliteli", "memnun", "harika", "iyi"]
-
-    if any(t in normalized for t in negative_terms):
+    if any(t in normalized for t in FALLBACK_NEGATIVE_TERMS):
         return "Negatif", 0.70
-    if any(t in normalized for t in positive_terms):
+    if any(t in normalized for t in FALLBACK_POSITIVE_TERMS):
         return "Pozitif", 0.70
     return "Nötr", 0.55
 
@@ -28,9 +37,7 @@ def safe_json_loads(text: str) -> Any:
     return json.loads(candidate)
 
 
-def classify_comments_batch_with_llm(llm, indexed_batch: list[tuple[int, str]]) -> list[dict[str, Any]]:
-    prompt = PromptTemplate.from_template(
-        """
+CLASSIFICATION_TEMPLATE = """
         Aşağıdaki yorumları yalnızca metin içeriğine göre sentiment olarak sınıflandır.
         Zorunlu sentiment etiketleri: Negatif, Nötr, Pozitif.
         Sonucu SADECE geçerli JSON olarak döndür.
@@ -50,10 +57,22 @@ def classify_comments_batch_with_llm(llm, indexed_batch: list[tuple[int, str]])
         Veri:
         {batch_json}
         """
-    )
 
+
+@lru_cache(maxsize=1)
+def classification_prompt() -> "PromptTemplate":
+    from langchain.prompts import PromptTemplate
+
+    return PromptTemplate.from_template(CLASSIFICATION_TEMPLATE)
+
+
+def classify_comments_batch_with_llm(
+    llm,
+    indexed_batch: list[tuple[int, str]],
+    recorder: "StageRecorder | None" = None,
+) -> list[dict[str, Any]]:
     raw = invoke_llm_with_prompt(
-        prompt=prompt,
+        prompt=classification_prompt(),
         llm=llm,
         payload={
             "batch_json": json.dumps(
@@ -61,6 +80,7 @@ def classify_comments_batch_with_llm(llm, indexed_batch: list[tuple[int, str]])
                 ensure_ascii=False,
             )
         },
+        recorder=recorder,
     )
     parsed = safe_json_loads(raw)
     if not isinstance(parsed, dict):
@@ -94,34 +114,82 @@ def classify_comments_batch_with_llm(llm, indexed_batch: list[tuple[int, str]])
             continue
         sentiment, score = dummy_sentiment_model(text)
         results.append({"text": text, "sentiment": sentiment, "score": score})
+        if recorder is not None:
+            recorder.record_fallback()
     return results
 
 
-def classify_comments(comments: list[str]) -> list[dict[str, Any]]:
-    llm = get_llm()
-    if llm is None:
-        fallback: list[dict[str, Any]] = []
-        for text in comments:
-            sentiment, score = dummy_sentiment_model(text)
-            fallback.append({"text": text, "sentiment": sentiment, "score": score})
-        return fallback
+def keyword_fallback_results(texts: list[str]) -> list[dict[str, Any]]:
+    fallback: list[dict[str, Any]] = []
+    for text in texts:
+        sentiment, score = dummy_sentiment_model(text)
+        fallback.append({"text": text, "sentiment": sentiment, "score": score})
+    return fallback
+
 
+def classify_batch_size() -> int:
     try:
         batch_size = int(os.getenv("LLM_CLASSIFY_BATCH_SIZE", str(DEFAULT_LLM_BATCH_SIZE)))
     except ValueError:
         batch_size = DEFAULT_LLM_BATCH_SIZE
-    batch_size = max(10, min(batch_size, 150))
+    return max(10, min(batch_size, 150))
+
+
+def split_into_indexed_batches(comments: list[str], batch_size: int | None = None) -> list[list[tuple[int, str]]]:
+    batch_size = batch_size or classify_batch_size()
+    return [
+        list(enumerate(comments[start : start + batch_size], start=start))
+        for start in range(0, len(comments), batch_size)
+    ]
 
-    output: list[dict[str, Any]] = []
-    for start in range(0, len(comments), batch_size):
-        batch = comments[start : start + batch_size]
-        indexed = list(enumerate(batch, start=start))
-        try:
-            output.extend(classify_comments_batch_with_llm(llm, indexed))
-        except Exception as exc:
-            logger.exception("LLM sentiment batch failed, keyword fallback will be used: %s", exc)
-            for text in batch:
-                sentiment, score = dummy_sentiment_model(text)
-                output.append({"text": text, "sentiment": sentiment, "score": score})
-    return output
 
+def classify_comments(
+    comments: list[str],
+    metrics: "PipelineMetrics | None" = None,
+    batch_size: int | None = None,
+    concurrency: int = 1,
+    deadline: "Deadline | None" = None,
+) -> list[dict[str, Any]]:
+    llm = get_llm(remaining=deadline.remaining() if deadline is not None else None)
+    if llm is None:
+        if metrics is not None:
+            metrics.recorder("classify").record_fallback(len(comments))
+        return keyword_fallback_results(comments)
+
+    def run_batch(batch_index: int, indexed: list[tuple[int, str]]) -> list[dict[str, Any]]:
+        batch_llm = llm
+        if deadline is not None and deadline.classify_budget() <= 0:
+            batch_llm = None
+            if metrics is not None:
+                metrics.record_degradation("classify", "keyword_fallback", batch_index=batch_index, size=len(indexed))
+        if metrics is None:
+            return classify_indexed_batch(batch_llm, indexed)
+        with metrics.batch("classify", index=batch_index, size=len(indexed)) as recorder:
+            return classify_indexed_batch(batch_llm, indexed, recorder=recorder)
+
+    batches = split_into_indexed_batches(comments, batch_size=batch_size)
+    if concurrency <= 1 or len(batches) <= 1:
+        return [item for index, indexed in enumerate(batches) for item in run_batch(index, indexed)]
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as executor:
+        results = list(executor.map(run_batch, range(len(batches)), batches))
+    return [item for batch_results in results for item in batch_results]
+
+
+def classify_indexed_batch(
+    llm,
+    indexed: list[tuple[int, str]],
+    recorder: "StageRecorder | None" = None,
+) -> list[dict[str, Any]]:
+    if llm is None:
+        if recorder is not None:
+            recorder.record_fallback(len(indexed))
+        return keyword_fallback_results([text for _, text in indexed])
+
+    try:
+        return classify_comments_batch_with_llm(llm, indexed, recorder=recorder)
+    except Exception as exc:
+        logger.exception("LLM sentiment batch failed, keyword fallback will be used: %s", exc)
+        if recorder is not None:
+            recorder.record_fallback(len(indexed))
+        return keyword_fallback_results([text for _, text in indexed])
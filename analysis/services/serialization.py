@@ -0,0 +1,24 @@
+import json
+from typing import Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+def _orjson():
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def dumps_json(payload: Any) -> bytes:
+    """Yanıt gövdesini UTF-8 JSON olarak kodlar; orjson varsa onu kullanır."""
+    orjson = _orjson()
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Types orjson does not know (Decimal, lazy strings) go through Django's encoder.
+            pass
+    return json.dumps(payload, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
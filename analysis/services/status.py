@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import json
+import logging
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from typing import Any
+
+import redis
+from django.conf import settings
+
+from ..models import Analysis
+from .constants import STATUS_CACHE_ACTIVE_TTL_SECONDS, STATUS_POLL_SECONDS
+from .progress import SUBSCRIPTION_LOST, aget_progress, progress_listener
+from .redis_client import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+STATUS_KEY = "analysis:status:{analysis_id}"
+ACTIVE_STATUSES = {Analysis.Status.PENDING, Analysis.Status.PROCESSING}
+STATUS_FIELDS = ("status", "url", "created_at", "raw_comments__comment_count", "raw_comments__error")
+PROGRESS_FIELDS = (
+    "stage",
+    "reviews_scraped",
+    "comments_prepared",
+    "comments_selected",
+    "batches_total",
+    "batches_done",
+    "summary_started",
+    "updated_at",
+)
+
+
+def status_key(analysis_id: str) -> str:
+    return STATUS_KEY.format(analysis_id=analysis_id)
+
+
+def _status_record(analysis_id: str, row: dict[str, Any]) -> dict[str, Any]:
+    record: dict[str, Any] = {
+        "analysis_id": str(analysis_id),
+        "status": row["status"],
+        "url": row["url"],
+        "created_at": row["created_at"].isoformat(),
+    }
+    if row["status"] == Analysis.Status.COMPLETED:
+        record["comment_count"] = row["raw_comments__comment_count"] or 0
+    elif row["status"] == Analysis.Status.FAILED:
+        record["error"] = row["raw_comments__error"] or "Bilinmeyen hata"
+    elif row["status"] == Analysis.Status.CANCELLED:
+        record["error"] = "Analiz iptal edildi."
+    return record
+
+
+def _cache_ttl(record: dict[str, Any]) -> int:
+    # In-flight records expire quickly in case an invalidation raced the rebuild.
+    return STATUS_CACHE_ACTIVE_TTL_SECONDS if record["status"] in ACTIVE_STATUSES else settings.ANALYSIS_PROGRESS_TTL_SECONDS
+
+
+def _with_progress(record: dict[str, Any], progress: dict[str, Any] | None) -> dict[str, Any]:
+    progress = progress or {}
+    record.update({field: progress[field] for field in PROGRESS_FIELDS if field in progress})
+    return record
+
+
+async def aget_status_record(analysis_id: str, fresh: bool = False) -> dict[str, Any] | None:
+    """Analizin küçük durum kaydını döndürür; yorum payload'u hiç okunmaz.
+
+    Kayıt Redis'te önbelleğe alınır ve Analysis her kaydedildiğinde silinir.
+    ``fresh`` verilirse önbellek atlanıp veritabanı okunur ve önbelleğe yazılmaz.
+    Devam eden analizlerde ilerleme alanları Redis ilerleme kaydından eklenir.
+    """
+    record = None
+    client = get_async_redis()
+    if not fresh:
+        try:
+            cached = await client.get(status_key(analysis_id))
+            record = json.loads(cached) if cached else None
+        except (redis.RedisError, ValueError) as exc:
+            logger.warning("Status cache read failed for %s: %s", analysis_id, exc)
+
+    if record is None:
+        row = await Analysis.objects.filter(id=analysis_id).values(*STATUS_FIELDS).afirst()
+        if row is None:
+            return None
+        record = _status_record(analysis_id, row)
+        if not fresh:
+            try:
+                # nx: never overwrite a record another reader built after us.
+                await client.set(
+                    status_key(analysis_id), json.dumps(record, ensure_ascii=False), ex=_cache_ttl(record), nx=True
+                )
+            except redis.RedisError as exc:
+                logger.warning("Status cache write failed for %s: %s", analysis_id, exc)
+
+    if record["status"] in ACTIVE_STATUSES:
+        record = _with_progress(record, await aget_progress(analysis_id))
+    return record
+
+
+async def watch_status(
+    analysis_id: str,
+    max_seconds: float,
+    heartbeat_seconds: float,
+) -> AsyncIterator[tuple[str, dict[str, Any] | None]]:
+    """Analizin durum değişikliklerini pub/sub üzerinden akıtır.
+
+    Önce anlık durum (``status``), sonra her ilerleme olayı (``progress``)
+    üretilir; sessiz geçen her ``heartbeat_seconds`` için ``("heartbeat", None)``
+    döner. Analiz bitince son durum kaydıyla akış kapanır. Redis'e
+    ulaşılamazsa durum veritabanından yoklanır ve değiştikçe ``status`` döner.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_seconds
+    listener = progress_listener()
+    queue = None
+    try:
+        try:
+            # Subscribe before taking the snapshot so no event falls in between.
+            queue = await listener.subscribe(analysis_id)
+        except redis.RedisError as exc:
+            logger.warning("Status subscribe failed for %s, polling the database: %s", analysis_id, exc)
+
+        record = await aget_status_record(analysis_id)
+        if record is None:
+            return
+        yield "status", record
+        if record["status"] not in ACTIVE_STATUSES:
+            return
+
+        last_sent = loop.time()
+        while loop.time() < deadline:
+            timeout = min(heartbeat_seconds, max(0.0, deadline - loop.time()))
+            if queue is None:
+                await asyncio.sleep(min(timeout, STATUS_POLL_SECONDS))
+                current = await aget_status_record(analysis_id)
+                if current is None:
+                    return
+                if current != record:
+                    record = current
+                    last_sent = loop.time()
+                    yield "status", record
+                    if record["status"] not in ACTIVE_STATUSES:
+                        return
+                elif loop.time() - last_sent >= heartbeat_seconds:
+                    last_sent = loop.time()
+                    yield "heartbeat", None
+                continue
+
+            try:
+                data = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                last_sent = loop.time()
+                yield "heartbeat", None
+                continue
+            if data is SUBSCRIPTION_LOST:
+                logger.warning("Status subscription lost for %s, polling the database", analysis_id)
+                queue = None
+                continue
+            try:
+                event = json.loads(data)
+            except ValueError:
+                continue
+            last_sent = loop.time()
+            yield "progress", event
+            if event.get("status") and event["status"] not in ACTIVE_STATUSES:
+                # The cache may still hold an in-flight record rebuilt just
+                # before the terminal save was invalidated.
+                final = await aget_status_record(analysis_id, fresh=True)
+                if final is not None:
+                    yield "status", final
+                return
+    finally:
+        if queue is not None:
+            await listener.unsubscribe(analysis_id, queue)
+
+
+async def wait_for_status_change(
+    analysis_id: str,
+    waiting_statuses: set[str],
+    timeout: float,
+) -> tuple[dict[str, Any] | None, bool]:
+    """Analizin durumu ``waiting_statuses`` dışına çıkana ya da süre dolana kadar bekler.
+
+    Son durum kaydını ve sürenin dolup dolmadığını döndürür; analiz yoksa kayıt None olur.
+    """
+    record = None
+    async with aclosing(watch_status(analysis_id, timeout, timeout)) as events:
+        async for event, data in events:
+            if event == "status":
+                record = data
+                if record["status"] not in waiting_statuses:
+                    return record, False
+            elif event == "progress" and record is not None:
+                record = _with_progress(record, data)
+                status = data.get("status")
+                if status and status not in waiting_statuses and status in ACTIVE_STATUSES:
+                    # Terminal changes are followed by a fresh status record;
+                    # Pending -> Processing is not, so it is answered from the event.
+                    record["status"] = status
+                    return record, False
+    return record, record is not None
+
+
+def invalidate_status(analysis_id: str) -> None:
+    try:
+        get_redis().delete(status_key(analysis_id))
+    except redis.RedisError as exc:
+        logger.warning("Status cache invalidation failed for %s: %s", analysis_id, exc)
+
+
+def status_etag(record: dict[str, Any]) -> str:
+    digest = hashlib.md5(json.dumps(record, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
@@ -1,14 +1,109 @@
 import json
 import logging
-from collections import Counter
-from typing import Any
-
-from langchain.prompts import PromptTemplate
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
+from .comments import detect_comment_theme
+from .constants import (
+    DEFAULT_SUMMARY_MAP_CONCURRENCY,
+    DEFAULT_SUMMARY_THEME_MAX_CHARS,
+    SUMMARY_EVIDENCE_MAX_CHARS,
+    SUMMARY_MIN_THEME_COMMENTS,
+)
 from .llm import get_llm, invoke_llm_with_prompt
 
+if TYPE_CHECKING:
+    from langchain.prompts import PromptTemplate
+
+    from .metrics import PipelineMetrics, StageRecorder
+
 logger = logging.getLogger(__name__)
 
+THEME_SUMMARY_TEMPLATE = """
+        Sen bir e-ticaret yorum analistisin.
+        Aşağıda tek bir temaya ait gerçek müşteri yorumlarından bir örneklem var.
+        Sadece bu veriye dayanarak Türkçe, kısa bir ara özet çıkar. Uydurma yapma.
+
+        Kurallar:
+        - En fazla 3 şikayet ve 3 memnuniyet noktası yaz.
+        - Her noktada yorumlarda ne kadar sık geçtiğini doğal cümleyle belirt.
+        - Somut ifadeleri (ölçü, süre, kusur türü) koru.
+        - Düz metin kullan, markdown kullanma.
+
+        Veri:
+        {theme_json}
+        """
+
+REPORT_TEMPLATE = """
+        Sen bir e-ticaret yorum analisti olarak çalışıyorsun.
+        Hedef kitlen ürünü satın almayı düşünen son kullanıcılar.
+        Sadece verilen JSON verisine dayanarak Türkçe, satın alma kararına yardımcı bir özet üret.
+        Veri dışı bilgi ekleme, uydurma yapma.
+
+        Amaç:
+        - Kullanıcıların şikayet ve memnuniyet nedenlerini anlaşılır temalarda toplamak
+        - Satın alma riski ve güçlü tarafları net, sade ve dürüst anlatmak
+        - Aynı yorum tekrarları veya bot şüphesi varsa bunu sayısal olarak belirtmek
+
+        Yazım kuralları:
+        - Kısa, net, güven veren Türkçe kullan.
+        - Çıktıyı düz metin ver; markdown vurgusu kullanma.
+        - `**` dahil hiçbir kalın/italik işareti kullanma.
+        - "etki: düşük/orta/yüksek" kalıbını KULLANMA.
+        - Her tema maddesinde bunun ne kadar sık geçtiğini doğal cümleyle söyle.
+        - Örnek ifade: "Bu konu yorumlarda çokça bahsedilmiş."
+        - Veride belirgin sinyal yoksa bunu açıkça belirt.
+        - Toplam yorum dağılımını (Negatif/Nötr/Pozitif) tek satırda ver.
+        - decision_comment_selection alanını kullanarak bu analizin seçili yorumlar ile üretildiğini not et.
+        - theme_summaries alanı her tema için gerçek yorumlardan çıkarılmış ara özetleri içerir; temaları bunlara dayandır.
+        - theme_summaries boşsa anahtar kelimeler ve dağılımla yetin.
+
+        Çıktı formatı (bu sırayı koru):
+        1) Şikayet Nedenleri
+        - En fazla 5 madde.
+        - Her madde: "Tema: kısa açıklama + görülme sıklığı ifadesi"
+
+        2) Memnuniyet Nedenleri
+        - En fazla 5 madde.
+        - Her madde: "Tema: kısa açıklama + görülme sıklığı ifadesi"
+
+        3) Tekrarlanan Yorum ve Bot Şüphesi
+        - duplicate_comment_insights alanına bakarak değerlendir.
+        - Kaç farklı yorum tekrar ettiği ve toplam tekrar adedini sayı ile yaz.
+        - Bot şüphesi varsa "kesin bot" deme; "bot benzeri tekrar paterni" olarak belirt.
+
+        4) Satın Alma Önerisi
+        - En fazla 4 madde.
+        - Ürünü almayı düşünen kullanıcı için somut öneri yaz.
+        - Kimler için uygun/uygunsuz olabileceğini kısa belirt.
+
+        5) Kısa Özet
+        - 2-3 cümlelik genel değerlendirme.
+
+        6) Dağılım
+        - "Negatif/Nötr/Pozitif: X/Y/Z" formatında tek satır.
+
+        Veri:
+        {analysis_json}
+        """
+
+
+@lru_cache(maxsize=1)
+def theme_summary_prompt() -> "PromptTemplate":
+    from langchain.prompts import PromptTemplate
+
+    return PromptTemplate.from_template(THEME_SUMMARY_TEMPLATE)
+
+
+@lru_cache(maxsize=1)
+def report_prompt() -> "PromptTemplate":
+    from langchain.prompts import PromptTemplate
+
+    return PromptTemplate.from_template(REPORT_TEMPLATE)
+
 
 def reason_insights(classified: list[dict[str, Any]]) -> dict[str, Any]:
     tokens_negative: Counter[str] = Counter()
@@ -43,11 +138,117 @@ def reason_insights(classified: list[dict[str, Any]]) -> dict[str, Any]:
     }
 
 
+def group_comments_by_theme(classified: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    grouped: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for item in classified:
+        grouped[detect_comment_theme(item["text"].lower())].append(item)
+    return dict(grouped)
+
+
+def select_theme_evidence(items: list[dict[str, Any]], max_chars: int) -> list[dict[str, str]]:
+    by_sentiment: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for item in sorted(items, key=lambda x: x.get("score", 0.0), reverse=True):
+        by_sentiment[item["sentiment"]].append(item)
+
+    # Alternate between sentiments so one side cannot fill the whole budget.
+    queues = [by_sentiment[s] for s in ("Negatif", "Pozitif", "Nötr") if by_sentiment[s]]
+    evidence: list[dict[str, str]] = []
+    used_chars = 0
+    position = 0
+    while queues:
+        queue = queues[position % len(queues)]
+        item = queue.pop(0)
+        if not queue:
+            queues.remove(queue)
+        else:
+            position += 1
+        entry = {"sentiment": item["sentiment"], "text": item["text"][:SUMMARY_EVIDENCE_MAX_CHARS]}
+        entry_chars = len(json.dumps(entry, ensure_ascii=False))
+        if used_chars + entry_chars > max_chars:
+            break
+        evidence.append(entry)
+        used_chars += entry_chars
+    return evidence
+
+
+def summarize_theme_with_llm(
+    llm,
+    theme: str,
+    items: list[dict[str, Any]],
+    max_chars: int,
+    recorder: "StageRecorder | None" = None,
+) -> str:
+    counts = Counter(item["sentiment"] for item in items)
+    payload = {
+        "theme": theme,
+        "comment_count": len(items),
+        "sentiment_distribution": {
+            "Negatif": counts.get("Negatif", 0),
+            "Nötr": counts.get("Nötr", 0),
+            "Pozitif": counts.get("Pozitif", 0),
+        },
+        "evidence": select_theme_evidence(items, max_chars=max_chars),
+    }
+
+    return invoke_llm_with_prompt(
+        prompt=theme_summary_prompt(),
+        llm=llm,
+        payload={"theme_json": json.dumps(payload, ensure_ascii=False)},
+        recorder=recorder,
+    )
+
+
+def build_theme_summaries(
+    llm,
+    classified: list[dict[str, Any]],
+    recorder: "StageRecorder | None" = None,
+) -> dict[str, str]:
+    try:
+        max_chars = int(os.getenv("SUMMARY_THEME_MAX_CHARS", str(DEFAULT_SUMMARY_THEME_MAX_CHARS)))
+    except ValueError:
+        max_chars = DEFAULT_SUMMARY_THEME_MAX_CHARS
+    max_chars = max(1000, min(max_chars, 20000))
+
+    try:
+        concurrency = int(os.getenv("SUMMARY_MAP_CONCURRENCY", str(DEFAULT_SUMMARY_MAP_CONCURRENCY)))
+    except ValueError:
+        concurrency = DEFAULT_SUMMARY_MAP_CONCURRENCY
+    concurrency = max(1, min(concurrency, 16))
+
+    grouped = {
+        theme: items
+        for theme, items in group_comments_by_theme(classified).items()
+        if len(items) >= SUMMARY_MIN_THEME_COMMENTS
+    }
+    if not grouped:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(grouped))) as executor:
+        futures = {
+            theme: executor.submit(summarize_theme_with_llm, llm, theme, items, max_chars, recorder)
+            for theme, items in grouped.items()
+        }
+
+    theme_summaries: dict[str, str] = {}
+    for theme, future in futures.items():
+        try:
+            theme_summaries[theme] = future.result()
+        except Exception as exc:
+            logger.exception("LLM theme summary failed for %s, theme will be skipped: %s", theme, exc)
+            if recorder is not None:
+                recorder.record_fallback()
+    return theme_summaries
+
+
 def build_langchain_summary(
     classified: list[dict[str, Any]],
     duplicate_insights: dict[str, Any] | None = None,
     selection_insights: dict[str, Any] | None = None,
+    metrics: "PipelineMetrics | None" = None,
+    mode: str = "full",
+    remaining: float | None = None,
 ) -> str:
+    recorder = metrics.recorder("summary") if metrics is not None else None
     counts = Counter(item["sentiment"] for item in classified)
     reasons = reason_insights(classified)
     duplicate_insights = duplicate_insights or {}
@@ -65,59 +266,6 @@ def build_langchain_summary(
         "decision_comment_selection": selection_insights or {},
     }
 
-    prompt = PromptTemplate.from_template(
-        """
-        Sen bir e-ticaret yorum analisti olarak çalışıyorsun.
-        Hedef kitlen ürünü satın almayı düşünen son kullanıcılar.
-        Sadece verilen JSON verisine dayanarak Türkçe, satın alma kararına yardımcı bir özet üret.
-        Veri dışı bilgi ekleme, uydurma yapma.
-
-        Amaç:
-        - Kullanıcıların şikayet ve memnuniyet nedenlerini anlaşılır temalarda toplamak
-        - Satın alma riski ve güçlü tarafları net, sade ve dürüst anlatmak
-        - Aynı yorum tekrarları veya bot şüphesi varsa bunu sayısal olarak belirtmek
-
-        Yazım kuralları:
-        - Kısa, net, güven veren Türkçe kullan.
-        - Çıktıyı düz metin ver; markdown vurgusu kullanma.
-        - `**` dahil hiçbir kalın/italik işareti kullanma.
-        - "etki: düşük/orta/yüksek" kalıbını KULLANMA.
-        - Her tema maddesinde bunun ne kadar sık geçtiğini doğal cümleyle söyle.
-        - Örnek ifade: "Bu konu yorumlarda çokça bahsedilmiş."
-        - Veride belirgin sinyal yoksa bunu açıkça belirt.
-        - Toplam yorum dağılımını (Negatif/Nötr/Pozitif) tek satırda ver.
-        - decision_comment_selection alanını kullanarak bu analizin seçili yorumlar ile üretildiğini not et.
-
-        Çıktı formatı (bu sırayı koru):
-        1) Şikayet Nedenleri
-        - En fazla 5 madde.
-        - Her madde: "Tema: kısa açıklama + görülme sıklığı ifadesi"
-
-        2) Memnuniyet Nedenleri
-        - En fazla 5 madde.
-        - Her madde: "Tema: kısa açıklama + görülme sıklığı ifadesi"
-
-        3) Tekrarlanan Yorum ve Bot Şüphesi
-        - duplicate_comment_insights alanına bakarak değerlendir.
-        - Kaç farklı yorum tekrar ettiği ve toplam tekrar adedini sayı ile yaz.
-        - Bot şüphesi varsa "kesin bot" deme; "bot benzeri tekrar paterni" olarak belirt.
-
-        4) Satın Alma Önerisi
-        - En fazla 4 madde.
-        - Ürünü almayı düşünen kullanıcı için somut öneri yaz.
-        - Kimler için uygun/uygunsuz olabileceğini kısa belirt.
-
-        5) Kısa Özet
-        - 2-3 cümlelik genel değerlendirme.
-
-        6) Dağılım
-        - "Negatif/Nötr/Pozitif: X/Y/Z" formatında tek satır.
-
-        Veri:
-        {analysis_json}
-        """
-    )
-
     fallback_text = (
         "Kullanıcıların şikayet ettiği başlıca noktalar: "
         f"{', '.join(reasons['negative_keywords']) or 'belirgin negatif tema yok'}. "
@@ -127,17 +275,24 @@ def build_langchain_summary(
         f"Dağılım Negatif/Nötr/Pozitif: {counts.get('Negatif', 0)}/{counts.get('Nötr', 0)}/{counts.get('Pozitif', 0)}."
     )
 
-    llm = get_llm()
+    llm = get_llm(remaining=remaining) if mode != "fallback" else None
     if llm is None:
+        if recorder is not None:
+            recorder.record_fallback()
         return fallback_text
 
+    payload["theme_summaries"] = build_theme_summaries(llm, classified, recorder=recorder) if mode == "full" else {}
+
     try:
         return invoke_llm_with_prompt(
-            prompt=prompt,
+            prompt=report_prompt(),
             llm=llm,
             payload={"analysis_json": json.dumps(payload, ensure_ascii=False)},
+            recorder=recorder,
         )
     except Exception as exc:
         logger.exception("LLM summary failed, fallback summary will be used: %s", exc)
+        if recorder is not None:
+            recorder.record_fallback()
         return fallback_text
 
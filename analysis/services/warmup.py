@@ -0,0 +1,100 @@
+import logging
+import os
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+WARMUP_SAMPLE_TEXT = "Ürün çok kaliteli ama kargo 5 gün gecikti, kutusu da ezik geldi."
+
+
+def warmup_enabled() -> bool:
+    return os.getenv("WORKER_WARMUP", "true").strip().lower() not in {"0", "false", "no"}
+
+
+def _timed(timings: dict[str, float], name: str, func) -> Any:
+    started = time.perf_counter()
+    try:
+        return func()
+    except Exception as exc:
+        # A failed warm-up step only means the first task pays that cost.
+        logger.warning("Worker warm-up step %s failed: %s", name, exc)
+        return None
+    finally:
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _import_modules() -> None:
+    from langchain_core.output_parsers import StrOutputParser  # noqa: F401
+    from langchain_core.prompts import PromptTemplate  # noqa: F401
+
+    from . import pipeline, summary  # noqa: F401
+
+
+def _import_scrapers() -> None:
+    import hepsiburada_scraper  # noqa: F401
+    import trendyol_scraper  # noqa: F401
+
+
+def _build_prompts() -> None:
+    from .sentiment import classification_prompt
+    from .summary import report_prompt, theme_summary_prompt
+
+    classification_prompt()
+    theme_summary_prompt()
+    report_prompt()
+
+
+def _exercise_text_helpers() -> None:
+    from .comments import clean_comment_text, detect_comment_theme, normalize_for_dedup, score_comment_for_decision
+    from .sentiment import dummy_sentiment_model
+
+    cleaned = clean_comment_text(WARMUP_SAMPLE_TEXT) or WARMUP_SAMPLE_TEXT
+    normalize_for_dedup(cleaned)
+    detect_comment_theme(cleaned.lower())
+    score_comment_for_decision(cleaned, 1)
+    dummy_sentiment_model(cleaned)
+
+
+def _build_llm() -> None:
+    from .llm import get_llm
+
+    get_llm()
+
+
+def _check_browser() -> None:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless=new")
+    remote_url = os.getenv("SELENIUM_REMOTE_URL", "http://chrome:4444/wd/hub")
+    # The session is closed right away; holding it would pin a Grid slot.
+    driver = webdriver.Remote(command_executor=remote_url, options=options)
+    driver.quit()
+
+
+def warm_up_worker(open_browser: bool | None = None) -> dict[str, float]:
+    """Worker sürecini ilk task'tan önce ısıtır.
+
+    Ağır modüller import edilir, prompt şablonları ve LLM istemcisi önbelleğe
+    alınır, metin yardımcıları bir kez çalıştırılır. ``WORKER_WARMUP_BROWSER``
+    açıksa Selenium Grid'e bir oturum açılıp hemen kapatılır. Adım süreleri
+    milisaniye cinsinden döner.
+    """
+    if open_browser is None:
+        open_browser = os.getenv("WORKER_WARMUP_BROWSER", "false").strip().lower() in {"1", "true", "yes"}
+
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+    _timed(timings, "imports", _import_modules)
+    _timed(timings, "scrapers", _import_scrapers)
+    _timed(timings, "prompts", _build_prompts)
+    _timed(timings, "text_helpers", _exercise_text_helpers)
+    _timed(timings, "llm_client", _build_llm)
+    if open_browser:
+        _timed(timings, "browser", _check_browser)
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+
+    logger.info("Worker ready in %.1f ms (pid=%s, steps=%s)", timings["total"], os.getpid(), timings)
+    return timings
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Analysis
+from .services.result_cache import invalidate_result
+from .services.status import invalidate_status
+
+
+def _invalidate(analysis_id: str) -> None:
+    invalidate_status(analysis_id)
+    invalidate_result(analysis_id)
+
+
+@receiver(post_save, sender=Analysis)
+@receiver(post_delete, sender=Analysis)
+def invalidate_cached_analysis(sender, instance: Analysis, **kwargs) -> None:
+    # Wait for the commit so a concurrent poll cannot re-cache the old row.
+    analysis_id = str(instance.id)
+    transaction.on_commit(lambda: _invalidate(analysis_id))
@@ -1,50 +1,420 @@
 import logging
 import os
+import time
+import uuid
+from typing import Any
 
-from celery import shared_task
+from celery import chord, shared_task
+from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 
-from .models import Analysis
-from .services.constants import DEFAULT_MAX_REVIEWS, HARD_MAX_REVIEWS
-from .services.pipeline import execute_analysis_pipeline
+from .models import Analysis, AnalysisBatch, AnalysisCheckpoint
+from .services.admission import record_duration, scrape_slot_acquired, scrape_slot_released
+from .services.cancellation import is_cancelled, track_task_ids
+from .services.checkpoints import (
+    clear_checkpoints,
+    completed_batch_indexes,
+    load_batch_checkpoints,
+    load_checkpoint,
+    save_checkpoint,
+)
+from .services.constants import DEFAULT_BATCH_PARALLELISM, DEFAULT_MAX_REVIEWS, HARD_MAX_REVIEWS
+from .services.deadline import Deadline, clamp_deadline_seconds
+from .services.metrics import PipelineMetrics
+from .services.progress import increment_progress, publish_progress
 
 logger = logging.getLogger(__name__)
 
+# Pipeline modules are imported inside the tasks so the web tier can enqueue
+# them without loading the scraping/LLM stack.
+
+
+def send_analysis(analysis: Analysis) -> None:
+    deadline_seconds = clamp_deadline_seconds(analysis.parameters.get("deadline_seconds"))
+    publish_progress(str(analysis.id), "queued", status=Analysis.Status.PENDING)
+    process_product_reviews.apply_async(
+        (
+            str(analysis.id),
+            analysis.url,
+            analysis.parameters.get("max_reviews"),
+            analysis.parameters.get("shortlist_size"),
+            time.time() + deadline_seconds if deadline_seconds is not None else None,
+        ),
+        task_id=analysis.task_id,
+    )
+
+
+def dispatch_analysis(analysis: Analysis) -> str:
+    # The task id is stored before the message is sent so that a cancel or a
+    # batch scheduler never sees a dispatched analysis without one.
+    analysis.task_id = str(uuid.uuid4())
+    analysis.save(update_fields=["task_id"])
+    send_analysis(analysis)
+    return analysis.task_id
+
+
+def release_batch_slot(analysis_id: str) -> None:
+    batch_id = Analysis.objects.filter(id=analysis_id).values_list("batch_id", flat=True).first()
+    if batch_id:
+        advance_analysis_batch.delay(str(batch_id))
+
+
+def mark_analysis_failed(analysis_id: str, exc: BaseException, metrics: PipelineMetrics | None = None) -> None:
+    try:
+        analysis = Analysis.objects.get(id=analysis_id)
+    except Analysis.DoesNotExist:
+        logger.error("Analysis not found while marking failure: %s", analysis_id)
+        return
+    if analysis.status == Analysis.Status.CANCELLED:
+        return
+
+    analysis.status = Analysis.Status.FAILED
+    analysis.raw_comments = {
+        "error": str(exc),
+        "comment_count": 0,
+        "comments": [],
+    }
+    analysis.summary_result = ""
+    update_fields = ["status", "raw_comments", "summary_result"]
+    if metrics is not None:
+        analysis.metrics = metrics.as_dict()
+        update_fields.append("metrics")
+    analysis.save(update_fields=update_fields)
+    publish_progress(analysis_id, "failed", status=Analysis.Status.FAILED, error=str(exc)[:300])
+    release_batch_slot(analysis_id)
+
+
+def restore_metrics(state: dict[str, Any] | None) -> PipelineMetrics:
+    metrics = PipelineMetrics()
+    if state:
+        metrics.merge(state)
+    return metrics
+
 
 @shared_task(bind=True, name="analysis.process_product_reviews")
-def process_product_reviews(self, analysis_id: str, url: str, max_reviews: int | None = None, shortlist_size: int | None = None) -> str:
+def process_product_reviews(
+    self,
+    analysis_id: str,
+    url: str,
+    max_reviews: int | None = None,
+    shortlist_size: int | None = None,
+    deadline_at: float | None = None,
+) -> str:
+    from .services.pipeline import scrape_stage
+
     try:
         analysis = Analysis.objects.get(id=analysis_id)
     except Analysis.DoesNotExist as exc:
         logger.error("Analysis not found: %s", analysis_id)
         raise ValueError("Analysis bulunamadı") from exc
 
+    if analysis.status == Analysis.Status.CANCELLED or is_cancelled(analysis_id):
+        logger.info("Analysis %s was cancelled before scraping started", analysis_id)
+        return str(analysis.id)
+
     analysis.status = Analysis.Status.PROCESSING
     analysis.save(update_fields=["status"])
 
+    if max_reviews is None:
+        max_reviews = int(os.getenv("MAX_REVIEWS", str(DEFAULT_MAX_REVIEWS)))
+    max_reviews = max(100, min(max_reviews, HARD_MAX_REVIEWS))
+
+    checkpoint = load_checkpoint(analysis_id, AnalysisCheckpoint.Stage.SCRAPE)
+    if checkpoint is not None:
+        logger.info("Resuming %s from scrape checkpoint (%s reviews)", analysis_id, len(checkpoint["comments"]))
+        publish_progress(
+            analysis_id,
+            "preparing",
+            task=self,
+            status=Analysis.Status.PROCESSING,
+            reviews_scraped=len(checkpoint["comments"]),
+        )
+        result = prepare_analysis_corpus.delay(analysis_id, max_reviews, shortlist_size, deadline_at)
+        track_task_ids(analysis_id, result.id)
+        return str(analysis.id)
+
+    publish_progress(analysis_id, "scraping", task=self, status=Analysis.Status.PROCESSING, reviews_scraped=0)
+    metrics = PipelineMetrics()
+    scrape_started = time.monotonic()
+    scrape_slot_acquired(analysis_id)
+    try:
+        scraped_comments = scrape_stage(
+            url,
+            max_reviews,
+            metrics,
+            progress_callback=lambda count: publish_progress(analysis_id, task=self, reviews_scraped=count),
+            deadline=Deadline(deadline_at),
+            should_stop=lambda: is_cancelled(analysis_id),
+        )
+        if is_cancelled(analysis_id):
+            logger.info("Analysis %s was cancelled during scraping", analysis_id)
+            return str(analysis.id)
+        save_checkpoint(
+            analysis_id,
+            AnalysisCheckpoint.Stage.SCRAPE,
+            {"comments": scraped_comments, "metrics": metrics.as_dict()},
+        )
+    except Exception as exc:
+        if is_cancelled(analysis_id):
+            logger.info("Analysis %s was cancelled during scraping: %s", analysis_id, exc)
+            return str(analysis.id)
+        logger.exception("Analysis scrape failed for %s: %s", analysis_id, exc)
+        mark_analysis_failed(analysis_id, exc, metrics)
+        raise
+    finally:
+        scrape_slot_released(analysis_id)
+
+    record_duration("scrape", time.monotonic() - scrape_started)
+    publish_progress(analysis_id, "preparing", task=self, reviews_scraped=len(scraped_comments))
+    result = prepare_analysis_corpus.delay(analysis_id, max_reviews, shortlist_size, deadline_at)
+    track_task_ids(analysis_id, result.id)
+    return str(analysis.id)
+
+
+@shared_task(bind=True, name="analysis.prepare_analysis_corpus")
+def prepare_analysis_corpus(
+    self,
+    analysis_id: str,
+    max_reviews: int,
+    shortlist_size: int | None,
+    deadline_at: float | None = None,
+) -> int:
+    from .services.pipeline import fit_batch_size_to_deadline, prepare_stage
+    from .services.sentiment import split_into_indexed_batches
+
+    if is_cancelled(analysis_id):
+        logger.info("Analysis %s was cancelled before preparation", analysis_id)
+        return 0
+
+    deadline = Deadline(deadline_at)
+    prepared = load_checkpoint(analysis_id, AnalysisCheckpoint.Stage.PREPARE)
+    if prepared is None:
+        scraped = load_checkpoint(analysis_id, AnalysisCheckpoint.Stage.SCRAPE) or {}
+        metrics = restore_metrics(scraped.get("metrics"))
+        try:
+            if "comments" not in scraped:
+                raise RuntimeError("Scrape checkpoint bulunamadı, analiz baştan başlatılmalı.")
+            corpus = prepare_stage(
+                scraped["comments"],
+                max_reviews,
+                shortlist_size,
+                metrics,
+                deadline=deadline,
+                parallelism=settings.CELERY_LLM_CONCURRENCY,
+            )
+            batch_size = fit_batch_size_to_deadline(
+                corpus["selected_count"], metrics, deadline, settings.CELERY_LLM_CONCURRENCY
+            )
+            batches = split_into_indexed_batches(corpus.pop("selected_comments"), batch_size=batch_size)
+            prepared = {
+                "corpus": corpus,
+                "batches": batches,
+                "batches_total": len(batches),
+                "metrics": metrics.as_dict(),
+            }
+            save_checkpoint(analysis_id, AnalysisCheckpoint.Stage.PREPARE, prepared)
+        except Exception as exc:
+            logger.exception("Analysis preparation failed for %s: %s", analysis_id, exc)
+            mark_analysis_failed(analysis_id, exc, metrics)
+            raise
+
+    corpus = prepared["corpus"]
+    corpus["classify_started_at"] = time.time()
+    done = completed_batch_indexes(analysis_id)
+    pending = [(index, batch) for index, batch in enumerate(prepared["batches"]) if index not in done]
+    if done:
+        logger.info("Resuming %s classification: %s/%s batches already done", analysis_id, len(done), prepared["batches_total"])
+
+    publish_progress(
+        analysis_id,
+        "classifying",
+        task=self,
+        comments_prepared=corpus["prepared_count"],
+        comments_selected=corpus["selected_count"],
+        batches_total=prepared["batches_total"],
+        batches_done=len(done),
+    )
+    callback = finalize_analysis.s(analysis_id, corpus, prepared["metrics"], deadline_at).on_error(
+        fail_analysis_on_error.s(analysis_id)
+    )
+    if not pending:
+        result = callback.delay([])
+        track_task_ids(analysis_id, result.id)
+        return 0
+    # Ids are assigned up front so a cancel can revoke batches still queued.
+    header = [
+        classify_comment_batch.s(analysis_id, index, batch, deadline_at).set(task_id=str(uuid.uuid4()))
+        for index, batch in pending
+    ]
+    track_task_ids(analysis_id, *(signature.id for signature in header))
+    result = chord(header)(callback)
+    track_task_ids(analysis_id, result.id)
+    return len(pending)
+
+
+@shared_task(bind=True, name="analysis.classify_comment_batch")
+def classify_comment_batch(
+    self,
+    analysis_id: str,
+    batch_index: int,
+    indexed_batch: list[list[Any]],
+    deadline_at: float | None = None,
+) -> int:
+    from .services.llm import get_llm
+    from .services.sentiment import classify_indexed_batch
+
+    # JSON serialization turns the (index, text) tuples into lists.
+    if is_cancelled(analysis_id):
+        return batch_index
+
+    indexed = [(int(idx), str(text)) for idx, text in indexed_batch]
+    metrics = PipelineMetrics()
+    deadline = Deadline(deadline_at)
+    with metrics.batch("classify", index=batch_index, size=len(indexed)) as recorder:
+        if deadline.classify_budget() <= 0:
+            # Batches still queued when the deadline is near are classified by
+            # keywords so the summary can start on time.
+            metrics.record_degradation("classify", "keyword_fallback", batch_index=batch_index, size=len(indexed))
+            llm = None
+        else:
+            try:
+                llm = get_llm(remaining=deadline.remaining())
+            except Exception as exc:
+                logger.exception("LLM client could not be created for %s, keyword fallback will be used: %s", analysis_id, exc)
+                llm = None
+        results = classify_indexed_batch(llm, indexed, recorder=recorder)
+
+    if is_cancelled(analysis_id):
+        return batch_index
+    save_checkpoint(
+        analysis_id,
+        AnalysisCheckpoint.Stage.CLASSIFY_BATCH,
+        {"results": results, "metrics": metrics.as_dict()},
+        batch_index=batch_index,
+    )
+    increment_progress(analysis_id, "batches_done", task=self)
+    return batch_index
+
+
+@shared_task(bind=True, name="analysis.finalize_analysis")
+def finalize_analysis(
+    self,
+    batch_indexes: list[int],
+    analysis_id: str,
+    corpus: dict[str, Any],
+    metrics_state: dict[str, Any],
+    deadline_at: float | None = None,
+) -> str:
+    from .services.cold_storage import store_cold_payload
+    from .services.history import record_analysis_aggregate
+    from .services.pipeline import summarize_stage
+    from .services.reviews import store_classified_comments
+
+    if is_cancelled(analysis_id):
+        logger.info("Analysis %s was cancelled before finalization", analysis_id)
+        return analysis_id
+
+    metrics = restore_metrics(metrics_state)
     try:
-        if max_reviews is None:
-            max_reviews = int(os.getenv("MAX_REVIEWS", str(DEFAULT_MAX_REVIEWS)))
-        max_reviews = max(100, min(max_reviews, HARD_MAX_REVIEWS))
+        # Results are read back from the batch checkpoints so batches finished
+        # before a resume are included alongside the ones from this run.
+        batch_checkpoints = load_batch_checkpoints(analysis_id)
+        classified: list[dict[str, Any]] = []
+        for index in sorted(batch_checkpoints):
+            classified.extend(batch_checkpoints[index]["results"])
+            metrics.merge(batch_checkpoints[index]["metrics"])
+        metrics.add_wall_time("classify", time.time() - corpus["classify_started_at"])
+        publish_progress(analysis_id, "summarizing", task=self, summary_started=True)
 
-        raw_payload, summary = execute_analysis_pipeline(url=url, max_reviews=max_reviews, shortlist_size=shortlist_size)
+        raw_payload, summary = summarize_stage(corpus, classified, metrics, deadline=Deadline(deadline_at))
+        scraped = load_checkpoint(analysis_id, AnalysisCheckpoint.Stage.SCRAPE)
 
         with transaction.atomic():
-            analysis.raw_comments = raw_payload
+            analysis = Analysis.objects.select_for_update().get(id=analysis_id)
+            if analysis.status == Analysis.Status.CANCELLED:
+                return analysis_id
+            analysis.raw_comments = store_classified_comments(analysis, raw_payload)
             analysis.summary_result = summary
+            analysis.metrics = metrics.as_dict()
             analysis.status = Analysis.Status.COMPLETED
-            analysis.save(update_fields=["raw_comments", "summary_result", "status"])
+            analysis.save(update_fields=["raw_comments", "summary_result", "metrics", "status"])
+            record_analysis_aggregate(analysis)
+            # The raw scrape outlives its checkpoint only as a compressed blob.
+            if scraped is not None:
+                store_cold_payload(analysis_id, scraped_comments=scraped["comments"])
+            clear_checkpoints(analysis_id)
 
-        return str(analysis.id)
+        publish_progress(analysis_id, "completed", task=self, status=Analysis.Status.COMPLETED)
+        if analysis.batch_id is None:
+            # Batch children wait for a slot before dispatch, which would skew the sample.
+            record_duration("total", (timezone.now() - analysis.created_at).total_seconds())
+        release_batch_slot(analysis_id)
+        return analysis_id
 
     except Exception as exc:
-        logger.exception("Analysis task failed for %s: %s", analysis_id, exc)
-        analysis.status = Analysis.Status.FAILED
-        analysis.raw_comments = {
-            "error": str(exc),
-            "comment_count": 0,
-            "comments": [],
-        }
-        analysis.summary_result = ""
-        analysis.save(update_fields=["status", "raw_comments", "summary_result"])
+        logger.exception("Analysis finalization failed for %s: %s", analysis_id, exc)
+        mark_analysis_failed(analysis_id, exc, metrics)
         raise
+
+
+@shared_task(name="analysis.fail_analysis_on_error")
+def fail_analysis_on_error(request, exc, traceback, analysis_id: str) -> None:
+    logger.error("Classification chord failed for %s: %s", analysis_id, exc)
+    mark_analysis_failed(analysis_id, exc)
+
+
+@shared_task(name="analysis.advance_analysis_batch")
+def advance_analysis_batch(batch_id: str) -> int:
+    with transaction.atomic():
+        try:
+            batch = AnalysisBatch.objects.select_for_update().get(id=batch_id)
+        except AnalysisBatch.DoesNotExist:
+            logger.error("Analysis batch not found: %s", batch_id)
+            return 0
+        if batch.status == AnalysisBatch.Status.COMPLETED:
+            return 0
+
+        try:
+            max_parallel = int(batch.parameters.get("max_parallel") or DEFAULT_BATCH_PARALLELISM)
+        except (TypeError, ValueError):
+            max_parallel = DEFAULT_BATCH_PARALLELISM
+
+        children = Analysis.objects.filter(batch_id=batch.id)
+        active = (
+            children.filter(status__in=[Analysis.Status.PENDING, Analysis.Status.PROCESSING])
+            .exclude(task_id="")
+            .count()
+        )
+        waiting = list(
+            children.filter(status=Analysis.Status.PENDING, task_id="")
+            .order_by("created_at", "id")
+            .only("id", "url", "parameters", "task_id")[: max(0, max_parallel - active)]
+        )
+        if not active and not waiting:
+            batch.status = AnalysisBatch.Status.COMPLETED
+            batch.completed_at = timezone.now()
+            batch.save(update_fields=["status", "completed_at"])
+            return 0
+
+        # Slots are reserved under the batch row lock; messages go out after
+        # commit so concurrent advances cannot pick the same child.
+        for child in waiting:
+            child.task_id = str(uuid.uuid4())
+            child.save(update_fields=["task_id"])
+
+    dispatched = 0
+    for child in waiting:
+        try:
+            send_analysis(child)
+        except Exception as exc:
+            # A reserved child without a message would count as active forever
+            # and keep the batch from completing.
+            logger.exception("Batch %s could not dispatch analysis %s: %s", batch_id, child.id, exc)
+            try:
+                mark_analysis_failed(str(child.id), RuntimeError(f"Analiz kuyruğa gönderilemedi: {exc}"))
+            except Exception as release_exc:
+                logger.warning("Batch %s could not be advanced after a failed dispatch: %s", batch_id, release_exc)
+            continue
+        dispatched += 1
+    return dispatched
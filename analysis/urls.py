@@ -1,8 +1,33 @@
 from django.urls import path
 
-from .views import analysis_detail_view, analysis_submit_view
+from .views import (
+    analysis_cancel_view,
+    analysis_comments_view,
+    analysis_detail_view,
+    analysis_events_view,
+    analysis_progress_view,
+    analysis_resume_view,
+    analysis_status_view,
+    analysis_submit_view,
+    analysis_wait_view,
+    batch_detail_view,
+    batch_submit_view,
+    product_history_view,
+    review_search_view,
+)
 
 urlpatterns = [
     path("analyses/", analysis_submit_view, name="analysis-submit"),
     path("analyses/<uuid:analysis_id>/", analysis_detail_view, name="analysis-detail"),
+    path("analyses/<uuid:analysis_id>/comments/", analysis_comments_view, name="analysis-comments"),
+    path("analyses/<uuid:analysis_id>/events/", analysis_events_view, name="analysis-events"),
+    path("analyses/<uuid:analysis_id>/status/", analysis_status_view, name="analysis-status"),
+    path("analyses/<uuid:analysis_id>/wait/", analysis_wait_view, name="analysis-wait"),
+    path("analyses/<uuid:analysis_id>/progress/", analysis_progress_view, name="analysis-progress"),
+    path("analyses/<uuid:analysis_id>/resume/", analysis_resume_view, name="analysis-resume"),
+    path("analyses/<uuid:analysis_id>/cancel/", analysis_cancel_view, name="analysis-cancel"),
+    path("products/history/", product_history_view, name="product-history"),
+    path("reviews/search/", review_search_view, name="review-search"),
+    path("batches/", batch_submit_view, name="batch-submit"),
+    path("batches/<uuid:batch_id>/", batch_detail_view, name="batch-detail"),
 ]
@@ -1,18 +1,69 @@
 import json
 import logging
+import os
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import timedelta
+from typing import Any
 from urllib.parse import urlparse
 
+from asgiref.sync import sync_to_async
 from celery.result import AsyncResult
-from django.http import HttpRequest, JsonResponse
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET, require_POST
 
-from .models import Analysis
-from .tasks import process_product_reviews
+from .decorators import async_csrf_exempt, async_require_GET, async_require_POST
+from .models import Analysis, AnalysisBatch, ClassifiedComment, Product
+from .services.admission import check_admission, client_admission_lock
+from .services.cancellation import request_cancellation, revoke_analysis_tasks
+from .services.checkpoints import clear_checkpoints, describe_resume_point
+from .services.cold_storage import load_cold_payload
+from .services.constants import (
+    DEFAULT_BATCH_PARALLELISM,
+    DEFAULT_COMMENT_PAGE_SIZE,
+    DEFAULT_HISTORY_DAYS,
+    DEFAULT_HISTORY_LIMIT,
+    DEFAULT_SSE_HEARTBEAT_SECONDS,
+    DEFAULT_SSE_MAX_SECONDS,
+    DEFAULT_WAIT_SECONDS,
+    MAX_BATCH_PARALLELISM,
+    MAX_BATCH_URLS,
+    MAX_COMMENT_PAGE_SIZE,
+    MAX_HISTORY_LIMIT,
+    MAX_SSE_SECONDS,
+    MAX_WAIT_SECONDS,
+    SSE_RETRY_MS,
+)
+from .services.deadline import clamp_deadline_seconds
+from .services.history import product_history
+from .services.products import canonical_product_key
+from .services.progress import aget_progress, publish_progress
+from .services.result_cache import cache_result, get_cached_result
+from .services.reviews import (
+    inline_distributions,
+    load_classified_comments,
+    page_classified_comments,
+    partial_distributions,
+    sentiment_theme_breakdown,
+)
+from .services.search import search_reviews
+from .services.serialization import dumps_json
+from .services.status import aget_status_record, status_etag, wait_for_status_change, watch_status
+from .tasks import advance_analysis_batch, dispatch_analysis, release_batch_slot
 
 logger = logging.getLogger(__name__)
 
+RAW_FIELD_GROUPS = {
+    "counts": ("scraped_count", "prepared_count", "selected_count", "filtered_out_count", "comment_count"),
+    "insights": ("duplicate_comment_insights", "decision_comment_selection"),
+    "degradations": ("degradations",),
+}
+RESULT_FIELDS = {"summary", "metrics", "distribution", "themes", "comments", "scraped", "partial", *RAW_FIELD_GROUPS}
+
 
 def _is_valid_url(url: str) -> bool:
     try:
@@ -22,14 +73,176 @@ def _is_valid_url(url: str) -> bool:
         return False
 
 
+def _analysis_parameters(payload: dict[str, Any]) -> dict[str, int | None]:
+    try:
+        max_reviews = payload.get("max_reviews")
+        shortlist_size = payload.get("shortlist_size")
+        deadline_seconds = payload.get("deadline_seconds")
+        return {
+            "max_reviews": int(max_reviews) if max_reviews is not None else None,
+            "shortlist_size": int(shortlist_size) if shortlist_size is not None else None,
+            "deadline_seconds": clamp_deadline_seconds(int(deadline_seconds) if deadline_seconds is not None else None),
+        }
+    except (TypeError, ValueError) as exc:
+        raise ValueError("max_reviews, shortlist_size ve deadline_seconds tam sayı olmalı.") from exc
+
+
+def _requested_fields(request: HttpRequest) -> set[str] | None:
+    value = request.GET.get("fields", "").strip()
+    if not value:
+        return None
+    fields = {field.strip() for field in value.split(",") if field.strip()}
+    unknown = fields - RESULT_FIELDS
+    if unknown:
+        raise ValueError(
+            f"Bilinmeyen alan: {', '.join(sorted(unknown))}. Geçerli alanlar: {', '.join(sorted(RESULT_FIELDS))}."
+        )
+    return fields
+
+
+def _selected_result(analysis: Analysis, fields: set[str]) -> dict[str, Any]:
+    load = []
+    if fields & {"distribution", "themes", "comments", *RAW_FIELD_GROUPS}:
+        load.append("raw_comments")
+    if "summary" in fields:
+        load.append("summary_result")
+    if load:
+        analysis.refresh_from_db(fields=load)
+
+    result: dict[str, Any] = {}
+    if "summary" in fields:
+        result["summary_result"] = analysis.summary_result
+    if "raw_comments" in load:
+        raw = analysis.raw_comments
+        selected = {
+            key: raw[key]
+            for group, keys in RAW_FIELD_GROUPS.items()
+            if group in fields
+            for key in keys
+            if key in raw
+        }
+        if "distribution" in fields:
+            selected.update(inline_distributions(raw))
+        if "themes" in fields:
+            selected["sentiment_theme_distribution"] = sentiment_theme_breakdown(analysis)
+        if "comments" in fields:
+            selected["comments"] = load_classified_comments(analysis)
+        result["raw_comments"] = selected
+    if "scraped" in fields:
+        result["scraped_comments"] = load_cold_payload(str(analysis.id)).get("scraped_comments", [])
+    return result
+
+
+def _encode_cursor(position: int) -> str:
+    return urlsafe_b64encode(f"p:{position}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        decoded = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, position = decoded.split(":", 1)
+        if prefix != "p":
+            raise ValueError(prefix)
+        return int(position)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Geçersiz cursor.") from exc
+
+
+def _comment_filters(request: HttpRequest) -> dict[str, Any]:
+    params = request.GET
+    filters: dict[str, Any] = {}
+    if params.get("cursor"):
+        filters["after"] = _decode_cursor(params["cursor"])
+
+    try:
+        limit = int(params.get("limit", DEFAULT_COMMENT_PAGE_SIZE))
+    except ValueError as exc:
+        raise ValueError("limit tam sayı olmalı.") from exc
+    filters["limit"] = max(1, min(limit, MAX_COMMENT_PAGE_SIZE))
+
+    sentiments = [value.strip() for value in params.get("sentiment", "").split(",") if value.strip()]
+    invalid = set(sentiments) - set(ClassifiedComment.Sentiment.values)
+    if invalid:
+        raise ValueError(f"Geçersiz sentiment: {', '.join(sorted(invalid))}. Negatif, Nötr veya Pozitif olmalı.")
+    filters["sentiments"] = sentiments
+    filters["themes"] = [value.strip() for value in params.get("theme", "").split(",") if value.strip()]
+
+    for name in ("min_score", "max_score"):
+        if params.get(name):
+            try:
+                filters[name] = float(params[name])
+            except ValueError as exc:
+                raise ValueError(f"{name} ondalık sayı olmalı.") from exc
+    return filters
+
+
+def _json_bytes_response(body: bytes, status: int = 200) -> HttpResponse:
+    return HttpResponse(body, status=status, content_type="application/json")
+
+
+def _env_seconds(name: str, default: int, low: int, high: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+    except ValueError:
+        value = default
+    return max(low, min(value, high))
+
+
+def _client_id(request: HttpRequest) -> str:
+    client_id = request.headers.get("X-Client-Id", "").strip()
+    if not client_id:
+        client_id = request.META.get("REMOTE_ADDR", "")
+    return client_id[:128]
+
+
+def _rejected_response(decision: dict[str, Any]) -> JsonResponse:
+    messages = {
+        "client_limit": "Aynı anda çalışan analiz sınırına ulaştınız. Biri bitince tekrar deneyin.",
+        "queue_full": "Sistem şu an yoğun, analiz kuyruğu dolu. Lütfen daha sonra tekrar deneyin.",
+        "wait_too_long": "Sistem şu an yoğun, analiz süre sınırı içinde başlayamaz. Lütfen daha sonra tekrar deneyin.",
+    }
+    body = {"error": messages.get(decision["reason"], "Sistem şu an yoğun."), **decision}
+    body.pop("admitted", None)
+    response = JsonResponse(body, status=429)
+    response["Retry-After"] = str(decision["retry_after"])
+    return response
+
+
+def _estimated_start(decision: dict[str, Any]) -> dict[str, Any]:
+    seconds = decision.get("estimated_start_seconds")
+    if seconds is None:
+        return {}
+    return {
+        "estimated_start_seconds": seconds,
+        "estimated_start_at": (timezone.now() + timedelta(seconds=seconds)).isoformat(),
+    }
+
+
 @require_GET
 def home_view(request: HttpRequest):
     return render(request, "analysis/index.html")
 
 
-@csrf_exempt
-@require_POST
-def analysis_submit_view(request: HttpRequest) -> JsonResponse:
+def _admit_analysis(client_id: str, url: str, parameters: dict[str, Any]) -> tuple[dict[str, Any], Analysis | None, str]:
+    # The in-flight count only sees dispatched analyses, so the row is created
+    # and dispatched before the client's lock is released.
+    with client_admission_lock(client_id):
+        decision = check_admission(client_id, parameters["deadline_seconds"])
+        if not decision["admitted"]:
+            return decision, None, ""
+        analysis = Analysis.objects.create(
+            url=url,
+            status=Analysis.Status.PENDING,
+            parameters=parameters,
+            product_key=canonical_product_key(url),
+            client_id=client_id,
+        )
+        return decision, analysis, dispatch_analysis(analysis)
+
+
+@async_csrf_exempt
+@async_require_POST
+async def analysis_submit_view(request: HttpRequest) -> JsonResponse:
     try:
         payload = json.loads(request.body.decode("utf-8"))
     except json.JSONDecodeError:
@@ -39,27 +252,25 @@ def analysis_submit_view(request: HttpRequest) -> JsonResponse:
     if not _is_valid_url(url):
         return JsonResponse({"error": "Geçerli bir ürün URL'i gönderin."}, status=400)
 
-    max_reviews = payload.get("max_reviews")
-    shortlist_size = payload.get("shortlist_size")
-
     try:
-        max_reviews = int(max_reviews) if max_reviews is not None else None
-        shortlist_size = int(shortlist_size) if shortlist_size is not None else None
-    except (TypeError, ValueError):
-        return JsonResponse({"error": "max_reviews ve shortlist_size tam sayı olmalı."}, status=400)
+        parameters = _analysis_parameters(payload)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
 
+    client_id = _client_id(request)
     try:
-        analysis = Analysis.objects.create(url=url, status=Analysis.Status.PENDING)
-        task = process_product_reviews.delay(str(analysis.id), url, max_reviews, shortlist_size)
-
-        analysis.task_id = task.id
-        analysis.save(update_fields=["task_id"])
+        # Admission, insert and the broker publish are blocking I/O.
+        decision, analysis, task_id = await sync_to_async(_admit_analysis)(client_id, url, parameters)
+        if analysis is None:
+            return _rejected_response(decision)
 
         return JsonResponse(
             {
                 "analysis_id": str(analysis.id),
-                "task_id": task.id,
+                "task_id": task_id,
                 "status": analysis.status,
+                "deadline_seconds": parameters["deadline_seconds"],
+                **_estimated_start(decision),
             },
             status=202,
         )
@@ -69,14 +280,28 @@ def analysis_submit_view(request: HttpRequest) -> JsonResponse:
 
 
 @require_GET
-def analysis_detail_view(request: HttpRequest, analysis_id) -> JsonResponse:
+def analysis_detail_view(request: HttpRequest, analysis_id) -> HttpResponse:
     try:
-        analysis = Analysis.objects.get(id=analysis_id)
+        fields = _requested_fields(request)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    # Only completed results are cached and every save drops them, so a hit
+    # needs no database read at all.
+    variant = ",".join(sorted(fields)) if fields is not None else "*"
+    cached = get_cached_result(str(analysis_id), variant)
+    if cached is not None:
+        return _json_bytes_response(cached)
+
+    try:
+        analysis = Analysis.objects.defer("raw_comments", "summary_result").get(id=analysis_id)
     except Analysis.DoesNotExist:
         return JsonResponse({"error": "Analiz bulunamadı."}, status=404)
 
+    # Finished analyses are described by their status column; only running
+    # ones are worth a round trip to the result backend.
     task_state = None
-    if analysis.task_id:
+    if analysis.task_id and analysis.status in (Analysis.Status.PENDING, Analysis.Status.PROCESSING):
         task_state = AsyncResult(analysis.task_id).state
 
     response = {
@@ -86,11 +311,422 @@ def analysis_detail_view(request: HttpRequest, analysis_id) -> JsonResponse:
         "task_state": task_state,
         "created_at": analysis.created_at.isoformat(),
     }
+    if fields is None or "metrics" in fields:
+        response["metrics"] = analysis.metrics
 
-    if analysis.status == Analysis.Status.COMPLETED:
-        response["raw_comments"] = analysis.raw_comments
+    if analysis.status == Analysis.Status.COMPLETED and fields is not None:
+        response.update(_selected_result(analysis, fields))
+    elif analysis.status == Analysis.Status.COMPLETED:
+        analysis.refresh_from_db(fields=["raw_comments", "summary_result"])
+        response["raw_comments"] = {**analysis.raw_comments, "comments": load_classified_comments(analysis)}
         response["summary_result"] = analysis.summary_result
     elif analysis.status == Analysis.Status.FAILED:
+        analysis.refresh_from_db(fields=["raw_comments"])
         response["error"] = analysis.raw_comments.get("error", "Bilinmeyen hata")
+    elif analysis.status == Analysis.Status.CANCELLED:
+        response["error"] = "Analiz iptal edildi."
+    elif fields is not None and "partial" in fields:
+        # Still running: only what the finished classification batches already know.
+        response["partial"] = partial_distributions(str(analysis.id))
+
+    body = dumps_json(response)
+    if analysis.status == Analysis.Status.COMPLETED:
+        cache_result(str(analysis.id), variant, body)
+    return _json_bytes_response(body)
+
+
+@require_GET
+def analysis_comments_view(request: HttpRequest, analysis_id) -> HttpResponse:
+    try:
+        filters = _comment_filters(request)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    try:
+        analysis = Analysis.objects.only("id", "status", "raw_comments", "archived_at").get(id=analysis_id)
+    except Analysis.DoesNotExist:
+        return JsonResponse({"error": "Analiz bulunamadı."}, status=404)
+
+    if analysis.status != Analysis.Status.COMPLETED:
+        return JsonResponse(
+            {"error": "Yorumlar yalnızca tamamlanan analizler için listelenebilir.", "status": analysis.status},
+            status=409,
+        )
+
+    comments, next_after = page_classified_comments(analysis, **filters)
+    return _json_bytes_response(
+        dumps_json(
+            {
+                "analysis_id": str(analysis.id),
+                "comments": comments,
+                "next_cursor": _encode_cursor(next_after) if next_after is not None else None,
+            }
+        )
+    )
+
+
+@csrf_exempt
+@require_POST
+def analysis_resume_view(request: HttpRequest, analysis_id) -> JsonResponse:
+    try:
+        analysis = Analysis.objects.only("id", "url", "status", "parameters", "client_id", "task_id").get(id=analysis_id)
+    except Analysis.DoesNotExist:
+        return JsonResponse({"error": "Analiz bulunamadı."}, status=404)
+
+    if analysis.status != Analysis.Status.FAILED:
+        return JsonResponse(
+            {"error": "Sadece başarısız analizler devam ettirilebilir.", "status": analysis.status},
+            status=409,
+        )
+
+    try:
+        # The client's slot is counted and taken under one lock, so a
+        # concurrent submit or resume cannot pass the same check.
+        with client_admission_lock(analysis.client_id):
+            decision = check_admission(
+                analysis.client_id, clamp_deadline_seconds(analysis.parameters.get("deadline_seconds"))
+            )
+            if not decision["admitted"]:
+                return _rejected_response(decision)
+            # Re-checked under the row lock so concurrent resumes cannot both
+            # dispatch a pipeline over the same checkpoints.
+            with transaction.atomic():
+                status = Analysis.objects.select_for_update().values_list("status", flat=True).get(id=analysis.id)
+                if status != Analysis.Status.FAILED:
+                    return JsonResponse(
+                        {"error": "Sadece başarısız analizler devam ettirilebilir.", "status": status},
+                        status=409,
+                    )
+                analysis.status = Analysis.Status.PENDING
+                analysis.save(update_fields=["status"])
+
+        resume_point = describe_resume_point(str(analysis.id))
+        # A resumed run gets a fresh deadline of the same length.
+        task_id = dispatch_analysis(analysis)
+    except Exception as exc:
+        logger.exception("Failed to resume analysis %s: %s", analysis_id, exc)
+        return JsonResponse({"error": "Analiz devam ettirilemedi."}, status=500)
+
+    return JsonResponse(
+        {
+            "analysis_id": str(analysis.id),
+            "task_id": task_id,
+            "status": analysis.status,
+            **resume_point,
+            **_estimated_start(decision),
+        },
+        status=202,
+    )
+
+
+@csrf_exempt
+@require_POST
+def analysis_cancel_view(request: HttpRequest, analysis_id) -> JsonResponse:
+    try:
+        # Locked like finalize_analysis, so a run that completes concurrently
+        # is either seen here as Completed or sees Cancelled itself.
+        with transaction.atomic():
+            try:
+                analysis = Analysis.objects.select_for_update().only("id", "status", "task_id").get(id=analysis_id)
+            except Analysis.DoesNotExist:
+                return JsonResponse({"error": "Analiz bulunamadı."}, status=404)
+
+            if analysis.status not in (Analysis.Status.PENDING, Analysis.Status.PROCESSING):
+                return JsonResponse(
+                    {"error": "Sadece bekleyen veya işlenen analizler iptal edilebilir.", "status": analysis.status},
+                    status=409,
+                )
+            # The flag goes first so tasks that are already running see it before
+            # their queued siblings are revoked.
+            request_cancellation(str(analysis.id))
+            analysis.status = Analysis.Status.CANCELLED
+            analysis.save(update_fields=["status"])
+
+        # The scrape holds a browser slot, so it is interrupted rather than
+        # left to notice the flag at its next page.
+        revoked = revoke_analysis_tasks(str(analysis.id), interrupt_task_id=analysis.task_id)
+        clear_checkpoints(str(analysis.id))
+        publish_progress(str(analysis.id), "cancelled", status=Analysis.Status.CANCELLED)
+        release_batch_slot(str(analysis.id))
+    except Exception as exc:
+        logger.exception("Failed to cancel analysis %s: %s", analysis_id, exc)
+        return JsonResponse({"error": "Analiz iptal edilemedi."}, status=500)
+
+    return JsonResponse(
+        {
+            "analysis_id": str(analysis.id),
+            "status": analysis.status,
+            "revoked_task_count": len(revoked),
+        },
+        status=200,
+    )
+
+
+@async_require_GET
+async def analysis_status_view(request: HttpRequest, analysis_id) -> HttpResponse:
+    record = await aget_status_record(str(analysis_id))
+    if record is None:
+        return JsonResponse({"error": "Analiz bulunamadı."}, status=404)
+
+    etag = status_etag(record)
+    response = get_conditional_response(request, etag=etag) or JsonResponse(record, status=200)
+    response["ETag"] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+@async_require_GET
+async def analysis_events_view(request: HttpRequest, analysis_id) -> HttpResponse:
+    analysis_id = str(analysis_id)
+    if not await Analysis.objects.filter(id=analysis_id).aexists():
+        return JsonResponse({"error": "Analiz bulunamadı."}, status=404)
+
+    async def stream():
+        max_seconds = _env_seconds("SSE_MAX_SECONDS", DEFAULT_SSE_MAX_SECONDS, 30, MAX_SSE_SECONDS)
+        heartbeat = _env_seconds("SSE_HEARTBEAT_SECONDS", DEFAULT_SSE_HEARTBEAT_SECONDS, 1, 60)
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        async for event, data in watch_status(analysis_id, max_seconds, heartbeat):
+            if data is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stops nginx-style proxies from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@async_require_GET
+async def analysis_wait_view(request: HttpRequest, analysis_id) -> JsonResponse:
+    statuses = {value.strip() for value in request.GET.get("status", "").split(",") if value.strip()}
+    invalid = statuses - set(Analysis.Status.values)
+    if invalid:
+        return JsonResponse({"error": f"Geçersiz status: {', '.join(sorted(invalid))}."}, status=400)
+    try:
+        timeout = int(request.GET.get("timeout", DEFAULT_WAIT_SECONDS))
+    except ValueError:
+        return JsonResponse({"error": "timeout tam sayı olmalı."}, status=400)
+    timeout = max(0, min(timeout, MAX_WAIT_SECONDS))
+
+    # Without an explicit status the caller waits for the analysis to finish.
+    waiting = statuses or {Analysis.Status.PENDING, Analysis.Status.PROCESSING}
+    record, timed_out = await wait_for_status_change(str(analysis_id), waiting, timeout)
+    if record is None:
+        return JsonResponse({"error": "Analiz bulunamadı."}, status=404)
+
+    response = JsonResponse({**record, "timed_out": timed_out}, status=200)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+@async_require_GET
+async def analysis_progress_view(request: HttpRequest, analysis_id) -> JsonResponse:
+    progress = await aget_progress(str(analysis_id))
+    if progress is not None:
+        return JsonResponse(progress, status=200)
+
+    # Record expired or Redis unavailable: fall back to the status column only.
+    row = await Analysis.objects.filter(id=analysis_id).values("status").afirst()
+    if row is None:
+        return JsonResponse({"error": "Analiz bulunamadı."}, status=404)
+    return JsonResponse({"analysis_id": str(analysis_id), "status": row["status"], "stage": None}, status=200)
+
+
+@require_GET
+def product_history_view(request: HttpRequest) -> JsonResponse:
+    product_key = request.GET.get("product_key", "").strip()
+    url = request.GET.get("url", "").strip()
+    if not product_key and not url:
+        return JsonResponse({"error": "url veya product_key parametresi gerekli."}, status=400)
+    if not product_key:
+        product_key = canonical_product_key(url)
+
+    try:
+        days = int(request.GET.get("days", DEFAULT_HISTORY_DAYS))
+        limit = int(request.GET.get("limit", DEFAULT_HISTORY_LIMIT))
+    except ValueError:
+        return JsonResponse({"error": "days ve limit tam sayı olmalı."}, status=400)
+    days = max(1, min(days, 3650))
+    limit = max(1, min(limit, MAX_HISTORY_LIMIT))
+
+    product = Product.objects.filter(key=product_key).first()
+    if product is None:
+        return JsonResponse({"error": "Bu ürün için tamamlanmış analiz yok.", "product_key": product_key}, status=404)
+
+    points = product_history(product, days=days, limit=limit)
+    trend = None
+    if len(points) >= 2:
+        trend = {
+            "from": points[0]["completed_at"],
+            "to": points[-1]["completed_at"],
+            "net_sentiment_change": round(points[-1]["net_sentiment"] - points[0]["net_sentiment"], 4),
+            "positive_ratio_change": round(points[-1]["positive_ratio"] - points[0]["positive_ratio"], 4),
+        }
+    return JsonResponse(
+        {
+            "product_key": product.key,
+            "domain": product.domain,
+            "url": product.url,
+            "points": points,
+            "trend": trend,
+        },
+        status=200,
+    )
+
+
+@require_GET
+def review_search_view(request: HttpRequest) -> HttpResponse:
+    query = request.GET.get("q", "").strip()
+    if len(query) < 2:
+        return JsonResponse({"error": "q parametresi en az 2 karakter olmalı."}, status=400)
+
+    try:
+        filters = _comment_filters(request)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    filters["before"] = filters.pop("after", None)
+
+    product = None
+    product_key = request.GET.get("product_key", "").strip()
+    url = request.GET.get("url", "").strip()
+    if product_key or url:
+        product_key = product_key or canonical_product_key(url)
+        product = Product.objects.filter(key=product_key).first()
+        if product is None:
+            return JsonResponse({"error": "Bu ürün için saklanmış yorum yok.", "product_key": product_key}, status=404)
+
+    results, next_before = search_reviews(query, product=product, **filters)
+    return _json_bytes_response(
+        dumps_json(
+            {
+                "query": query,
+                "results": results,
+                "next_cursor": _encode_cursor(next_before) if next_before is not None else None,
+            }
+        )
+    )
+
+
+@csrf_exempt
+@require_POST
+def batch_submit_view(request: HttpRequest) -> JsonResponse:
+    try:
+        payload = json.loads(request.body.decode("utf-8"))
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Geçersiz JSON payload."}, status=400)
+
+    urls = payload.get("urls")
+    if not isinstance(urls, list) or not urls:
+        return JsonResponse({"error": "urls alanı boş olmayan bir liste olmalı."}, status=400)
+    if len(urls) > MAX_BATCH_URLS:
+        return JsonResponse({"error": f"Bir batch en fazla {MAX_BATCH_URLS} URL içerebilir."}, status=400)
+    urls = [str(url).strip() for url in urls]
+    invalid = [url for url in urls if not _is_valid_url(url)]
+    if invalid:
+        return JsonResponse({"error": "Geçersiz URL'ler var.", "invalid_urls": invalid[:20]}, status=400)
+
+    try:
+        parameters = _analysis_parameters(payload)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    try:
+        max_parallel = int(payload.get("max_parallel") or DEFAULT_BATCH_PARALLELISM)
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "max_parallel tam sayı olmalı."}, status=400)
+    max_parallel = max(1, min(max_parallel, MAX_BATCH_PARALLELISM))
+
+    # Children are throttled by max_parallel, so only the shared queue is
+    # checked here, not the per-client limit.
+    client_id = _client_id(request)
+    decision = check_admission(client_id, parameters["deadline_seconds"], check_client_limit=False)
+    if not decision["admitted"]:
+        return _rejected_response(decision)
+
+    try:
+        batch = AnalysisBatch.objects.create(parameters={**parameters, "max_parallel": max_parallel})
+        # One child analysis per product; repeated links reuse the first one.
+        analyses_by_key: dict[str, Analysis] = {}
+        items = []
+        for url in urls:
+            key = canonical_product_key(url)
+            if key not in analyses_by_key:
+                analyses_by_key[key] = Analysis(
+                    url=url,
+                    status=Analysis.Status.PENDING,
+                    parameters=parameters,
+                    product_key=key,
+                    client_id=client_id,
+                    batch=batch,
+                )
+            items.append({"url": url, "product_key": key, "analysis_id": str(analyses_by_key[key].id)})
+        Analysis.objects.bulk_create(analyses_by_key.values())
+        batch.items = items
+        batch.save(update_fields=["items"])
+        advance_analysis_batch.delay(str(batch.id))
+    except Exception as exc:
+        logger.exception("Failed to create analysis batch: %s", exc)
+        return JsonResponse({"error": "Batch başlatılamadı."}, status=500)
+
+    return JsonResponse(
+        {
+            "batch_id": str(batch.id),
+            "status": batch.status,
+            "total_urls": len(urls),
+            "unique_products": len(analyses_by_key),
+            "duplicate_urls": len(urls) - len(analyses_by_key),
+            "max_parallel": max_parallel,
+        },
+        status=202,
+    )
+
+
+@require_GET
+def batch_detail_view(request: HttpRequest, batch_id) -> JsonResponse:
+    try:
+        batch = AnalysisBatch.objects.get(id=batch_id)
+    except AnalysisBatch.DoesNotExist:
+        return JsonResponse({"error": "Batch bulunamadı."}, status=404)
+
+    include_summary = request.GET.get("include_summary") in {"1", "true"}
+    fields = ["id", "status", "raw_comments__comment_count", "raw_comments__error"]
+    if include_summary:
+        fields.append("summary_result")
+    children = {str(row["id"]): row for row in Analysis.objects.filter(batch_id=batch.id).values(*fields)}
+
+    counts = {status: 0 for status in Analysis.Status.values}
+    for row in children.values():
+        counts[row["status"]] += 1
+    finished = counts[Analysis.Status.COMPLETED] + counts[Analysis.Status.FAILED] + counts[Analysis.Status.CANCELLED]
+
+    items = []
+    for item in batch.items:
+        row = children.get(item["analysis_id"])
+        if row is None:
+            items.append({**item, "status": None})
+            continue
+        entry = {**item, "status": row["status"]}
+        if row["status"] == Analysis.Status.COMPLETED:
+            entry["comment_count"] = row["raw_comments__comment_count"]
+            if include_summary:
+                entry["summary_result"] = row["summary_result"]
+        elif row["status"] == Analysis.Status.FAILED:
+            entry["error"] = row["raw_comments__error"] or "Bilinmeyen hata"
+        items.append(entry)
 
-    return JsonResponse(response, status=200)
+    return JsonResponse(
+        {
+            "batch_id": str(batch.id),
+            "status": batch.status,
+            "created_at": batch.created_at.isoformat(),
+            "completed_at": batch.completed_at.isoformat() if batch.completed_at else None,
+            "parameters": batch.parameters,
+            "total_urls": len(batch.items),
+            "unique_products": len(children),
+            "finished": finished,
+            "counts": counts,
+            "items": items,
+        },
+        status=200,
+    )
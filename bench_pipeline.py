@@ -0,0 +1,98 @@
+"""Scraping hariç analiz pipeline'ını mock LLM ile ağsız ölçer.
+
+Sentetik (veya --input ile verilen JSON) yorumlar hazırlama, shortlist,
+sınıflandırma ve özet aşamalarından geçirilir. LLM_PROVIDER varsayılan olarak
+'mock' yapılır; gecikme/hata profili MOCK_LLM_* ortam değişkenleriyle ayarlanır.
+
+Kullanım:
+    MOCK_LLM_LATENCY_MS=800 MOCK_LLM_LATENCY_DISTRIBUTION=lognormal python bench_pipeline.py --comments 1500
+    python bench_pipeline.py --input yorumlar.json --shortlist-size 600 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("LLM_PROVIDER", "mock")
+
+from analysis.services.comments import (  # noqa: E402
+    build_decision_comment_shortlist,
+    duplicate_comment_insights,
+    normalized_repeat_counts,
+    prepare_comments_for_model,
+)
+from analysis.services.sentiment import classify_comments  # noqa: E402
+from analysis.services.summary import build_langchain_summary  # noqa: E402
+
+SUBJECTS = ["Ürün", "Kumaşı", "Kargo", "Fiyatı", "Kokusu", "Rengi", "Paketleme", "Kalitesi"]
+OPINIONS = [
+    "çok güzel, tam beklediğim gibi",
+    "berbat, iki günde bozuldu",
+    "fiyat performans olarak gayet iyi",
+    "beden küçük geldi, iade ettim",
+    "kargo geç geldi ama ürün kaliteli",
+    "idare eder, çok da memnun değilim",
+    "rengi solmadı, yıkamadan sonra da iyi",
+    "kokusu ağır, cildimde kızarıklık yaptı",
+]
+
+
+def synthetic_comments(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return [f"{rng.choice(SUBJECTS)} {rng.choice(OPINIONS)}. {rng.randint(1, 40)} gündür kullanıyorum." for _ in range(count)]
+
+
+def run_once(raw_comments: list[str], shortlist_size: int | None) -> dict[str, float]:
+    timings: dict[str, float] = {}
+
+    started = time.perf_counter()
+    comments = prepare_comments_for_model(raw_comments, max_comments=len(raw_comments))
+    repeat_counts = normalized_repeat_counts(raw_comments)
+    duplicate_insights = duplicate_comment_insights(raw_comments)
+    timings["prepare"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    selected, selection_insights = build_decision_comment_shortlist(comments, repeat_counts, shortlist_size=shortlist_size)
+    timings["shortlist"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    classified = classify_comments(selected)
+    timings["classify"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    build_langchain_summary(classified, duplicate_insights=duplicate_insights, selection_insights=selection_insights)
+    timings["summary"] = time.perf_counter() - started
+
+    timings["total"] = sum(timings.values())
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--comments", type=int, default=1500, help="Sentetik yorum sayısı.")
+    parser.add_argument("--input", type=Path, help="Yorum metinlerinden oluşan JSON liste dosyası.")
+    parser.add_argument("--shortlist-size", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.input:
+        raw_comments = [str(c) for c in json.loads(args.input.read_text(encoding="utf-8"))]
+    else:
+        raw_comments = synthetic_comments(args.comments, args.seed)
+
+    runs = [run_once(raw_comments, args.shortlist_size) for _ in range(max(1, args.repeat))]
+    print(f"provider={os.getenv('LLM_PROVIDER')} comments={len(raw_comments)} repeat={len(runs)}")
+    for stage in runs[0]:
+        samples = [run[stage] for run in runs]
+        print(f"{stage:<10} median={statistics.median(samples):>8.3f} s  min={min(samples):>8.3f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
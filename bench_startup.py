@@ -0,0 +1,158 @@
+"""Web, worker ve MCP süreçlerinin soğuk başlangıç (import) süresini ölçer.
+
+Her hedef taze bir Python alt sürecinde import edilir, böylece modül önbelleği
+ölçümü etkilemez. Sonuçlar istenirse JSONL geçmiş dosyasına eklenir ve bütçe
+aşılırsa sıfırdan farklı çıkış kodu döner (CI'da regresyon yakalamak için).
+
+Kullanım:
+    python bench_startup.py
+    python bench_startup.py --repeat 7 --history startup_history.jsonl
+    python bench_startup.py --target web --top 15
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+TARGETS = {
+    "web": (
+        "import config.wsgi\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+    ),
+    "worker": (
+        "from config.celery import app\n"
+        "app.loader.import_default_modules()\n"
+    ),
+    "mcp": "import mcp_server\n",
+}
+
+# Roughly twice the medians seen on a dev machine (web ~370, worker ~440,
+# mcp ~1100 ms, of which ~1000 ms is fastmcp/mcp itself), so ordinary machine
+# noise stays green and a reintroduced eager LangChain import does not.
+DEFAULT_BUDGETS_MS = {
+    "web": int(os.getenv("STARTUP_BUDGET_WEB_MS", "800")),
+    "worker": int(os.getenv("STARTUP_BUDGET_WORKER_MS", "1000")),
+    "mcp": int(os.getenv("STARTUP_BUDGET_MCP_MS", "2500")),
+}
+
+TIMER_TEMPLATE = (
+    "import time\n"
+    "_t0 = time.perf_counter()\n"
+    "{code}"
+    "print(round((time.perf_counter() - _t0) * 1000, 2))\n"
+)
+
+
+def _child_env() -> dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def measure_import_ms(target: str) -> float:
+    code = TIMER_TEMPLATE.format(code=TARGETS[target])
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BASE_DIR,
+        env=_child_env(),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{target} import edilemedi:\n{proc.stderr.strip()[-2000:]}")
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def heaviest_imports(target: str, top: int) -> list[tuple[str, float]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", TARGETS[target]],
+        cwd=BASE_DIR,
+        env=_child_env(),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    rows: list[tuple[str, float]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|", 2)
+        try:
+            cumulative_ms = int(cumulative.strip()) / 1000
+        except ValueError:
+            continue
+        # Only top-level modules, otherwise nested imports are counted twice.
+        if module.startswith(" ") and not module.startswith("  "):
+            rows.append((module.strip(), cumulative_ms))
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows[:top]
+
+
+def run_benchmark(targets: list[str], repeat: int) -> dict[str, dict[str, float]]:
+    results: dict[str, dict[str, float]] = {}
+    for target in targets:
+        # Warm-up run fills the OS file cache; it is not recorded.
+        measure_import_ms(target)
+        samples = [measure_import_ms(target) for _ in range(repeat)]
+        results[target] = {
+            "min_ms": min(samples),
+            "median_ms": round(statistics.median(samples), 2),
+            "max_ms": max(samples),
+            "budget_ms": DEFAULT_BUDGETS_MS[target],
+        }
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=sorted(TARGETS), action="append", help="Ölçülecek süreç (tekrar verilebilir).")
+    parser.add_argument("--repeat", type=int, default=5, help="Hedef başına ölçüm sayısı.")
+    parser.add_argument("--history", type=Path, help="Sonuçların ekleneceği JSONL dosyası.")
+    parser.add_argument("--top", type=int, default=0, help="En pahalı N top-level import'u listele.")
+    args = parser.parse_args()
+
+    targets = args.target or list(TARGETS)
+    started = time.perf_counter()
+    results = run_benchmark(targets, max(1, args.repeat))
+
+    over_budget = []
+    for target, row in results.items():
+        flag = "OK"
+        if row["median_ms"] > row["budget_ms"]:
+            flag = "BÜTÇE AŞILDI"
+            over_budget.append(target)
+        print(
+            f"{target:<7} median={row['median_ms']:>8.1f} ms  "
+            f"min={row['min_ms']:>8.1f} ms  budget={row['budget_ms']} ms  {flag}"
+        )
+        if args.top:
+            for module, cumulative_ms in heaviest_imports(target, args.top):
+                print(f"        {cumulative_ms:>8.1f} ms  {module}")
+
+    if args.history:
+        record = {
+            "measured_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with args.history.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    print(f"Toplam süre: {time.perf_counter() - started:.1f} s")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,38 @@
 import os
 
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 app = Celery("config")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
+
+
+def _warm_up() -> None:
+    from analysis.services.warmup import warm_up_worker, warmup_enabled
+
+    if warmup_enabled():
+        warm_up_worker()
+
+
+@worker_process_init.connect
+def warm_up_pool_process(**kwargs) -> None:
+    # Prefork children and the solo pool: each process warms itself before taking tasks.
+    _warm_up()
+
+
+@worker_init.connect
+def warm_up_threaded_worker(sender=None, **kwargs) -> None:
+    # The thread pool runs tasks in the main process and never sends
+    # worker_process_init.
+    pool_cls = getattr(sender, "pool_cls", None)
+    pool_name = pool_cls if isinstance(pool_cls, str) else getattr(pool_cls, "__module__", "")
+    if "thread" not in str(pool_name):
+        return
+
+    import django
+
+    django.setup()
+    _warm_up()
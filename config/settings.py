@@ -19,6 +19,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "analysis.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -74,8 +75,32 @@ USE_TZ = True
 STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
-CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", os.getenv("REDIS_URL", "redis://redis:6379/0"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+ANALYSIS_PROGRESS_TTL_SECONDS = int(os.getenv("ANALYSIS_PROGRESS_TTL_SECONDS", str(24 * 3600)))
+
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", REDIS_URL)
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/1")
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 1800
 CELERY_TASK_SOFT_TIME_LIMIT = 1700
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Each queue gets its own worker profile (see docker-compose.yml): browser-bound
+# scraping is limited by Selenium Grid slots, LLM calls are IO-bound.
+CELERY_SCRAPE_QUEUE = os.getenv("CELERY_SCRAPE_QUEUE", "scrape")
+CELERY_LLM_QUEUE = os.getenv("CELERY_LLM_QUEUE", "llm")
+CELERY_CPU_QUEUE = os.getenv("CELERY_CPU_QUEUE", "cpu")
+CELERY_TASK_DEFAULT_QUEUE = CELERY_CPU_QUEUE
+CELERY_TASK_ROUTES = {
+    "analysis.process_product_reviews": {"queue": CELERY_SCRAPE_QUEUE},
+    "analysis.prepare_analysis_corpus": {"queue": CELERY_CPU_QUEUE},
+    "analysis.classify_comment_batch": {"queue": CELERY_LLM_QUEUE},
+    # Finalize runs on prefork so CELERY_TASK_TIME_LIMIT is enforced; the
+    # thread pool ignores time limits.
+    "analysis.finalize_analysis": {"queue": CELERY_CPU_QUEUE},
+    "analysis.fail_analysis_on_error": {"queue": CELERY_CPU_QUEUE},
+    "analysis.advance_analysis_batch": {"queue": CELERY_CPU_QUEUE},
+}
+CELERY_SCRAPE_CONCURRENCY = int(os.getenv("CELERY_SCRAPE_CONCURRENCY", "2"))
+CELERY_LLM_CONCURRENCY = int(os.getenv("CELERY_LLM_CONCURRENCY", "32"))
+CELERY_CPU_CONCURRENCY = int(os.getenv("CELERY_CPU_CONCURRENCY", "2"))
@@ -81,9 +81,10 @@ def save_to_json(data, filename):
         print(f"❌ Kayıt hatası: {e}")
         return None
 
-def run(url, max_reviews=None):
+def run(url, max_reviews=None, progress_callback=None, time_budget=None, should_stop=None):
     start_time = datetime.now()
     driver = None
+    timeout = REQUEST_TIMEOUT if time_budget is None else max(10, min(REQUEST_TIMEOUT, time_budget))
     
     try:
         url = validate_url(url)
@@ -121,7 +122,7 @@ def run(url, max_reviews=None):
         driver.get(url)
         time.sleep(RATE_LIMIT_DELAY)
         
-        if (datetime.now() - start_time).seconds > REQUEST_TIMEOUT:
+        if (datetime.now() - start_time).seconds > timeout:
             raise ScraperSecurityError("İşlem zaman aşımına uğradı")
         
         url_sku_match = re.search(r'-p-([A-Z0-9]+)(?:-yorumlari)?', url)
@@ -156,9 +157,12 @@ def run(url, max_reviews=None):
         retry_count = 0
         
         while len(all_reviews) < max_reviews:
-            if (datetime.now() - start_time).seconds > REQUEST_TIMEOUT:
+            if (datetime.now() - start_time).seconds > timeout:
                 logger.warning("Zaman aşımı - mevcut yorumlar döndürülüyor")
                 break
+            if should_stop and should_stop():
+                logger.info("Analiz iptal edildi - yorum çekme durduruluyor")
+                break
             
             api_url = f"{base_api_url}?sku={sku}&from={offset}&size={page_size}&includeSiblingVariantContents=true&includeSummary=true"
             
@@ -194,6 +198,8 @@ def run(url, max_reviews=None):
                         })
                 
                 print(f"   -> Blok: {offset}-{offset+page_size} | +{len(content_list)} yorum | Toplam: {len(all_reviews)}")
+                if progress_callback:
+                    progress_callback(len(all_reviews))
                 
                 if len(content_list) < page_size:
                     logger.info("Son paket alındı")
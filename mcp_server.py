@@ -1,13 +1,113 @@
 import asyncio
+import logging
+import math
 import os
+import random
+import re
 import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
 
 import httpx
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
+
+from analysis.services.products import canonical_product_key
 
 DJANGO_BASE_URL = os.getenv("DJANGO_BASE_URL", "http://web:8000")
 POLL_INTERVAL = int(os.getenv("MCP_POLL_INTERVAL", "5"))
 MAX_POLL_SECONDS = int(os.getenv("MCP_MAX_POLL_SECONDS", "600"))
+WAIT_SECONDS = int(os.getenv("MCP_WAIT_SECONDS", "55"))
+CHECK_WAIT_SECONDS = int(os.getenv("MCP_CHECK_WAIT_SECONDS", "20"))
+PROGRESS_INTERVAL = int(os.getenv("MCP_PROGRESS_INTERVAL", "10"))
+PARTIAL_MARGIN_SECONDS = int(os.getenv("MCP_PARTIAL_MARGIN_SECONDS", "20"))
+COMPARE_MAX_PRODUCTS = int(os.getenv("MCP_COMPARE_MAX_PRODUCTS", "5"))
+# The backend's per-client admission limit is what really bounds parallel
+# analyses; this only lowers it further when set.
+COMPARE_CONCURRENCY = int(os.getenv("MCP_COMPARE_CONCURRENCY", str(COMPARE_MAX_PRODUCTS)))
+COMPARE_MAX_AGE_HOURS = int(os.getenv("MCP_COMPARE_MAX_AGE_HOURS", "24"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("MCP_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("MCP_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("MCP_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_RETRIES = int(os.getenv("MCP_HTTP_RETRIES", "3"))
+HTTP_RETRY_BACKOFF = float(os.getenv("MCP_HTTP_RETRY_BACKOFF", "0.5"))
+HTTP2 = os.getenv("MCP_HTTP2", "false").lower() in {"1", "true", "yes"}
+CLIENT_ID = os.getenv("MCP_CLIENT_ID", "").strip()
+
+# The request never reached the server, so any method may be retried.
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# A pooled keep-alive connection the server already closed; only safe to replay for GET.
+RETRYABLE_GET_ERRORS = RETRYABLE_ERRORS + (httpx.RemoteProtocolError, httpx.ReadError)
+
+logger = logging.getLogger(__name__)
+
+_http_client: httpx.AsyncClient | None = None
+# Used as the admission client id when a call carries no MCP session.
+_PROCESS_SESSION_ID = f"process-{os.getpid()}-{random.getrandbits(32):08x}"
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("MCP_HTTP2 is set but the 'h2' package is missing; using HTTP/1.1")
+            http2 = False
+    return httpx.AsyncClient(
+        base_url=DJANGO_BASE_URL,
+        timeout=30.0,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def _client() -> httpx.AsyncClient:
+    # Normally opened by the server lifespan; created lazily when the tools
+    # are called without it (e.g. in-process).
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _build_client()
+    return _http_client
+
+
+_lifespan_users = 0
+
+
+@asynccontextmanager
+async def lifespan(server):
+    # Some FastMCP/transport versions enter the lifespan once per session, so
+    # the client is shared and only closed when the last one exits.
+    global _http_client, _lifespan_users
+    _lifespan_users += 1
+    client = _client()
+    try:
+        yield {"http_client": client}
+    finally:
+        _lifespan_users -= 1
+        if _lifespan_users == 0 and _http_client is not None:
+            client, _http_client = _http_client, None
+            await client.aclose()
+
+
+async def _request(method: str, path: str, **kwargs) -> httpx.Response:
+    """Django API'sine paylaşılan istemciyle istek atar; bağlantı hatalarında geri çekilerek tekrar dener."""
+    retryable = RETRYABLE_GET_ERRORS if method == "GET" else RETRYABLE_ERRORS
+    for attempt in range(HTTP_RETRIES + 1):
+        try:
+            return await _client().request(method, path, **kwargs)
+        except retryable as exc:
+            if attempt == HTTP_RETRIES:
+                raise
+            delay = HTTP_RETRY_BACKOFF * 2**attempt * random.uniform(0.5, 1.5)
+            logger.warning("%s %s failed (%s), retrying in %.2fs", method, path, exc, delay)
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
 
 mcp = FastMCP(
     name="Ürün Yorum Analizi",
@@ -16,77 +116,298 @@ mcp = FastMCP(
         "analyze_product() ile URL ver, LLM destekli sentiment analizi ve özet rapor al. "
         "Desteklenen siteler: trendyol.com, hepsiburada.com"
     ),
+    lifespan=lifespan,
 )
 
 
+RESULT_FIELDS = "summary,counts,degradations"
+COMPARE_FIELDS = "counts,distribution,themes,insights"
+PRODUCT_ID_SUFFIX_RE = re.compile(r"-(p|pm|hb[a-z]*)-?[\w]*$", flags=re.IGNORECASE)
+
+DEGRADATION_LABELS = {
+    "stopped_early": "yorum çekme süre sınırı nedeniyle erken durduruldu",
+    "shortlist_reduced": "LLM'e gönderilen yorum sayısı azaltıldı",
+    "batch_size_reduced": "sınıflandırma daha küçük paketlerle yapıldı",
+    "concurrency_raised": "sınıflandırma paralelliği artırıldı",
+    "keyword_fallback": "bazı yorumlar anahtar kelime yöntemiyle sınıflandırıldı",
+    "theme_map_skipped": "tema bazlı ara özetler atlandı",
+    "llm_skipped": "özet LLM olmadan üretildi",
+}
+
+
+# Share of the 0-100 progress bar each pipeline stage covers.
+STAGE_PROGRESS = {
+    "queued": (0, 5),
+    "scraping": (5, 40),
+    "preparing": (40, 45),
+    "classifying": (45, 90),
+    "summarizing": (90, 98),
+    "completed": (100, 100),
+}
+
+STAGE_LABELS = {
+    "queued": "Sırada bekliyor",
+    "scraping": "Yorumlar çekiliyor",
+    "preparing": "Yorumlar hazırlanıyor",
+    "classifying": "Sentiment sınıflandırması",
+    "summarizing": "Özet rapor yazılıyor",
+    "completed": "Tamamlandı",
+}
+
+
+def _progress_update(record: dict, max_reviews: int) -> tuple[float, str]:
+    stage = record.get("stage") or "queued"
+    low, high = STAGE_PROGRESS.get(stage, (0, 0))
+    parts = [STAGE_LABELS.get(stage, stage)]
+    fraction = 0.0
+    if stage == "scraping":
+        scraped = record.get("reviews_scraped", 0)
+        fraction = scraped / max(max_reviews, 1)
+        parts.append(f"{scraped} yorum")
+    elif stage == "classifying" and record.get("batches_total"):
+        fraction = record.get("batches_done", 0) / record["batches_total"]
+        parts.append(f"batch {record.get('batches_done', 0)}/{record['batches_total']}")
+    return low + (high - low) * min(fraction, 1.0), " — ".join(parts)
+
+
+async def _report_progress(ctx: Context | None, record: dict, max_reviews: int) -> None:
+    if ctx is None:
+        return
+    progress, message = _progress_update(record, max_reviews)
+    try:
+        await ctx.report_progress(progress=progress, total=100, message=message)
+    except TypeError:
+        # FastMCP releases before progress messages.
+        await ctx.report_progress(progress=progress, total=100)
+
+
+def _partial_report(analysis_id: str, data: dict, record: dict, max_reviews: int) -> str:
+    # ``data`` is the ?fields=partial detail response; the stage and batch
+    # counters come from the last wait record.
+    partial = data.get("partial") or {}
+    sentiments = partial.get("sentiment_distribution", {})
+    themes = sorted(partial.get("theme_distribution", {}).items(), key=lambda item: -item[1])[:5]
+    stage = _progress_update(record, max_reviews)[1] if record.get("stage") else "-"
+    return (
+        f"## Ara Sonuç (analiz sürüyor)\n\n"
+        f"- Aşama: {stage}\n"
+        f"- Şimdiye kadar sınıflandırılan: {partial.get('classified_count', 0)} yorum "
+        f"({partial.get('batches_done', 0)} batch)\n"
+        f"- Dağılım: Negatif {sentiments.get('Negatif', 0)}, Nötr {sentiments.get('Nötr', 0)}, "
+        f"Pozitif {sentiments.get('Pozitif', 0)}\n"
+        f"- Öne çıkan temalar: {', '.join(f'{theme} ({count})' for theme, count in themes) or '-'}\n\n"
+        f"Bu sonuç kesin değil; analiz arka planda devam ediyor. "
+        f"Tam rapor için: check_analysis('{analysis_id}')"
+    )
+
+
+def _degradation_note(raw: dict) -> str:
+    actions = {item.get("action") for item in raw.get("degradations", [])}
+    labels = [DEGRADATION_LABELS.get(action, action) for action in sorted(a for a in actions if a)]
+    if not labels:
+        return ""
+    return "- Süre sınırı nedeniyle: " + "; ".join(labels) + "\n"
+
+
+async def _wait_for_finish(analysis_id: str, seconds: float) -> dict:
+    seconds = max(0, int(seconds))
+    resp = await _request(
+        "GET",
+        f"/api/analyses/{analysis_id}/wait/",
+        params={"timeout": seconds},
+        timeout=seconds + 15.0,
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def _fetch_result(analysis_id: str, fields: str = RESULT_FIELDS) -> dict:
+    resp = await _request("GET", f"/api/analyses/{analysis_id}/", params={"fields": fields})
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _client_id(ctx: Context | None) -> str:
+    """Admission sınırı için istemci kimliği: ``MCP_CLIENT_ID`` ya da MCP oturumu.
+
+    Gönderilmezse tüm ajan oturumları MCP sunucusunun IP'sini paylaşır ve
+    birbirinin eşzamanlı analiz sınırını tüketir.
+    """
+    if CLIENT_ID:
+        return CLIENT_ID
+    try:
+        session_id = ctx.session_id if ctx is not None else None
+    except RuntimeError:
+        session_id = None
+    return f"mcp:{session_id or _PROCESS_SESSION_ID}"
+
+
+def _client_limited(response: httpx.Response) -> bool:
+    try:
+        return response.json().get("reason") == "client_limit"
+    except ValueError:
+        return False
+
+
+async def _submit_analysis(
+    payload: dict,
+    ctx: Context | None = None,
+    retry_until: float | None = None,
+) -> tuple[str | None, str | None]:
+    """Analizi başlatır; (analysis_id, None) ya da (None, hata mesajı) döndürür.
+
+    ``retry_until`` (monotonic) verilirse eşzamanlı analiz sınırına takılan istek,
+    bu ana kadar ``Retry-After`` kadar beklenip yeniden gönderilir.
+    """
+    while True:
+        try:
+            resp = await _request("POST", "/api/analyses/", json=payload, headers={"X-Client-Id": _client_id(ctx)})
+            resp.raise_for_status()
+            break
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 429:
+                retry_after = e.response.headers.get("Retry-After", "?")
+                remaining = retry_until - time.monotonic() if retry_until is not None else 0
+                if remaining > 0 and _client_limited(e.response):
+                    # Another analysis of this client will free the slot; the
+                    # system itself is not overloaded.
+                    delay = int(retry_after) if retry_after.isdigit() else POLL_INTERVAL
+                    await asyncio.sleep(min(max(delay, 1), remaining))
+                    continue
+                return None, f"Sistem şu an yoğun, analiz kabul edilmedi. {retry_after} saniye sonra tekrar dene."
+            return None, f"Analiz başlatılamadı: HTTP {e.response.status_code} — {e.response.text[:200]}"
+        except httpx.RequestError as e:
+            return None, f"Bağlantı hatası (Django servisi çalışıyor mu?): {e}"
+
+    data = resp.json()
+    analysis_id = data.get("analysis_id")
+    if not analysis_id:
+        return None, f"Analiz ID alınamadı. Yanıt: {data}"
+    return analysis_id, None
+
+
+async def _await_analysis(analysis_id: str, seconds: float, interval: float, on_update=None) -> dict | None:
+    """Analiz bitene kadar bekler; son durum kaydını, süre dolarsa None döndürür.
+
+    Bağlantı hataları ve 5xx yanıtlar tekrar denenir; 4xx ve okunamayan
+    yanıtlar ``httpx.HTTPStatusError``/``ValueError`` olarak hemen yükseltilir.
+    """
+    deadline = time.monotonic() + seconds
+    while (remaining := deadline - time.monotonic()) > 0:
+        try:
+            # Blocks server-side until the analysis finishes or the slice ends.
+            record = await _wait_for_finish(analysis_id, max(1, min(interval, remaining)))
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code < 500:
+                raise
+            await asyncio.sleep(POLL_INTERVAL)
+            continue
+        except httpx.RequestError:
+            await asyncio.sleep(POLL_INTERVAL)
+            continue
+        if record.get("status") not in ("Pending", "Processing"):
+            return record
+        if on_update is not None:
+            await on_update(record)
+    return None
+
+
+def _wait_error(analysis_id: str, exc: Exception) -> str:
+    if isinstance(exc, httpx.HTTPStatusError):
+        if exc.response.status_code == 404:
+            return "Analiz bulunamadı. ID'yi kontrol et."
+        return f"Analiz durumu alınamadı: HTTP {exc.response.status_code} — {exc.response.text[:200]}"
+    return f"Analiz durumu okunamadı ({exc}), check_analysis('{analysis_id}')"
+
+
 @mcp.tool()
 async def analyze_product(
     url: str,
     max_reviews: int = 1500,
     shortlist_size: int = 300,
+    deadline_seconds: int | None = None,
+    return_partial: bool = False,
+    ctx: Context | None = None,
 ) -> str:
     """
     Trendyol veya Hepsiburada ürün URL'sini alır, yorumları çekip
     LLM ile sentiment analizi yapar ve Türkçe özet rapor döndürür.
-    İşlem ürüne göre 2-10 dakika sürebilir.
+    İşlem ürüne göre 2-10 dakika sürebilir; bu sürede aşama, çekilen yorum
+    sayısı ve batch ilerlemesi MCP progress bildirimi olarak gönderilir.
 
     Args:
         url: Ürün sayfası linki (trendyol.com veya hepsiburada.com)
         max_reviews: Kaç yorum çekilsin (100-3000, varsayılan 1500)
         shortlist_size: LLM'e kaç yorum gönderilsin (80-1000, varsayılan 300).
                         Düşük = daha hızlı, Yüksek = daha kapsamlı analiz.
+        deadline_seconds: Analizin bitmesi gereken süre (60-1700 sn). Süre daralırsa
+                          yorum çekme kısaltılır, shortlist küçültülür ve özet sadeleştirilir.
+                          Verilmezse sunucunun varsayılanı uygulanır (normalde süre sınırı yok).
+        return_partial: Bekleme süresi dolmak üzereyken analiz bitmemişse, o ana kadar
+                        sınıflandırılan yorumlardan ara sonuç döndür (analiz arka planda sürer).
     """
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    payload = {"url": url, "max_reviews": max_reviews, "shortlist_size": shortlist_size}
+    if deadline_seconds is not None:
+        payload["deadline_seconds"] = deadline_seconds
+    analysis_id, error = await _submit_analysis(payload, ctx)
+    if error:
+        return error
+
+    # Short slices while a client listens for progress; the margin leaves
+    # time to build a partial result.
+    margin = PARTIAL_MARGIN_SECONDS if return_partial else 0
+    interval = PROGRESS_INTERVAL if ctx is not None else WAIT_SECONDS
+    last_record: dict = {}
+
+    async def on_update(record: dict) -> None:
+        nonlocal last_record
+        last_record = record
+        await _report_progress(ctx, record, max_reviews)
+
+    try:
+        status_data = await _await_analysis(analysis_id, MAX_POLL_SECONDS - margin, interval, on_update=on_update)
+    except (httpx.HTTPStatusError, ValueError) as e:
+        return _wait_error(analysis_id, e)
+
+    if status_data is None and return_partial:
         try:
-            resp = await client.post(
-                f"{DJANGO_BASE_URL}/api/analyses/",
-                json={
-                    "url": url,
-                    "max_reviews": max_reviews,
-                    "shortlist_size": shortlist_size,
-                },
-            )
-            resp.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            return f"Analiz başlatılamadı: HTTP {e.response.status_code} — {e.response.text[:200]}"
-        except httpx.RequestError as e:
-            return f"Bağlantı hatası (Django servisi çalışıyor mu?): {e}"
+            data = await _fetch_result(analysis_id, "partial")
+        except Exception:
+            data = {}
+        if data.get("status") in ("Pending", "Processing"):
+            return _partial_report(analysis_id, data, last_record, max_reviews)
+        if data.get("status"):
+            # Finished between the last wait slice and this fetch.
+            status_data = data
 
-        data = resp.json()
-        analysis_id = data.get("analysis_id")
-        if not analysis_id:
-            return f"Analiz ID alınamadı. Yanıt: {data}"
+    status = status_data.get("status") if status_data else None
 
-    deadline = time.monotonic() + MAX_POLL_SECONDS
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        while time.monotonic() < deadline:
-            await asyncio.sleep(POLL_INTERVAL)
-            try:
-                resp = await client.get(f"{DJANGO_BASE_URL}/api/analyses/{analysis_id}/")
-                resp.raise_for_status()
-                status_data = resp.json()
-            except Exception:
-                continue
-
-            status = status_data.get("status")
-
-            if status == "Completed":
-                summary = status_data.get("summary_result", "")
-                raw = status_data.get("raw_comments", {})
-                scraped = raw.get("scraped_count", 0)
-                prepared = raw.get("prepared_count", 0)
-                analyzed = raw.get("comment_count", 0)
-                return (
-                    f"## Analiz Tamamlandı\n\n"
-                    f"- Çekilen yorum: {scraped}\n"
-                    f"- Filtrelenmiş geçerli yorum: {prepared}\n"
-                    f"- LLM ile analiz edilen: {analyzed}\n\n"
-                    f"---\n\n{summary}"
-                )
-
-            if status == "Failed":
-                error = status_data.get("error", "Bilinmeyen hata")
-                return f"Analiz başarısız: {error}"
+    if status == "Completed":
+        await _report_progress(ctx, {"stage": "completed"}, max_reviews)
+        try:
+            status_data = await _fetch_result(analysis_id)
+        except Exception:
+            return f"Analiz tamamlandı ancak sonuç alınamadı. Şu komutla tekrar dene: check_analysis('{analysis_id}')"
+        summary = status_data.get("summary_result", "")
+        raw = status_data.get("raw_comments", {})
+        scraped = raw.get("scraped_count", 0)
+        prepared = raw.get("prepared_count", 0)
+        analyzed = raw.get("comment_count", 0)
+        return (
+            f"## Analiz Tamamlandı\n\n"
+            f"- Çekilen yorum: {scraped}\n"
+            f"- Filtrelenmiş geçerli yorum: {prepared}\n"
+            f"- LLM ile analiz edilen: {analyzed}\n"
+            f"{_degradation_note(raw)}\n"
+            f"---\n\n{summary}"
+        )
+
+    if status == "Failed":
+        error = status_data.get("error", "Bilinmeyen hata")
+        return f"Analiz başarısız: {error}"
+
+    if status == "Cancelled":
+        return f"Analiz iptal edildi ({analysis_id})."
 
     timeout_min = MAX_POLL_SECONDS // 60
     return (
@@ -96,22 +417,26 @@ async def analyze_product(
 
 
 @mcp.tool()
-async def check_analysis(analysis_id: str) -> str:
+async def check_analysis(analysis_id: str, wait_seconds: int = CHECK_WAIT_SECONDS) -> str:
     """
     Daha önce başlatılmış bir analizin durumunu ve sonucunu döndürür.
     analyze_product() zaman aşımına uğrarsa bu araçla takip edebilirsin.
+
+    Args:
+        analysis_id: Analiz ID'si
+        wait_seconds: Analiz devam ediyorsa bitmesi için en fazla kaç saniye beklensin
+                      (0-300, varsayılan 20). Biter bitmez sonuç döner.
     """
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            resp = await client.get(f"{DJANGO_BASE_URL}/api/analyses/{analysis_id}/")
-            resp.raise_for_status()
-            data = resp.json()
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                return "Analiz bulunamadı. ID'yi kontrol et."
-            return f"HTTP hatası: {e.response.status_code}"
-        except httpx.RequestError as e:
-            return f"Bağlantı hatası: {e}"
+    try:
+        data = await _wait_for_finish(analysis_id, min(wait_seconds, 300))
+        if data.get("status") == "Completed":
+            data = await _fetch_result(analysis_id)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return "Analiz bulunamadı. ID'yi kontrol et."
+        return f"HTTP hatası: {e.response.status_code}"
+    except httpx.RequestError as e:
+        return f"Bağlantı hatası: {e}"
 
     status = data.get("status")
 
@@ -123,7 +448,8 @@ async def check_analysis(analysis_id: str) -> str:
         return (
             f"## Durum: Tamamlandı\n\n"
             f"- Çekilen: {scraped} yorum\n"
-            f"- Analiz edilen: {analyzed} yorum\n\n"
+            f"- Analiz edilen: {analyzed} yorum\n"
+            f"{_degradation_note(raw)}\n"
             f"---\n\n{summary}"
         )
 
@@ -131,12 +457,225 @@ async def check_analysis(analysis_id: str) -> str:
         error = data.get("error", "Bilinmeyen hata")
         return f"Durum: Başarısız\nHata: {error}"
 
+    if status == "Cancelled":
+        return "Durum: İptal edildi"
+
     if status in ("Pending", "Processing"):
         return f"Durum: {status} — Analiz devam ediyor, biraz bekle ve tekrar dene."
 
     return f"Bilinmeyen durum: {status}"
 
 
+def _product_label(index: int, url: str) -> str:
+    segments = [segment for segment in urlparse(url).path.split("/") if segment]
+    slug = PRODUCT_ID_SUFFIX_RE.sub("", segments[-1]) if segments else urlparse(url).netloc
+    name = slug.replace("-", " ").strip() or urlparse(url).netloc
+    return f"{index}. {name[:32]}"
+
+
+async def _fresh_analysis(url: str, max_age_hours: int) -> dict | None:
+    """Ürünün ``max_age_hours`` içinde tamamlanmış son analizini ürün geçmişinden bulur."""
+    if max_age_hours <= 0:
+        return None
+    try:
+        resp = await _request(
+            "GET",
+            "/api/products/history/",
+            params={"url": url, "days": max(1, math.ceil(max_age_hours / 24)), "limit": 1},
+        )
+    except httpx.RequestError:
+        return None
+    if resp.status_code != 200:
+        return None
+    points = resp.json().get("points") or []
+    if not points:
+        return None
+    latest = points[-1]
+    if datetime.now(timezone.utc) - datetime.fromisoformat(latest["completed_at"]) > timedelta(hours=max_age_hours):
+        return None
+    return latest
+
+
+def _top_themes(themes: dict, limit: int = 3) -> str:
+    # "genel" is the catch-all bucket and says nothing about the product.
+    top = [(theme, count) for theme, count in themes.items() if theme != "genel"][:limit]
+    return ", ".join(f"{theme} ({count})" for theme, count in top) or "-"
+
+
+def _comparison_row(entry: dict) -> dict:
+    raw = entry["result"].get("raw_comments", {})
+    sentiments = raw.get("sentiment_distribution", {})
+    negative = sentiments.get("Negatif", 0)
+    neutral = sentiments.get("Nötr", 0)
+    positive = sentiments.get("Pozitif", 0)
+    total = negative + neutral + positive
+    themes = raw.get("sentiment_theme_distribution", {})
+    duplicates = raw.get("duplicate_comment_insights", {})
+    return {
+        "source": f"mevcut ({entry['reused_at'][:16].replace('T', ' ')})" if entry.get("reused_at") else "yeni analiz",
+        "analyzed": str(total),
+        "positive": f"%{round(100 * positive / total) if total else 0}",
+        "neutral": f"%{round(100 * neutral / total) if total else 0}",
+        "negative": f"%{round(100 * negative / total) if total else 0}",
+        "net": f"{(positive - negative) / total:+.2f}" if total else "0",
+        "complaints": _top_themes(themes.get("Negatif", {})),
+        "praise": _top_themes(themes.get("Pozitif", {})),
+        "repeated": str(duplicates.get("repeated_comment_instances", 0)),
+        "bots": f"{duplicates.get('suspected_bot_groups', 0)} grup / {duplicates.get('suspected_bot_instances', 0)} yorum",
+        "net_value": (positive - negative) / total if total else 0.0,
+    }
+
+
+COMPARISON_ROWS = (
+    ("source", "Kaynak"),
+    ("analyzed", "Analiz edilen yorum"),
+    ("positive", "Pozitif"),
+    ("neutral", "Nötr"),
+    ("negative", "Negatif"),
+    ("net", "Net sentiment"),
+    ("complaints", "En çok şikayet"),
+    ("praise", "En çok memnuniyet"),
+    ("repeated", "Tekrarlanan yorum"),
+    ("bots", "Bot şüphesi"),
+)
+
+
+def _comparison_report(entries: list[dict]) -> str:
+    done = [entry for entry in entries if "result" in entry]
+    lines = ["## Ürün Karşılaştırması", ""]
+    if done:
+        rows = [_comparison_row(entry) for entry in done]
+        lines.append("| | " + " | ".join(entry["label"] for entry in done) + " |")
+        lines.append("|---|" + "---|" * len(done))
+        for key, title in COMPARISON_ROWS:
+            lines.append(f"| {title} | " + " | ".join(row[key] for row in rows) + " |")
+        if len(done) > 1:
+            best = max(range(len(done)), key=lambda index: rows[index]["net_value"])
+            lines += ["", f"En olumlu algılanan: **{done[best]['label']}** (net sentiment {rows[best]['net']})."]
+    failed = [entry for entry in entries if "result" not in entry]
+    if failed:
+        lines += ["", "Karşılaştırmaya alınamayanlar:"]
+        lines += [f"- {entry['label']}: {entry['error']}" for entry in failed]
+    return "\n".join(lines)
+
+
+@mcp.tool()
+async def compare_products(
+    urls: list[str],
+    max_reviews: int = 1000,
+    shortlist_size: int = 300,
+    max_age_hours: int = COMPARE_MAX_AGE_HOURS,
+    deadline_seconds: int | None = None,
+    ctx: Context | None = None,
+) -> str:
+    """
+    Birden fazla ürünü aynı anda analiz edip yan yana karşılaştırır: sentiment dağılımı,
+    en çok şikayet ve memnuniyet temaları, tekrar/bot şüphesi. Analizler paralel yürür,
+    toplam süre en yavaş ürün kadardır.
+
+    Args:
+        urls: Karşılaştırılacak ürün linkleri (2-5 adet, trendyol.com veya hepsiburada.com)
+        max_reviews: Ürün başına çekilecek yorum (100-3000, varsayılan 1000)
+        shortlist_size: Ürün başına LLM'e gönderilecek yorum (80-1000, varsayılan 300)
+        max_age_hours: Son bu kadar saatte tamamlanmış analizi olan ürün yeniden analiz
+                       edilmez, mevcut sonuç kullanılır (0 = her zaman yeni analiz, varsayılan 24).
+        deadline_seconds: Her analizin bitmesi gereken süre (60-1700 sn). Verilmezse sunucunun
+                          varsayılanı uygulanır (normalde süre sınırı yok).
+    """
+    # Different links to the same product count once, as the backend keys them.
+    by_product: dict[str, str] = {}
+    for url in (url.strip() for url in urls):
+        if url:
+            by_product.setdefault(canonical_product_key(url), url)
+    urls = list(by_product.values())
+    if len(urls) < 2:
+        return "Karşılaştırma için en az 2 farklı ürün linki ver."
+    if len(urls) > COMPARE_MAX_PRODUCTS:
+        return f"Tek seferde en fazla {COMPARE_MAX_PRODUCTS} ürün karşılaştırılabilir."
+    payload = {"max_reviews": max_reviews, "shortlist_size": shortlist_size}
+    if deadline_seconds is not None:
+        payload["deadline_seconds"] = deadline_seconds
+
+    deadline = time.monotonic() + MAX_POLL_SECONDS
+    interval = PROGRESS_INTERVAL if ctx is not None else WAIT_SECONDS
+    # Bounds how many analyses this call runs at once; reused results skip it.
+    semaphore = asyncio.Semaphore(max(1, COMPARE_CONCURRENCY))
+    positions = {url: 0.0 for url in urls}
+
+    async def report(url: str, position: float) -> None:
+        positions[url] = position
+        if ctx is None:
+            return
+        finished = sum(1 for value in positions.values() if value >= 100)
+        try:
+            await ctx.report_progress(
+                progress=sum(positions.values()) / len(positions),
+                total=100,
+                message=f"{finished}/{len(positions)} ürün hazır",
+            )
+        except TypeError:
+            await ctx.report_progress(progress=sum(positions.values()) / len(positions), total=100)
+
+    async def run(index: int, url: str) -> dict:
+        entry = {"url": url, "label": _product_label(index, url)}
+        fresh = await _fresh_analysis(url, max_age_hours)
+        if fresh is not None:
+            entry.update(analysis_id=fresh["analysis_id"], reused_at=fresh["completed_at"])
+        else:
+            async with semaphore:
+                analysis_id, error = await _submit_analysis({**payload, "url": url}, ctx, retry_until=deadline)
+                if error:
+                    entry["error"] = error
+                    return entry
+                entry["analysis_id"] = analysis_id
+                try:
+                    record = await _await_analysis(
+                        analysis_id,
+                        deadline - time.monotonic(),
+                        interval,
+                        on_update=lambda record: report(url, _progress_update(record, max_reviews)[0]),
+                    )
+                except (httpx.HTTPStatusError, ValueError) as e:
+                    entry["error"] = _wait_error(analysis_id, e)
+                    return entry
+            if record is None:
+                entry["error"] = f"zaman aşımı, sonuç için: check_analysis('{analysis_id}')"
+                return entry
+            if record.get("status") != "Completed":
+                entry["error"] = record.get("error") or record.get("status", "Bilinmeyen durum")
+                return entry
+
+        try:
+            entry["result"] = await _fetch_result(entry["analysis_id"], COMPARE_FIELDS)
+        except Exception as exc:
+            entry["error"] = f"sonuç alınamadı ({exc}), check_analysis('{entry['analysis_id']}')"
+        await report(url, 100.0)
+        return entry
+
+    entries = await asyncio.gather(*(run(index, url) for index, url in enumerate(urls, start=1)))
+    return _comparison_report(list(entries))
+
+
+@mcp.tool()
+async def cancel_analysis(analysis_id: str) -> str:
+    """
+    Devam eden bir analizi iptal eder; tarayıcı oturumu ve LLM işleri hemen serbest bırakılır.
+    Artık ihtiyaç duyulmayan analizler için kullan.
+    """
+    try:
+        resp = await _request("POST", f"/api/analyses/{analysis_id}/cancel/")
+    except httpx.RequestError as e:
+        return f"Bağlantı hatası: {e}"
+
+    if resp.status_code == 404:
+        return "Analiz bulunamadı. ID'yi kontrol et."
+    if resp.status_code == 409:
+        return f"Analiz iptal edilemedi, durumu zaten: {resp.json().get('status')}"
+    if resp.status_code != 200:
+        return f"HTTP hatası: {resp.status_code}"
+    return f"Analiz iptal edildi ({analysis_id})."
+
+
 if __name__ == "__main__":
     port = int(os.getenv("MCP_PORT", "8001"))
     mcp.run(transport="streamable-http", host="0.0.0.0", port=port)
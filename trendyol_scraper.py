@@ -63,7 +63,7 @@ def validate_product_page(driver, wait):
     except Exception as e:
         return False, f"❌ Sayfa doğrulama hatası: {str(e)}"
 
-def trendyol_yorum_scrape(url, max_reviews=3000):
+def trendyol_yorum_scrape(url, max_reviews=3000, progress_callback=None, time_budget=None, should_stop=None):
     print("🔒 URL güvenlik kontrolü yapılıyor...")
     is_valid, message = validate_trendyol_url(url)
     if not is_valid:
@@ -112,16 +112,22 @@ def trendyol_yorum_scrape(url, max_reviews=3000):
 
     remote_url = os.getenv("SELENIUM_REMOTE_URL", "http://chrome:4444/wd/hub")
     driver = webdriver.Remote(command_executor=remote_url, options=options)
+    try:
+        return _scrape_reviews(driver, url, max_reviews, progress_callback, time_budget, should_stop)
+    finally:
+        # Always release the remote browser slot, including on cancellation.
+        driver.quit()
+
+
+def _scrape_reviews(driver, url, max_reviews, progress_callback, time_budget, should_stop):
     driver.set_page_load_timeout(30)  
 
     try:
         print(f"🌐 Sayfa yükleniyor: {url[:50]}...")
         driver.get(url)
     except TimeoutException:
-        driver.quit()
         raise Exception("⏱️ Sayfa yükleme zaman aşımı! İnternet bağlantınızı kontrol edin.")
     except WebDriverException as e:
-        driver.quit()
         raise Exception(f"❌ Sayfa yükleme hatası: {str(e)}")
     
     wait = WebDriverWait(driver, 10)
@@ -129,7 +135,6 @@ def trendyol_yorum_scrape(url, max_reviews=3000):
     print("🔍 Sayfa doğrulanıyor...")
     is_valid_page, validation_message = validate_product_page(driver, wait)
     if not is_valid_page:
-        driver.quit()
         raise Exception(validation_message)
     print(validation_message)
 
@@ -284,13 +289,20 @@ def trendyol_yorum_scrape(url, max_reviews=3000):
     last_count = 0
     stable_count = 0
     max_wait_time = 180
+    if time_budget is not None:
+        max_wait_time = max(10, min(max_wait_time, time_budget))
     start_time = time.time()
 
     while time.time() - start_time < max_wait_time:
+        if should_stop and should_stop():
+            print("⛔ Analiz iptal edildi, yorum çekme durduruluyor.")
+            return data
         time.sleep(2)
         current_count = len(driver.find_elements(By.CSS_SELECTOR, "div.review"))
         if current_count != last_count and current_count > 0:
             print(f"   Yüklenen: {current_count} yorum")
+            if progress_callback:
+                progress_callback(current_count)
         if current_count >= max_reviews:
             print(f"✓ Maksimum {max_reviews} yoruma ulaşıldı!")
             break
@@ -307,7 +319,6 @@ def trendyol_yorum_scrape(url, max_reviews=3000):
 
     if last_count == 0:
         print("⚠️ Hiç yorum bulunamadı!")
-        driver.quit()
         return data
 
     print("📖 Uzun yorumlar genişletiliyor...")
@@ -375,15 +386,12 @@ def trendyol_yorum_scrape(url, max_reviews=3000):
         reviews_data = driver.execute_script(extract_script)
         if not reviews_data or len(reviews_data) == 0:
             print("⚠️ Yorumlar çekilemedi!")
-            driver.quit()
             return data
         valid_reviews = [r for r in reviews_data if r.get('comment') and len(r.get('comment', '').strip()) > 0]
         data["reviews"] = valid_reviews[:max_reviews]
         print(f"✅ Toplam {len(data['reviews'])} geçerli yorum çekildi!")
     except Exception as e:
         print(f"❌ Yorumlar çekilirken hata: {str(e)}")
-        driver.quit()
         raise Exception(f"Veri çekme hatası: {str(e)}")
 
-    driver.quit()
     return data
\ No newline at end of file